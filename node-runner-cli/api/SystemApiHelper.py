@@ -37,10 +37,11 @@ class SystemApiHelper(API):
         self.api_client.prepare("GET", "/system/network-sync-status")
         Helpers.send_request(self.api_client.prepared_req, print_request=False, print_response=print_response)
 
-    def prometheus_metrics(self, print_response=False):
+    def prometheus_metrics(self, print_response=False, timeout=None):
 
         self.api_client.prepare("GET", "/prometheus/metrics")
-        Helpers.send_request(self.api_client.prepared_req, print_request=False, print_response=print_response)
+        return Helpers.send_request(self.api_client.prepared_req, print_request=False, print_response=print_response,
+                                    timeout=timeout)
 
     def identity(self, print_response=False):
         self.api_client.prepare("GET", "/system/identity")
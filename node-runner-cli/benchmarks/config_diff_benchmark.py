@@ -0,0 +1,38 @@
+"""
+Compares utils.ConfigDiff with DeepDiff, if it is installed, on the rendered Grafana dashboards with one changed value.
+
+Run from the node-runner-cli folder:  python -m benchmarks.config_diff_benchmark
+"""
+import copy
+import timeit
+
+from config.Renderer import Renderer
+from utils.ConfigDiff import ConfigDiff
+from utils.YamlIO import YamlIO
+
+try:
+    from deepdiff import DeepDiff
+except ImportError:
+    DeepDiff = None
+
+DASHBOARDS = ["babylon-node-dashboard.json.j2", "babylon-jvm-dashboard.json.j2", "network-gateway-dashboard.json.j2"]
+
+
+def measure(function, repeat=5, number=10):
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number * 1000
+
+
+def main():
+    print(f"{'file':35} {'ConfigDiff ms':>14} {'DeepDiff ms':>12}")
+    for name in DASHBOARDS:
+        old = YamlIO.load(Renderer().load_file_based_template(name).render({}).rendered)
+        new = copy.deepcopy(old)
+        new["panels"][-1]["title"] = "changed"
+        assert len(ConfigDiff.diff(old, new)) == 1
+        config_diff = measure(lambda: ConfigDiff.diff(old, new))
+        deep_diff = f"{measure(lambda: DeepDiff(old, new)):12.2f}" if DeepDiff else f"{'n/a':>12}"
+        print(f"{name:35} {config_diff:14.2f} {deep_diff}")
+
+
+if __name__ == "__main__":
+    main()
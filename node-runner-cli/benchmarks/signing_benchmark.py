@@ -0,0 +1,31 @@
+"""
+Compares signing digests with the pure Python ecdsa backend and the OpenSSL backed cryptography backend of
+key_interaction.KeyInteraction, on a keystore generated for the run.
+
+Run from the node-runner-cli folder:  python -m benchmarks.signing_benchmark
+"""
+import hashlib
+import time
+
+from key_interaction.KeyInteraction import KeyInteraction, SIGNING_BACKENDS
+from key_interaction.KeystoreGenerator import KeystoreGenerator
+
+COUNTS = [1, 100, 1000]
+
+
+def main():
+    keystore = KeystoreGenerator.create_keystore("nodepassword")
+    digests = [hashlib.sha256(f"payload {i}".encode()).hexdigest() for i in range(max(COUNTS))]
+    print(f"{'backend':14} {'digests':>8} {'total ms':>10} {'per sign us':>12}")
+    for backend in SIGNING_BACKENDS:
+        key = KeyInteraction(b"nodepassword", keystore_bytes=keystore, signing_backend=backend)
+        for count in COUNTS:
+            start = time.perf_counter()
+            for _ in key.sign_many(digests[:count]):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"{backend:14} {count:8} {elapsed * 1000:10.1f} {elapsed / count * 1e6:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
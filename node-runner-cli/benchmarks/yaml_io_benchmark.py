@@ -0,0 +1,64 @@
+"""
+Compares the pure Python PyYAML loader and dumper with the libyaml based ones used by utils.YamlIO,
+on the rendered docker compose file and the bundled Grafana dashboards.
+
+Run from the node-runner-cli folder:  python -m benchmarks.yaml_io_benchmark
+"""
+import timeit
+
+import yaml
+
+from config.Renderer import Renderer
+from utils.YamlIO import YamlIO, YamlLoader, YamlDumper
+
+COMPOSE_CONFIG = {
+    "core_node": {
+        "core_release": "v1.0.0", "repo": "radixdlt/babylon-node", "data_directory": "/data",
+        "trusted_node": "radix://node@127.0.0.1", "enable_transaction": "false",
+        "keydetails": {"keyfile_path": "/node-config", "keyfile_name": "node-keystore.ks"}
+    },
+    "common_config": {
+        "network_id": 1, "network_name": "mainnet",
+        "nginx_settings": {"protect_core": "true", "protect_gateway": "true", "release": "1.0.0",
+                           "repo": "radixdlt/babylon-nginx"}
+    },
+    "gateway": {
+        "gateway_api": {"repo": "radixdlt/babylon-ng-gateway-api", "release": "v1.0.0",
+                        "coreApiNode": {"Name": "Core", "core_api_address": "http://core:3333"}},
+        "data_aggregator": {"repo": "radixdlt/babylon-ng-data-aggregator", "release": "v1.0.0",
+                            "coreApiNode": {"Name": "Core", "core_api_address": "http://core:3333"}},
+        "postgres_db": {"host": "host.docker.internal:5432", "dbname": "radixdlt_ledger", "user": "postgres",
+                        "password": "password", "setup": "local"}
+    }
+}
+
+FILES = {
+    "radix-fullnode-compose.yml": Renderer().load_file_based_template("radix-fullnode-compose.yml.j2")
+    .render(COMPOSE_CONFIG).rendered,
+    "babylon-node-dashboard.json": Renderer().load_file_based_template("babylon-node-dashboard.json.j2")
+    .render({}).rendered,
+    "babylon-jvm-dashboard.json": Renderer().load_file_based_template("babylon-jvm-dashboard.json.j2")
+    .render({}).rendered,
+    "network-gateway-dashboard.json": Renderer().load_file_based_template("network-gateway-dashboard.json.j2")
+    .render({}).rendered,
+}
+
+
+def measure(function, repeat=5, number=20):
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number * 1000
+
+
+def main():
+    print(f"libyaml available: {yaml.__with_libyaml__}")
+    print(f"{'file':35} {'size KB':>8} {'load py ms':>11} {'load C ms':>10} {'dump py ms':>11} {'dump C ms':>10}")
+    for name, content in FILES.items():
+        data = YamlIO.load(content)
+        load_py = measure(lambda: yaml.load(content, Loader=yaml.SafeLoader))
+        load_c = measure(lambda: yaml.load(content, Loader=YamlLoader))
+        dump_py = measure(lambda: yaml.dump(data, Dumper=yaml.Dumper))
+        dump_c = measure(lambda: yaml.dump(data, Dumper=YamlDumper))
+        print(f"{name:35} {len(content) / 1024:8.1f} {load_py:11.2f} {load_c:10.2f} {dump_py:11.2f} {dump_c:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,8 @@ from argparse import ArgumentParser
 from argparse import RawTextHelpFormatter
 from pathlib import Path
 
-import yaml
-from deepdiff import DeepDiff
-
 from commands.subcommand import get_decorator, argument
+from config.ArtifactManifest import ArtifactManifest
 from config.BaseConfig import SetupMode
 from config.DockerConfig import DockerConfig, CoreDockerSettings
 from config.Renderer import Renderer
@@ -15,8 +13,12 @@ from github.github import latest_release
 from setup.AnsibleRunner import AnsibleRunner
 from setup.Base import Base
 from setup.Docker import Docker
+from utils.ConfigDiff import ConfigDiff
+from utils.Host import Host
 from utils.Prompts import Prompts
-from utils.utils import Helpers, run_shell_command, bcolors
+from utils.TaskRunner import Task, TaskRunner
+from utils.utils import Helpers, bcolors
+from utils.YamlIO import YamlIO
 
 dockercli = ArgumentParser(
     description='Subcommand to help setup CORE or GATEWAY using Docker containers',
@@ -104,7 +106,7 @@ def config(args):
     old_config = Docker.load_all_config(config_file)
     if len(old_config) != 0:
         print("\n----There is existing config file and contents are as below----\n")
-        print(f"\n{yaml.dump(old_config)}")
+        print(f"\n{YamlIO.dump(old_config)}")
     release = latest_release()
 
     configuration = DockerConfig(release)
@@ -166,16 +168,15 @@ def config(args):
 
     config_to_dump["common_config"] = dict(configuration.common_config)
 
-    yaml.add_representer(type(None), Helpers.represent_none)
     Helpers.section_headline("CONFIG is Generated as below")
-    print(f"\n{yaml.dump(config_to_dump)}")
+    print(f"\n{YamlIO.dump(config_to_dump)}")
 
     old_config = Docker.load_all_config(config_file)
     if len(old_config) != 0:
         print(f"""
             {Helpers.section_headline("Differences")}
             Difference between existing config file and new config that you are creating
-            {dict(DeepDiff(old_config, config_to_dump))}
+{ConfigDiff.format(ConfigDiff.diff(old_config, config_to_dump))}
               """)
 
     Docker.backup_save_config(config_file, config_to_dump, autoapprove, Helpers.get_current_date_time())
@@ -207,38 +208,52 @@ def install(args):
     new_config = Docker.check_set_passwords(new_config)
     Docker.check_run_local_postgreSQL(new_config)
 
-    render_template = Renderer().load_file_based_template("radix-fullnode-compose.yml.j2").render(new_config).to_yaml()
-    config_differences = dict(DeepDiff(all_config, new_config))
+    config_differences = ConfigDiff.diff(all_config, new_config)
     backup_time = Helpers.get_current_date_time()
 
     if len(config_differences) != 0:
         print(f"""
               {Helpers.section_headline("Differences in config file with updated software versions")}
               Difference between existing config file and new config that you are creating
-              {config_differences}
+{ConfigDiff.format(config_differences)}
                 """)
         Docker.backup_save_config(config_file, new_config, autoapprove, backup_time)
 
-    compose_file, compose_file_yaml = Docker.get_existing_compose_file(new_config)
-    compose_file_difference = dict(DeepDiff(compose_file_yaml, render_template))
-    if len(compose_file_difference) != 0:
-        print(f"""
-            {Helpers.section_headline("Differences between existing compose file and new compose file")}
-             Difference between existing compose file and new compose file that you are creating
-            {compose_file_difference}
-              """)
-        to_update = ""
-        if autoapprove:
-            print("In Auto mode - Updating file as suggested in above changes")
+    manifest = ArtifactManifest.in_directory(os.path.dirname(os.path.abspath(config_file)))
+    compose_inputs = ArtifactManifest.template_inputs("radix-fullnode-compose.yml.j2", new_config)
+    compose_file = new_config['common_config']['docker_compose']
+    services_to_recreate = None
+    if manifest.is_up_to_date(compose_file, compose_inputs):
+        Helpers.print_info(f"Compose file {compose_file} is up to date with the config file. Skipping update")
+        services_to_recreate = []
+    else:
+        render_template = Renderer().load_file_based_template("radix-fullnode-compose.yml.j2").render(
+            new_config).to_yaml()
+        compose_file, compose_file_yaml = Docker.get_existing_compose_file(new_config)
+        compose_file_difference = ConfigDiff.diff(compose_file_yaml, render_template)
+        if len(compose_file_difference) == 0:
+            services_to_recreate = []
+            manifest.record(compose_file, compose_inputs)
         else:
-            to_update = input("\nOkay to update the file [Y/n]?:")
-
-        if Helpers.check_Yes(to_update) or autoapprove:
-            if os.path.exists(compose_file):
-                Helpers.backup_file(compose_file, f"{compose_file}_{backup_time}")
-            Docker.save_compose_file(compose_file, render_template)
-
-    run_shell_command(f"cat {compose_file}", shell=True)
+            print(f"""
+                {Helpers.section_headline("Differences between existing compose file and new compose file")}
+                 Difference between existing compose file and new compose file that you are creating
+{ConfigDiff.format(compose_file_difference)}
+                  """)
+            to_update = ""
+            if autoapprove:
+                print("In Auto mode - Updating file as suggested in above changes")
+            else:
+                to_update = input("\nOkay to update the file [Y/n]?:")
+
+            if Helpers.check_Yes(to_update) or autoapprove:
+                if os.path.exists(compose_file):
+                    Helpers.backup_file(compose_file, f"{compose_file}_{backup_time}")
+                Docker.save_compose_file(compose_file, render_template)
+                manifest.record(compose_file, compose_inputs)
+                services_to_recreate = Helpers.compose_services_to_recreate(compose_file_yaml, render_template)
+
+    Host.instance().print_file(compose_file)
 
     should_start = ""
     if autoapprove:
@@ -246,7 +261,9 @@ def install(args):
     else:
         should_start = input("\nOkay to start the containers [Y/n]?:")
     if Helpers.check_Yes(should_start) or autoapprove:
-        Docker.run_docker_compose_up(compose_file)
+        if services_to_recreate:
+            print(f"Recreating only the changed services: {', '.join(services_to_recreate)}")
+        Docker.run_docker_compose_up(compose_file, services_to_recreate)
 
 
 @dockercommand([
@@ -290,13 +307,21 @@ def stop(args):
     Docker.run_docker_compose_down(compose_file, args.removevolumes)
 
 
-@dockercommand([])
+@dockercommand([
+    argument("-j", "--jobs", help="Number of setup steps to run at the same time", type=int, default=4,
+             action="store"),
+])
 def dependencies(args):
     """
     This commands installs all necessary software on the Virtual Machine(VM).
     Run this command on fresh VM or on a existing VM  as the command is tested to be idempotent
     """
-    Base.dependencies()
     ansible_dir = f'https://raw.githubusercontent.com/radixdlt/babylon-nodecli/{Helpers.cli_version()}/node-runner-cli'
-    AnsibleRunner(ansible_dir).check_install_ansible(False)
-    Base.add_user_docker_group()
+    # Installing ansible may apt install pip, and the docker group is created by docker.io
+    tasks = [
+        Task("packages", Base.dependencies),
+        Task("ansible", lambda: AnsibleRunner(ansible_dir).check_install_ansible(False), depends_on=["packages"]),
+        Task("docker-group", Base.add_user_docker_group, depends_on=["packages"]),
+    ]
+    if not TaskRunner(tasks, max_workers=args.jobs).run():
+        sys.exit(1)
@@ -1,7 +1,10 @@
+import json
+import sys
 from argparse import ArgumentParser
 
 from commands.subcommand import get_decorator, argument
 from key_interaction.KeyInteraction import KeyInteraction
+from key_interaction.KeystoreBatch import KeystoreBatch
 
 # Setup key subcommand parser
 keycli = ArgumentParser(
@@ -19,14 +22,30 @@ def keycommand(args=[], parent=key_parser):
     argument("-p", "--password", required=True,
              help="Password of the keystore",
              action="store"),
-    argument("-f", "--filelocation", required=True,
+    argument("-f", "--filelocation",
              help="Location of keystore on the disk",
              action="store"),
+    argument("-b", "--batch",
+             help="Directory of keystores, or a file listing one keystore path per line. "
+                  "Prints the public key and addresses of every keystore as JSON lines",
+             action="store"),
+    argument("-j", "--jobs", help="Number of keystores decrypted at the same time with --batch. "
+                                  "Defaults to the number of CPUs", type=int, action="store"),
+    argument("-n", "--nocache", help="With --batch, decrypt every keystore even if its public data is cached",
+             action="store_true"),
 ])
 def info(args):
     """
     Using CLI, for a key file, you can print out the validator address. This feature is in beta.
     """
+    if args.batch:
+        batch = KeystoreBatch(str.encode(args.password), jobs=args.jobs, use_cache=not args.nocache)
+        for result in batch.inspect(KeystoreBatch.keystore_files(args.batch)):
+            print(json.dumps(result))
+        return
+    if not args.filelocation:
+        print("Either -f/--filelocation or -b/--batch is required")
+        sys.exit(1)
     key = KeyInteraction(keystore_password=str.encode(args.password), keystore_path=args.filelocation)
     print(f"Validator hex public key  {key.get_validator_hex_public_key()}")
 
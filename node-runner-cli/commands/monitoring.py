@@ -1,16 +1,25 @@
 import sys
+import time
 from argparse import ArgumentParser
+from fnmatch import fnmatchcase
 from os.path import exists
 from pathlib import Path
 
-import yaml
+import requests
 
+from api.SystemApiHelper import SystemApiHelper
 from commands.subcommand import get_decorator, argument
+from config.ArtifactManifest import ArtifactManifest
 from config.BaseConfig import SetupMode
 from config.MonitoringConfig import MonitoringSettings
 from monitoring import Monitoring
+from monitoring.Cardinality import Cardinality
+from monitoring.FileTargets import FileTargets
+from monitoring.HostExporter import HostExporter, DEFAULT_PROCESS_MATCH, DEFAULT_PORT, LOOPBACK_ADDRESS
+from monitoring.MetricStore import MetricStore, DEFAULT_SERIES
 from utils.Prompts import Prompts
 from utils.utils import Helpers, bcolors
+from utils.YamlIO import YamlIO
 
 monitoringcli = ArgumentParser(
     description='Subcommand to setup monitoring for CORE or GATEWAY',
@@ -24,15 +33,12 @@ def monitoringcommand(args=[], parent=monitoring_parser):
 
 
 def read_monitoring_config(args):
-    yaml.add_representer(type(None), Helpers.represent_none)
     if not exists(args.monitoringconfigfile):
         print(
             f"The monitoring config file {args.monitoringconfigfile} does not exist. It seems like monitoring was not set up. "
             "Please run the config command first.")
         sys.exit(1)
-    with open(args.monitoringconfigfile, 'r') as file:
-        all_config = yaml.safe_load(file)
-    return all_config
+    return YamlIO.load_file(args.monitoringconfigfile)
 
 
 @monitoringcommand([
@@ -59,7 +65,11 @@ def read_monitoring_config(args):
     argument("-d", "--monitoringconfigdir",
              help="Path to monitoring directory where config file will stored",
              action="store",
-             default=f"{Helpers.get_default_monitoring_config_dir()}")
+             default=f"{Helpers.get_default_monitoring_config_dir()}"),
+    argument("--auto",
+             help="Scrape each target once and suggest its scrape interval, timeout and sample limit from the "
+                  "measured scrape duration and payload size",
+             action="store_true")
 ])
 def config(args):
     """
@@ -96,31 +106,29 @@ def config(args):
     }
 
     if "MONITOR_CORE" in setupmode.mode:
-        monitoring_config.configure_core_target(coremetricspassword)
+        monitoring_config.configure_core_target(coremetricspassword, args.auto)
         config_to_dump["monitor_core"] = dict(monitoring_config.core_prometheus_settings)
     if "MONITOR_GATEWAY" in setupmode.mode:
-        monitoring_config.configure_aggregator_target(aggregatormetricspassword)
-        monitoring_config.configure_gateway_api_target(gatewayapimetricspassword)
+        monitoring_config.configure_aggregator_target(aggregatormetricspassword, args.auto)
+        monitoring_config.configure_gateway_api_target(gatewayapimetricspassword, args.auto)
 
         config_to_dump["monitor_aggregator"] = dict(monitoring_config.aggregator_prometheus_settings)
         config_to_dump["monitor_gateway_api"] = dict(monitoring_config.gateway_api_prometheus_settings)
     if "DETAILED" in setupmode.mode:
         if Prompts.check_for_monitoring_core():
-            monitoring_config.configure_core_target(coremetricspassword)
+            monitoring_config.configure_core_target(coremetricspassword, args.auto)
             config_to_dump["monitor_core"] = dict(monitoring_config.core_prometheus_settings)
         if Prompts.check_for_monitoring_gateway():
-            monitoring_config.configure_aggregator_target(aggregatormetricspassword)
-            monitoring_config.configure_gateway_api_target(gatewayapimetricspassword)
+            monitoring_config.configure_aggregator_target(aggregatormetricspassword, args.auto)
+            monitoring_config.configure_gateway_api_target(gatewayapimetricspassword, args.auto)
             config_to_dump["monitor_aggregator"] = dict(monitoring_config.aggregator_prometheus_settings)
             config_to_dump["monitor_gateway_api"] = dict(monitoring_config.gateway_api_prometheus_settings)
 
-    yaml.add_representer(type(None), Helpers.represent_none)
     Helpers.section_headline("CONFIG is Generated as below")
-    print(f"\n{yaml.dump(config_to_dump)}"
+    print(f"\n{YamlIO.dump(config_to_dump)}"
           f"\n\n Saving to file {config_file} ")
 
-    with open(config_file, 'w') as f:
-        yaml.dump(config_to_dump, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
+    YamlIO.dump_config_file(config_to_dump, config_file)
 
 
 @monitoringcommand(
@@ -141,16 +149,23 @@ def install(args):
     all_config = read_monitoring_config(args)
 
     monitoring_config_dir = all_config["common_config"]["config_dir"]
-    Monitoring.template_prometheus_yml(all_config, monitoring_config_dir)
-    Monitoring.template_datasource(monitoring_config_dir)
-    Monitoring.template_dashboards(["dashboard.yml", "babylon-node-dashboard.json", "babylon-jvm-dashboard.json",
-                                    "network-gateway-dashboard.json"], monitoring_config_dir)
+    monitoring_file_location = f"{monitoring_config_dir}/node-monitoring.yml"
+    existing_compose = Helpers.yaml_as_dict(monitoring_file_location) if exists(monitoring_file_location) else {}
+
+    manifest = ArtifactManifest.in_directory(monitoring_config_dir)
+    prometheus_config_changed = Monitoring.template_prometheus_yml(all_config, monitoring_config_dir, manifest)
+    grafana_datasource_changed = Monitoring.template_datasource(monitoring_config_dir, manifest)
+    grafana_dashboards_changed = Monitoring.template_dashboards(Monitoring.dashboard_files, monitoring_config_dir,
+                                                                manifest)
+    recording_rules_changed = Monitoring.template_recording_rules(Monitoring.dashboard_files, monitoring_config_dir,
+                                                                  manifest)
 
-    Monitoring.template_monitoring_containers(monitoring_config_dir)
+    Monitoring.template_monitoring_containers(monitoring_config_dir, manifest)
     Monitoring.setup_external_volumes()
-    monitoring_file_location = f"{monitoring_config_dir}/node-monitoring.yml"
-    Monitoring.stop_monitoring(monitoring_file_location, remove_volumes=False)
-    Monitoring.start_monitoring(monitoring_file_location, autoapprove)
+    services = Monitoring.services_to_recreate(existing_compose, Helpers.yaml_as_dict(monitoring_file_location),
+                                               prometheus_config_changed or recording_rules_changed,
+                                               grafana_datasource_changed or grafana_dashboards_changed)
+    Monitoring.start_monitoring(monitoring_file_location, autoapprove, services)
 
 
 @monitoringcommand(
@@ -188,3 +203,272 @@ def stop(args):
     monitoring_config_dir = all_config["common_config"]["config_dir"]
     monitoring_file_location = f"{monitoring_config_dir}/node-monitoring.yml"
     Monitoring.stop_monitoring(monitoring_file_location, args.removevolumes)
+
+
+@monitoringcommand([
+    argument("-d", "--storedir", help="Directory of the metric store",
+             action="store", default=f"{Helpers.get_default_monitoring_config_dir()}/scrape"),
+    argument("-s", "--series", nargs="+",
+             help="Metric names or series to keep, glob patterns are allowed. "
+                  "Only used when the store is created, the set of series of a store is fixed",
+             action="store", default=DEFAULT_SERIES),
+    argument("-i", "--interval", help="Seconds between scrapes", type=float, default=15, action="store"),
+    argument("-c", "--capacity",
+             help="Number of scrapes kept per series when the store is created. The oldest are overwritten",
+             type=int, default=5760, action="store"),
+    argument("-n", "--count", help="Number of scrapes to run. Runs until interrupted if not set",
+             type=int, default=0, action="store")
+])
+def scrape(args):
+    """
+    Scrapes /prometheus/metrics of the node and keeps a local history of selected series, without running
+    Prometheus or Grafana. The history is kept in a fixed size memory mapped ring buffer in the store directory.
+    Uses the metrics user of nginx, set NGINX_METRICS_PASSWORD to its password.
+    """
+    system_api = SystemApiHelper(user_type="metrics", default_username="metrics")
+    store = MetricStore(args.storedir) if MetricStore.exists(args.storedir) else None
+    scrapes = 0
+    try:
+        while not args.count or scrapes < args.count:
+            started = time.time()
+            try:
+                # A node that does not answer must not stop the next scrapes, the next one is due after the interval
+                resp = system_api.prometheus_metrics(timeout=max(1.0, args.interval))
+            except requests.exceptions.RequestException as e:
+                resp = None
+                print(f"Scrape failed: {e}")
+            if resp is not None and not resp.ok:
+                print(f"Scrape failed with status {resp.status_code}")
+            elif resp is not None:
+                metrics_text = resp.content.decode("utf-8")
+                if store is None:
+                    series = MetricStore.select_series(metrics_text, args.series)
+                    if not series:
+                        print(f"None of the metrics match {' '.join(args.series)}. Exiting...")
+                        sys.exit(1)
+                    store = MetricStore.create(args.storedir, series, args.capacity)
+                    print(f"Created the metric store {args.storedir} for {len(series)} series")
+                recorded = store.record(metrics_text, started)
+                print(f"{time.strftime('%H:%M:%S', time.localtime(started))} recorded {recorded} series")
+            scrapes += 1
+            if not args.count or scrapes < args.count:
+                time.sleep(max(0.0, args.interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+
+
+@monitoringcommand([
+    argument("-d", "--storedir", help="Directory of the metric store",
+             action="store", default=f"{Helpers.get_default_monitoring_config_dir()}/scrape"),
+    argument("-s", "--series", nargs="+", help="Series to query, glob patterns are allowed",
+             action="store", default=["*"]),
+    argument("-w", "--window", help="Seconds of history to query", type=float, default=300, action="store"),
+    argument("-q", "--quantiles", nargs="+", help="Quantiles to compute", type=float, default=[0.5, 0.9, 0.99],
+             action="store")
+])
+def query(args):
+    """
+    Prints the number of samples, min, max, average, per second rate and quantiles of the series recorded by
+    the scrape command over the last window of time.
+    """
+    if not MetricStore.exists(args.storedir):
+        print(f"There is no metric store in {args.storedir}. Run the scrape command first.")
+        sys.exit(1)
+    store = MetricStore(args.storedir)
+    try:
+        since = time.time() - args.window
+        columns = ["samples", "min", "max", "avg", "rate"] + [f"p{quantile * 100:g}" for quantile in args.quantiles]
+        print(f"{'series':60} " + " ".join(f"{column:>12}" for column in columns))
+        for key in store.series:
+            if not any(fnmatchcase(key, pattern) for pattern in args.series):
+                continue
+            summary = MetricStore.summarize(*store.window(key, since), quantiles=args.quantiles)
+            cells = [summary.get(column) for column in columns]
+            print(f"{key:60} " + " ".join(f"{cell:>12.6g}" if cell is not None else f"{'-':>12}" for cell in cells))
+    finally:
+        store.close()
+
+
+@monitoringcommand([
+    argument("-f", "--monitoringconfigfile",
+             help=f"Path to config file. Default is '{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml'",
+             action="store", default=f"{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml"),
+    argument("-t", "--top", help="Number of metric families listed per target", type=int, default=20,
+             action="store"),
+    argument("-u", "--updateconfig",
+             help="Save the drop rules in the config file. Run the install command afterwards to apply them",
+             action="store_true")
+])
+def cardinality(args):
+    """
+    Scrapes every target in the config file once and reports the number of series per metric family and label.
+    Families that none of the bundled dashboards query are listed as metric_relabel_configs drop rules.
+    """
+    all_config = read_monitoring_config(args)
+    targets = Cardinality.targets(all_config)
+    if not targets:
+        print("There are no targets in the config file. Run the config command first.")
+        sys.exit(1)
+    used_metrics = Cardinality.dashboard_metrics()
+    for job, target in targets.items():
+        try:
+            families = Cardinality.analyze(Cardinality.scrape(target))
+        except requests.exceptions.RequestException as e:
+            print(f"Could not scrape the target {job}: {e}")
+            continue
+        unused_families = Cardinality.unused_families(families, used_metrics)
+        dropped_metrics = Cardinality.dropped_metrics(families, unused_families)
+        print(f"\n{Cardinality.report(job, families, unused_families, args.top)}")
+        Helpers.section_headline(f"metric_relabel_configs for {job}")
+        print(YamlIO.dump({"metric_relabel_configs": Cardinality.metric_relabel_configs(dropped_metrics)}))
+        target["dropped_metrics"] = dropped_metrics
+    if args.updateconfig:
+        YamlIO.dump_config_file(all_config, args.monitoringconfigfile)
+        print(f"Saved the drop rules to {args.monitoringconfigfile}. Run the install command to apply them.")
+
+
+@monitoringcommand([
+    argument("action", help="add or remove targets, or list them", choices=["add", "remove", "list"]),
+    argument("targets", help="Nodes to add or remove as host or host:port", nargs="*"),
+    argument("-l", "--labels", help="Labels of the added targets as name=value", nargs="+", default=[],
+             action="store"),
+    argument("-m", "--metricspassword",
+             help="Password of the metrics user of the nodes, used when the nodes job is created. "
+                  "Defaults to the password of the core node",
+             action="store", default=""),
+    argument("-f", "--monitoringconfigfile",
+             help=f"Path to config file. Default is '{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml'",
+             action="store", default=f"{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml")
+])
+def targets(args):
+    """
+    Maintains the nodes scraped by the `nodes` prometheus job in a file_sd_configs file, which prometheus reads
+    from the nodes folder in the monitoring directory. Targets that are added or removed are picked up
+    by prometheus without a restart. The first add creates the nodes job, run the install command once
+    afterwards to load it.
+    """
+    all_config = read_monitoring_config(args)
+    file_targets = FileTargets(f"{all_config['common_config']['config_dir']}/nodes")
+    if args.action == "list":
+        current = file_targets.targets()
+        if not current:
+            print(f"There are no targets in {file_targets.file_location}")
+        for target, labels in current.items():
+            print(f"{target:40} {' '.join(f'{name}={value}' for name, value in sorted(labels.items()))}")
+        return
+    if not args.targets:
+        print(f"Name the targets to {args.action}")
+        sys.exit(1)
+
+    if args.action == "remove":
+        removed = file_targets.remove(args.targets)
+        for target in args.targets:
+            print(f"Removed {target}" if target in removed else f"{target} is not a target")
+        return
+
+    try:
+        labels = FileTargets.parse_labels(args.labels)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if "monitor_nodes" not in all_config:
+        monitoring_config = MonitoringSettings({})
+        monitoring_config.configure_nodes_target(all_config.get("monitor_core", {}), args.metricspassword)
+        all_config["monitor_nodes"] = dict(monitoring_config.nodes_prometheus_settings)
+        YamlIO.dump_config_file(all_config, args.monitoringconfigfile)
+        print(f"Added the nodes job to {args.monitoringconfigfile}. Run the install command once to load it, "
+              f"later changes of the targets do not need it.")
+    added = file_targets.add(args.targets, labels)
+    for target in args.targets:
+        print(f"Added {target}" if target in added else f"{target} is already a target")
+
+
+@monitoringcommand([
+    argument("-c", "--configfile",
+             help="Path to the node config file, its core_node.data_directory is the data directory. "
+                  f"The default value is `{Helpers.get_default_node_config_dir()}/config.yaml` if not provided",
+             action="store", default=f"{Helpers.get_default_node_config_dir()}/config.yaml"),
+    argument("-d", "--datadir", help="Data directory of the node, instead of the one in the node config file",
+             action="store"),
+    argument("-s", "--process", help="Text in the command line of the java process of the node",
+             action="store", default=DEFAULT_PROCESS_MATCH),
+    argument("-t", "--textfile",
+             help="Write the metrics to this file every interval, e.g. for the textfile collector of "
+                  "node_exporter, instead of serving them",
+             action="store"),
+    argument("-i", "--interval", help="Seconds between two writes of the textfile", type=float, default=15,
+             action="store"),
+    argument("-n", "--count", help="Number of writes of the textfile. Runs until interrupted if not set",
+             type=int, default=0, action="store"),
+    argument("-p", "--port", help="Port the metrics are served on, on /metrics", type=int, default=DEFAULT_PORT,
+             action="store"),
+    argument("-b", "--bindaddress",
+             help="Address the metrics are served on. They are served without authentication, so the default is "
+                  "the address of the docker0 bridge, which the prometheus container can reach and the internet "
+                  "cannot, or 127.0.0.1 without docker",
+             action="store"),
+    argument("-u", "--updateconfig",
+             help="Add a host job scraping the served metrics on the bind address to the monitoring config file. "
+                  "Run the install command afterwards to apply it",
+             action="store_true"),
+    argument("-f", "--monitoringconfigfile",
+             help=f"Path to config file. Default is '{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml'",
+             action="store", default=f"{Helpers.get_default_monitoring_config_dir()}/monitoring_config.yaml")
+])
+def host_exporter(args):
+    """
+    Exports the host metrics the node does not: the usage of the filesystem of the data directory, the I/O
+    latency and throughput of the block devices from /proc/diskstats and the memory, file descriptors, threads
+    and CPU of the node process. Run it on the host of the node, as root to count the file descriptors of the
+    node process.
+    """
+    data_directory = args.datadir
+    if not data_directory and exists(args.configfile):
+        data_directory = (YamlIO.load_file(args.configfile).get("core_node") or {}).get("data_directory")
+    if not data_directory:
+        print(f"There is no data directory in {args.configfile}. Pass it with --datadir")
+        sys.exit(1)
+    exporter = HostExporter(data_directory, args.process)
+
+    if args.textfile:
+        if args.updateconfig:
+            print("The host job scrapes the served metrics, --updateconfig cannot be used with --textfile")
+            sys.exit(1)
+        writes = 0
+        try:
+            while not args.count or writes < args.count:
+                started = time.time()
+                exporter.write_textfile(args.textfile)
+                writes += 1
+                if not args.count or writes < args.count:
+                    time.sleep(max(0.0, args.interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    address = args.bindaddress or HostExporter.default_address()
+    if args.updateconfig:
+        if address in ["", "0.0.0.0", "::"]:
+            print(f"Prometheus cannot scrape the wildcard address {address or '0.0.0.0'}. "
+                  f"Pass the address it should scrape with --bindaddress")
+            sys.exit(1)
+        if address == LOOPBACK_ADDRESS:
+            print(f"{bcolors.WARNING}The prometheus container cannot reach 127.0.0.1 of the host, the host job only "
+                  f"works when prometheus runs on the host network{bcolors.ENDC}")
+        all_config = read_monitoring_config(args)
+        monitoring_config = MonitoringSettings({})
+        monitoring_config.configure_host_target(address, args.port)
+        all_config["monitor_host"] = dict(monitoring_config.host_prometheus_settings)
+        YamlIO.dump_config_file(all_config, args.monitoringconfigfile)
+        print(f"Added the host job to {args.monitoringconfigfile}. Run the install command to apply it.")
+    server = exporter.http_server(args.port, address)
+    print(f"Serving the host metrics of {data_directory} on {address}:{args.port}, on /metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
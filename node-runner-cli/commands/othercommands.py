@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 
-from commands.subcommand import get_decorator
+from commands.subcommand import get_decorator, argument
 from setup.Base import Base
 from utils.utils import Helpers
 
@@ -21,7 +21,10 @@ def version(args):
     print(f"Cli - Version : {Helpers.cli_version()}")
 
 
-@othercommands()
+@othercommands([
+    argument("-d", "--dryrun", help="Print the changes to the files and the commands without applying them",
+             action="store_true")
+])
 def optimise_node(args):
     """
     Run this command to setup ulimits and swap size on the fresh ubuntu machine
@@ -29,4 +32,4 @@ def optimise_node(args):
     . Prompts asking to setup limits
     . Prompts asking to setup swap and size of swap in GB
     """
-    Base.setup_node_optimisation_config(Helpers.cli_version())
+    Base.setup_node_optimisation_config(args.dryrun)
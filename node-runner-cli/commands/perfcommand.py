@@ -0,0 +1,95 @@
+import sys
+from argparse import ArgumentParser
+from os.path import exists
+
+import requests
+
+from api.SystemApiHelper import SystemApiHelper
+from commands.subcommand import get_decorator, argument
+from monitoring.PerfReport import PerfReport, THRESHOLDS
+from utils.utils import Helpers, bcolors
+from utils.YamlIO import YamlIO
+
+perfcli = ArgumentParser(
+    description='Subcommand to report on the performance of the node',
+    usage="radixnode perf "
+)
+perf_parser = perfcli.add_subparsers(dest="perfcommand")
+
+
+def perfcommand(args=[], parent=perf_parser):
+    return get_decorator(args, parent)
+
+
+def read_java_opts(config_file):
+    if not exists(config_file):
+        print(f"The config file {config_file} does not exist, the memory limits are taken from the metrics")
+        return None
+    return (YamlIO.load_file(config_file).get("core_node") or {}).get("java_opts")
+
+
+@perfcommand([
+    argument("-w", "--window", help="Seconds of metrics the report covers", type=float, default=300,
+             action="store"),
+    argument("-i", "--interval", help="Seconds between two samples of the metrics", type=float, default=15,
+             action="store"),
+    argument("-p", "--prometheus",
+             help="Url of the Prometheus set up by 'radixnode monitoring install', e.g. "
+                  "http://localhost:9090/prometheus. The window is queried from Prometheus instead of sampling "
+                  "the node for the length of the window",
+             action="store"),
+    argument("-f", "--configfile",
+             help="Path to the node config file, its java_opts are the heap and direct memory limits. "
+                  f"The default value is `{Helpers.get_default_node_config_dir()}/config.yaml` if not provided",
+             default=f"{Helpers.get_default_node_config_dir()}/config.yaml",
+             action="store"),
+    argument("-t", "--threshold", nargs="+",
+             help=f"Override an anomaly threshold as name=value. The thresholds are "
+                  f"{', '.join(f'{name}={value}' for name, value in THRESHOLDS.items())}",
+             action="store")
+])
+def report(args):
+    """
+    Reports the GC pauses, the heap and direct memory headroom, the ledger throughput and sync lag and the
+    consensus timings of the node over a window and flags what is over the thresholds.
+    Without --prometheus, /prometheus/metrics of the node is sampled with the metrics user of nginx for the length
+    of the window. Set NGINX_METRICS_PASSWORD to its password.
+    """
+    try:
+        thresholds = {name: float(value) for name, _, value in
+                      (threshold.partition("=") for threshold in args.threshold or [])}
+    except ValueError:
+        print(f"The thresholds {' '.join(args.threshold)} are not in the format name=number")
+        sys.exit(1)
+    unknown = set(thresholds) - set(THRESHOLDS)
+    if unknown:
+        print(f"Unknown thresholds {', '.join(sorted(unknown))}. The thresholds are {', '.join(THRESHOLDS)}")
+        sys.exit(1)
+    java_opts = read_java_opts(args.configfile)
+
+    try:
+        if args.prometheus:
+            snapshots = PerfReport.query_prometheus(args.prometheus.rstrip("/"), args.window, args.interval)
+        else:
+            print(f"Sampling the metrics of the node every {args.interval:g}s for {args.window:g}s")
+            system_api = SystemApiHelper(user_type="metrics", default_username="metrics")
+
+            def fetch_metrics():
+                resp = system_api.prometheus_metrics(timeout=max(1.0, args.interval))
+                if not resp.ok:
+                    raise requests.exceptions.HTTPError(f"/prometheus/metrics returned {resp.status_code}",
+                                                        response=resp)
+                return resp.content.decode("utf-8")
+
+            snapshots = PerfReport.sample_node(fetch_metrics, args.window, args.interval)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not read the metrics: {e}")
+        sys.exit(1)
+
+    lines, anomalies = PerfReport(snapshots, java_opts, thresholds).report()
+    print("\n".join(lines))
+    Helpers.section_headline("ANOMALIES")
+    if not anomalies:
+        print("Nothing is over the thresholds")
+    for anomaly in anomalies:
+        print(f"{bcolors.WARNING}{anomaly}{bcolors.ENDC}")
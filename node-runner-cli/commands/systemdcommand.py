@@ -1,18 +1,22 @@
 import ipaddress
+import os
 import sys
 from argparse import ArgumentParser
 from pathlib import Path
 
-import yaml
-from deepdiff import DeepDiff
-
 from commands.subcommand import get_decorator, argument
+from config.ArtifactManifest import ArtifactManifest
 from config.BaseConfig import SetupMode
 from config.SystemDConfig import SystemDSettings, CoreSystemdSettings, CommonSystemdSettings
 from github.github import latest_release
 from setup.Base import Base
+from setup.ServiceReconciler import ServiceReconciler
 from setup.SystemD import SystemD
+from utils.ConfigDiff import ConfigDiff
+from utils.SudoPlan import SudoPlan
+from utils.TaskRunner import Task, TaskRunner
 from utils.utils import Helpers, bcolors
+from utils.YamlIO import YamlIO
 
 systemdcli = ArgumentParser(
     description='Subcommand to help setup CORE using systemD service',
@@ -126,16 +130,15 @@ def config(args):
 
     config_to_dump["common_config"] = dict(configuration.common_config)
 
-    yaml.add_representer(type(None), Helpers.represent_none)
     Helpers.section_headline("CONFIG is Generated as below")
-    print(f"\n{yaml.dump(config_to_dump)}")
+    print(f"\n{YamlIO.dump(config_to_dump)}")
 
     old_config = SystemD.load_all_config(config_file)
     if len(old_config) != 0:
         print(f"""
                 {Helpers.section_headline("Differences")}
                 Difference between existing config file and new config that you are creating
-                {dict(DeepDiff(old_config, config_to_dump))}
+{ConfigDiff.format(ConfigDiff.diff(old_config, config_to_dump))}
                   """)
 
     SystemD.save_settings(configuration, config_file, autoapprove=args.autoapprove)
@@ -170,49 +173,54 @@ def install(args):
                                settings.common_config.nginx_settings.config_url)
 
     SystemD.checkUser()
+    plan = SudoPlan("systemd install")
 
     SystemD.download_binaries(binary_location_url=settings.core_node.core_binary_url,
                               library_location_url=settings.core_node.core_library_url,
                               node_dir=settings.core_node.node_dir,
                               node_version=settings.core_node.core_release,
-                              auto_approve=auto_approve)
+                              auto_approve=auto_approve,
+                              plan=plan)
 
     backup_time = Helpers.get_current_date_time()
+    manifest = ArtifactManifest.in_directory(os.path.dirname(os.path.abspath(args.configfile)))
 
-    settings.create_default_config()
-    SystemD.backup_file(settings.core_node.node_dir, f"default.config", backup_time, auto_approve)
+    default_config_changed = settings.create_default_config(manifest, backup_time, auto_approve)
 
     # Below steps only required if user want's setup nginx in same node
     SystemD.backup_file("/lib/systemd/system", "nginx.service", backup_time, auto_approve)
-    SystemD.create_ssl_certs(settings.common_config.nginx_settings.secrets_dir, auto_approve)
+    SystemD.create_ssl_certs(settings.common_config.nginx_settings.secrets_dir, auto_approve, plan)
     nginx_configured = SystemD.setup_nginx_config(
         nginx_config_location_url=settings.common_config.nginx_settings.config_url,
         node_type=settings.core_node.nodetype,
         nginx_etc_dir=settings.common_config.nginx_settings.dir, backup_time=backup_time,
-        auto_approve=auto_approve)
+        auto_approve=auto_approve, plan=plan)
 
     # Core node environment files
-    SystemD.backup_file(settings.core_node.node_secrets_dir, "environment", backup_time, auto_approve)
-    settings.create_environment_file()
+    environment_changed = settings.create_environment_file(manifest, backup_time, auto_approve)
     # Core node systemd service file
-    SystemD.backup_file("/etc/systemd/system", "radixdlt-node.service", backup_time, auto_approve)
     service_file_path = "/etc/systemd/system/radixdlt-node.service"
     if args.manual:
         service_file_path = f"{settings.core_node.node_dir}/radixdlt-node.service"
-    settings.create_service_file(service_file_path)
+    service_file_changed = settings.create_service_file(service_file_path, manifest, backup_time, auto_approve,
+                                                        plan)
 
     if not args.manual:
-        if not args.update:
-            SystemD.start_node_service()
+        node_changed = default_config_changed or environment_changed or service_file_changed
+        services = ServiceReconciler()
+        if node_changed:
+            SystemD.set_etc_directory_owner(plan)
         else:
-            SystemD.restart_node_service()
-
-        if nginx_configured and not args.update:
-            SystemD.start_nginx_service()
-        elif nginx_configured and args.update:
-            SystemD.start_nginx_service()
+            print("Node configuration is unchanged. Not restarting radixdlt-node")
+        services.want_running("radixdlt-node.service", config_changed=node_changed,
+                              unit_file_changed=service_file_changed)
+        if nginx_configured:
+            services.want_running("nginx", config_changed=True)
         else:
             print("Nginx not configured or not updated")
+        services.apply(plan)
+
+    plan.run()
 
 
 @systemdcommand([
@@ -253,18 +261,25 @@ def restart(args):
         sys.exit(1)
 
 
-@systemdcommand([])
+@systemdcommand([
+    argument("-j", "--jobs", help="Number of setup steps to run at the same time", type=int, default=4,
+             action="store"),
+])
 def dependencies(args):
     """
     This commands installs all necessary software on the Virtual Machine(VM).
     Run this command on fresh VM or on an existing VM  as the command is tested to be idempotent
     """
-
-    Base.dependencies()
-    SystemD.install_java()
-    SystemD.setup_user()
-    SystemD.make_etc_directory()
-    SystemD.make_data_directory()
-    SystemD.create_service_user_password()
-    SystemD.create_initial_service_file()
+    # apt holds a lock, so the package installs run one after the other. The docker group is created by docker.io
+    tasks = [
+        Task("packages", Base.dependencies),
+        Task("java", SystemD.install_java, depends_on=["packages"]),
+        Task("user", SystemD.setup_user, depends_on=["packages"]),
+        Task("etc-directory", SystemD.make_etc_directory, depends_on=["user"]),
+        Task("data-directory", SystemD.make_data_directory, depends_on=["user"]),
+        Task("service-file", SystemD.create_initial_service_file, depends_on=["user"]),
+        Task("user-password", SystemD.create_service_user_password, depends_on=["user"], interactive=True),
+    ]
+    if not TaskRunner(tasks, max_workers=args.jobs).run():
+        sys.exit(1)
     SystemD.sudoers_instructions()
@@ -0,0 +1,113 @@
+import hashlib
+import hmac
+import json
+import os
+
+from config.BaseConfig import BaseConfig
+from config.Renderer import Renderer
+
+
+class ArtifactManifest:
+    """
+    Records, for every file the CLI generates, a hash of the inputs it was generated from and a hash of the content
+    that was written. A file whose inputs are the same and which was not modified since is up to date, so rendering,
+    backing it up and restarting the services that use it can be skipped.
+    The inputs contain passwords, so the manifest only stores them keyed with a random key of the install, which is
+    readable by its owner only. Without it the hashes in the manifest cannot be used to guess the passwords.
+    """
+    manifest_file_name = ".artifacts-manifest.json"
+    key_file_name = ".artifacts-manifest.key"
+    version = 2
+
+    def __init__(self, manifest_file: str):
+        self.manifest_file = manifest_file
+        self.key_file = os.path.join(os.path.dirname(manifest_file), ArtifactManifest.key_file_name)
+        self.key = None
+        self.artifacts = self.load()
+
+    @staticmethod
+    def in_directory(directory: str):
+        return ArtifactManifest(os.path.join(directory, ArtifactManifest.manifest_file_name))
+
+    @staticmethod
+    def hash_inputs(*inputs) -> str:
+        def serialize(value):
+            if isinstance(value, BaseConfig):
+                return dict(value)
+            return str(value)
+
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=serialize).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def template_inputs(template_name: str, context) -> str:
+        return ArtifactManifest.hash_inputs(template_name, Renderer.template_checksum(template_name), context)
+
+    @staticmethod
+    def hash_file(file_location: str):
+        if not os.path.isfile(file_location):
+            return None
+        sha256 = hashlib.sha256()
+        with open(file_location, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def load(self) -> dict:
+        """A manifest of version 1 stored the inputs unkeyed, it is dropped and its files are generated again"""
+        if not os.path.isfile(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != ArtifactManifest.version:
+            return {}
+        return manifest.get("artifacts", {})
+
+    def load_key(self) -> bytes:
+        """The key is created on first use, with O_EXCL so that two runs do not overwrite each other's key"""
+        if self.key is None:
+            try:
+                fd = os.open(self.key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(os.urandom(32).hex())
+            except FileExistsError:
+                pass
+            with open(self.key_file, 'r') as f:
+                self.key = bytes.fromhex(f.read().strip())
+        return self.key
+
+    def keyed_inputs(self, inputs: str):
+        try:
+            return hmac.new(self.load_key(), inputs.encode("utf-8"), hashlib.sha256).hexdigest()
+        except (OSError, ValueError) as e:
+            print(f"Could not read the artifacts manifest key {self.key_file}: {e}")
+            return None
+
+    def is_up_to_date(self, file_location: str, inputs: str) -> bool:
+        artifact = self.artifacts.get(os.path.abspath(file_location))
+        if not artifact:
+            return False
+        keyed_inputs = self.keyed_inputs(inputs)
+        if keyed_inputs is None or artifact.get("inputs") != keyed_inputs:
+            return False
+        return artifact.get("output") == ArtifactManifest.hash_file(file_location)
+
+    def record(self, file_location: str, inputs: str, content_file: str = None):
+        """content_file is the file that will be moved to file_location, for moves deferred to a SudoPlan"""
+        keyed_inputs = self.keyed_inputs(inputs)
+        if keyed_inputs is None:
+            return
+        self.artifacts = self.load()
+        self.artifacts[os.path.abspath(file_location)] = {
+            "inputs": keyed_inputs,
+            "output": ArtifactManifest.hash_file(content_file or file_location)
+        }
+        tmp_manifest_file = f"{self.manifest_file}.tmp"
+        try:
+            with open(tmp_manifest_file, 'w') as f:
+                json.dump({"version": ArtifactManifest.version, "artifacts": self.artifacts}, f, indent=2, sort_keys=True)
+            os.replace(tmp_manifest_file, self.manifest_file)
+        except OSError as e:
+            print(f"Could not update the artifacts manifest {self.manifest_file}: {e}")
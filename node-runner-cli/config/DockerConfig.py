@@ -2,16 +2,16 @@ import os
 import sys
 from pathlib import Path
 
-import yaml
-
 from config.BaseConfig import BaseConfig, SetupMode
 from config.CommonDockerSettings import CommonDockerSettings
 from config.GatewayDockerConfig import GatewayDockerSettings
+from config.JvmSizing import JvmSizing
 from config.KeyDetails import KeyDetails
 from env_vars import MOUNT_LEDGER_VOLUME, CORE_DOCKER_REPO_OVERRIDE
 from setup.Base import Base
 from utils.Prompts import Prompts
 from utils.utils import Helpers
+from utils.YamlIO import YamlIO
 
 
 class CoreDockerSettings(BaseConfig):
@@ -30,6 +30,7 @@ class CoreDockerSettings(BaseConfig):
                      "-Djavax.net.ssl.trustStore=/etc/ssl/certs/java/cacerts " \
                      "-Djavax.net.ssl.trustStoreType=jks -Djava.security.egd=file:/dev/urandom " \
                      "-DLog4jContextSelector=org.apache.logging.log4j.core.async.AsyncLoggerContextSelector"
+    memory_limit: str = None
 
     def __init__(self, settings: dict):
         super().__init__(settings)
@@ -79,8 +80,16 @@ class CoreDockerSettings(BaseConfig):
         self.keydetails = Base.ask_keydetails(ks_password, new_keystore)
         self.ask_data_directory()
         self.ask_enable_transaction()
+        self.size_jvm()
         return self
 
+    def size_jvm(self, sizing: JvmSizing = None):
+        """The heap, direct memory and container memory limit follow the memory and CPUs of the host"""
+        sizing = sizing or JvmSizing.for_host()
+        self.java_opts = sizing.java_opts(self.java_opts)
+        self.memory_limit = sizing.memory_limit()
+        sizing.print_summary()
+
     def set_validator_address(self, validator_address: str):
         self.validator_address = validator_address
 
@@ -107,7 +116,7 @@ class DockerConfig(BaseConfig):
             sys.exit("Unable to find config file"
                      "Run `radixnode docker init` to setup one")
         with open(file, 'r') as file:
-            config_yaml = yaml.safe_load(file)
+            config_yaml = YamlIO.load(file)
             core_node = config_yaml["core_node"]
             common_config = config_yaml["common_config"]
             self.core_node.core_release = core_node.get("core_release", None)
@@ -125,5 +134,4 @@ class DockerConfig(BaseConfig):
         config_to_dump["common_config"] = dict(self.common_config)
         config_to_dump["core_node"] = dict(self.core_node)
         config_to_dump["gateway_settings"] = dict(self.gateway_settings)
-        return yaml.dump(config_to_dump, sort_keys=False, default_flow_style=False, explicit_start=True,
-                         allow_unicode=True)
+        return YamlIO.dump_config(config_to_dump, sort_keys=False)
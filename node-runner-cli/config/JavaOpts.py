@@ -0,0 +1,45 @@
+import re
+
+SIZE = re.compile(r"^(\d+)([kKmMgGtT]?)$")
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+class JavaOpts:
+    """Reads the memory settings out of the java_opts of the node config"""
+
+    @staticmethod
+    def parse_size(size: str):
+        """A JVM size like 8g, 2048m or 512k in bytes, None if it is not a size"""
+        match = SIZE.match(size.strip())
+        if not match:
+            return None
+        return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+    @staticmethod
+    def option(java_opts: str, prefix: str):
+        """The value of the last option starting with the prefix, as the JVM uses the last one"""
+        values = [option[len(prefix):] for option in (java_opts or "").split() if option.startswith(prefix)]
+        return values[-1] if values else None
+
+    @staticmethod
+    def max_heap_bytes(java_opts: str):
+        value = JavaOpts.option(java_opts, "-Xmx")
+        return JavaOpts.parse_size(value) if value else None
+
+    @staticmethod
+    def max_direct_memory_bytes(java_opts: str):
+        value = JavaOpts.option(java_opts, "-XX:MaxDirectMemorySize=")
+        return JavaOpts.parse_size(value) if value else None
+
+    @staticmethod
+    def set_options(java_opts: str, options: dict) -> str:
+        """Replaces the options starting with each prefix by the given option, or appends it when there is none"""
+        current = (java_opts or "").split()
+        for prefix, option in options.items():
+            matching = [index for index, existing in enumerate(current) if existing.startswith(prefix)]
+            if matching:
+                current[matching[0]] = option
+                current = [existing for index, existing in enumerate(current) if index not in matching[1:]]
+            else:
+                current.append(option)
+        return " ".join(current)
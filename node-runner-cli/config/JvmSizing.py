@@ -0,0 +1,122 @@
+import os
+import re
+
+from config.JavaOpts import JavaOpts
+from utils.utils import Helpers, bcolors
+
+MB = 1024 ** 2
+MIN_HOST_MEMORY_MB = 8 * 1024
+MIN_HEAP_MB = 2 * 1024
+# Above 32 GB the JVM can no longer use compressed oops, the default java_opts ask for them
+MAX_HEAP_MB = 31 * 1024
+MIN_DIRECT_MEMORY_MB = 1024
+MAX_DIRECT_MEMORY_MB = 4 * 1024
+MIN_NATIVE_MB = 2 * 1024
+MIN_RESERVED_MB = 2 * 1024
+RESERVED_FRACTION = 0.2
+GC_OPTION = re.compile(r"^-XX:[+-]Use\w+GC$")
+UNLIMITED = 1 << 60
+
+
+class JvmSizing:
+    """
+    Sizes the JVM of the node for the memory and CPUs of the host, or of the cgroup the CLI runs in when that
+    is smaller. A fifth of the memory, at least 2 GB, is left to the OS, nginx and the page cache. The rest is
+    split between the heap, direct memory and the native memory of the node (RocksDB, the Rust engine, thread
+    stacks and metaspace), which is the container memory limit.
+    """
+
+    def __init__(self, memory_mb: int, cpus: int):
+        self.memory_mb = memory_mb
+        self.cpus = max(1, cpus)
+        self.warnings = []
+        available_mb = max(0, memory_mb - max(MIN_RESERVED_MB, int(memory_mb * RESERVED_FRACTION)))
+        if memory_mb < MIN_HOST_MEMORY_MB:
+            self.warnings.append(f"The host has {memory_mb} MB of memory, the node needs at least "
+                                 f"{MIN_HOST_MEMORY_MB} MB. The smallest heap is used and the node may run out "
+                                 f"of memory")
+        # The heap takes two thirds, the direct and native memory a quarter of the heap each
+        self.heap_mb = JvmSizing.round_down(min(MAX_HEAP_MB, max(MIN_HEAP_MB, available_mb * 2 // 3)), 512)
+        self.direct_memory_mb = JvmSizing.round_down(
+            min(MAX_DIRECT_MEMORY_MB, max(MIN_DIRECT_MEMORY_MB, self.heap_mb // 4)), 256)
+        self.memory_limit_mb = self.heap_mb + self.direct_memory_mb + max(MIN_NATIVE_MB, self.heap_mb // 4)
+        # G1 is set explicitly, the JVM falls back to the serial collector with less than 2 CPUs
+        self.gc = "-XX:+UseG1GC"
+        if self.cpus < 2:
+            self.warnings.append("The host has 1 CPU, the node needs at least 2 to keep up with consensus")
+
+    @staticmethod
+    def round_down(value_mb: int, step_mb: int) -> int:
+        return value_mb // step_mb * step_mb
+
+    @staticmethod
+    def read_number(path: str):
+        """The first number in the file, None when it does not exist or is not limited"""
+        try:
+            with open(path) as f:
+                value = f.read().split()
+        except OSError:
+            return None
+        if not value or not value[0].isdigit():
+            return None
+        return int(value[0])
+
+    @staticmethod
+    def host_memory_mb(proc="/proc", cgroup="/sys/fs/cgroup") -> int:
+        memory = None
+        try:
+            with open(f"{proc}/meminfo") as f:
+                match = re.search(r"^MemTotal:\s+(\d+) kB", f.read(), re.MULTILINE)
+            memory = int(match.group(1)) * 1024 if match else None
+        except OSError:
+            pass
+        # cgroup v2, then v1. A v1 cgroup without a limit reports a number close to 2^63
+        for limit_file in ["memory.max", "memory/memory.limit_in_bytes"]:
+            limit = JvmSizing.read_number(f"{cgroup}/{limit_file}")
+            if limit and limit < UNLIMITED and (memory is None or limit < memory):
+                memory = limit
+        return (memory or 0) // MB
+
+    @staticmethod
+    def host_cpus(cgroup="/sys/fs/cgroup") -> int:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+        quota, period = None, None
+        try:
+            with open(f"{cgroup}/cpu.max") as f:
+                fields = f.read().split()
+            if fields and fields[0].isdigit():
+                quota, period = int(fields[0]), int(fields[1])
+        except OSError:
+            quota = JvmSizing.read_number(f"{cgroup}/cpu/cpu.cfs_quota_us")
+            period = JvmSizing.read_number(f"{cgroup}/cpu/cpu.cfs_period_us")
+        if quota and period:
+            cpus = min(cpus, max(1, -(-quota // period)))
+        return cpus
+
+    @staticmethod
+    def for_host():
+        return JvmSizing(JvmSizing.host_memory_mb(), JvmSizing.host_cpus())
+
+    def java_opts(self, java_opts: str) -> str:
+        """The java_opts with the sized memory, GC and processor options, every other option is kept"""
+        java_opts = " ".join(option for option in (java_opts or "").split() if not GC_OPTION.match(option))
+        return JavaOpts.set_options(java_opts, {
+            "-Xms": f"-Xms{self.heap_mb}m",
+            "-Xmx": f"-Xmx{self.heap_mb}m",
+            "-XX:MaxDirectMemorySize=": f"-XX:MaxDirectMemorySize={self.direct_memory_mb}m",
+            "-XX:+UseG1GC": self.gc,
+            "-XX:ActiveProcessorCount=": f"-XX:ActiveProcessorCount={self.cpus}",
+        })
+
+    def memory_limit(self) -> str:
+        return f"{self.memory_limit_mb}m"
+
+    def summary(self) -> str:
+        return (f"Sized for {self.memory_mb} MB of memory and {self.cpus} CPUs: heap {self.heap_mb} MB, "
+                f"direct memory {self.direct_memory_mb} MB, memory limit {self.memory_limit_mb} MB, G1 GC")
+
+    def print_summary(self):
+        Helpers.section_headline("JVM SIZING")
+        print(f"{self.summary()}. Change java_opts in the config file to override it")
+        for warning in self.warnings:
+            print(f"{bcolors.WARNING}{warning}{bcolors.ENDC}")
@@ -1,6 +1,7 @@
 from urllib.parse import urlparse
 
 from config.BaseConfig import BaseConfig, SetupMode
+from monitoring.ScrapeTuning import ScrapeTuning
 from utils.Prompts import Prompts
 from utils.utils import Helpers
 
@@ -16,6 +17,10 @@ class PrometheusSettings(BaseConfig):
     basic_auth_password = None
     basic_auth_user = None
     scheme = "https"
+    dropped_metrics = None
+    scrape_interval = None
+    scrape_timeout = None
+    sample_limit = None
 
     def ask_prometheus_target(self, basic_auth_password, target_name):
         self.metrics_target = f"{Helpers.get_node_host_ip()}"
@@ -30,6 +35,27 @@ class PrometheusSettings(BaseConfig):
             else:
                 self.basic_auth_password = basic_auth_password
 
+    def configure_scrape(self, target_name, default_interval: int, auto=False):
+        """
+        Slower targets are scraped less often than the core node. With auto, the defaults are suggested from a
+        measured scrape of the target instead.
+        """
+        suggestion = ScrapeTuning.suggest_for_target(dict(self), default_interval) if auto else None
+        if not suggestion:
+            suggestion = {"scrape_interval": f"{default_interval}s",
+                          "scrape_timeout": ScrapeTuning.default_timeout(f"{default_interval}s"),
+                          "sample_limit": None}
+        self.scrape_interval = suggestion["scrape_interval"]
+        self.scrape_timeout = suggestion["scrape_timeout"]
+        self.sample_limit = suggestion["sample_limit"]
+        if "DETAILED" in SetupMode.instance().mode:
+            scrape_interval = Prompts.ask_scrape_interval(target_name, self.scrape_interval)
+            if scrape_interval != self.scrape_interval:
+                self.scrape_interval = scrape_interval
+                self.scrape_timeout = ScrapeTuning.default_timeout(scrape_interval)
+            self.scrape_timeout = Prompts.ask_scrape_timeout(target_name, self.scrape_timeout, self.scrape_interval)
+            self.sample_limit = Prompts.ask_sample_limit(target_name, self.sample_limit)
+
     def set_target_details(self, url, target_name):
         parsed_url = urlparse(url)
         self.scheme = parsed_url.scheme
@@ -44,16 +70,46 @@ class MonitoringSettings(BaseConfig):
     core_prometheus_settings: PrometheusSettings = PrometheusSettings({})
     gateway_api_prometheus_settings: PrometheusSettings = PrometheusSettings({})
     aggregator_prometheus_settings: PrometheusSettings = PrometheusSettings({})
+    nodes_prometheus_settings: PrometheusSettings = PrometheusSettings({})
+    host_prometheus_settings: PrometheusSettings = PrometheusSettings({})
     common_config: CommonMonitoringSettings = CommonMonitoringSettings({})
 
-    def configure_core_target(self, basic_auth_password):
+    def configure_core_target(self, basic_auth_password, auto=False):
         self.core_prometheus_settings.ask_prometheus_target(basic_auth_password, target_name="CORE_NODE")
         self.core_prometheus_settings.metrics_path = "/prometheus/metrics"
+        self.core_prometheus_settings.configure_scrape("CORE_NODE", default_interval=5, auto=auto)
 
-    def configure_gateway_api_target(self, basic_auth_password):
+    def configure_gateway_api_target(self, basic_auth_password, auto=False):
         self.gateway_api_prometheus_settings.ask_prometheus_target(basic_auth_password, target_name="GATEWAY_API")
         self.gateway_api_prometheus_settings.metrics_path = "/gateway/metrics"
+        self.gateway_api_prometheus_settings.configure_scrape("GATEWAY_API", default_interval=15, auto=auto)
 
-    def configure_aggregator_target(self, basic_auth_password):
+    def configure_aggregator_target(self, basic_auth_password, auto=False):
         self.aggregator_prometheus_settings.ask_prometheus_target(basic_auth_password, target_name="AGGREGATOR")
         self.aggregator_prometheus_settings.metrics_path = "/aggregator/metrics"
+        self.aggregator_prometheus_settings.configure_scrape("AGGREGATOR", default_interval=15, auto=auto)
+
+    def configure_nodes_target(self, core_settings: dict, basic_auth_password):
+        """The nodes added with `monitoring targets` are scraped the same way as the core node"""
+        settings = self.nodes_prometheus_settings = PrometheusSettings({})
+        settings.metrics_path = "/prometheus/metrics"
+        for key in ["scheme", "basic_auth_user", "basic_auth_password", "scrape_interval", "scrape_timeout",
+                    "sample_limit"]:
+            if core_settings.get(key):
+                setattr(settings, key, core_settings[key])
+        if settings.scheme == "https":
+            settings.basic_auth_user = settings.basic_auth_user or "metrics"
+            if basic_auth_password:
+                settings.basic_auth_password = basic_auth_password
+            if not settings.basic_auth_password:
+                settings.basic_auth_password = Prompts.ask_basic_auth_password(settings.basic_auth_user, "NODES")
+        settings.scrape_interval = settings.scrape_interval or "5s"
+        settings.scrape_timeout = settings.scrape_timeout or ScrapeTuning.default_timeout(settings.scrape_interval)
+
+    def configure_host_target(self, address: str, port: int):
+        """The host exporter serves plain http without authentication, on the address it is bound to"""
+        settings = self.host_prometheus_settings = PrometheusSettings({})
+        settings.scheme = "http"
+        settings.metrics_target = f"{address}:{port}"
+        settings.scrape_interval = "15s"
+        settings.scrape_timeout = ScrapeTuning.default_timeout(settings.scrape_interval)
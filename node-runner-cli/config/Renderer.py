@@ -1,30 +1,86 @@
+import json
 import os
 import sys
+from hashlib import sha1
 
-import yaml
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+from utils.Tracer import Tracer
+from utils.utils import Helpers
+from utils.YamlIO import YamlIO
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    Jinja keys the compiled templates by their absolute path. A PyInstaller onefile binary extracts the templates
+    into a new temporary folder on every run, so the key is built from the template folder name and template name
+    instead. Jinja checks the checksum of the template source on load, so a changed template is still recompiled.
+    """
+
+    def __init__(self, directory, template_path):
+        super().__init__(directory, pattern="radixnode_%s.cache")
+        self.template_path = template_path
+
+    def get_cache_key(self, name, filename=None):
+        return sha1(f"{self.template_path}|{name}".encode("utf-8")).hexdigest()
 
 
 class Renderer:
-    def load_file_based_template(self, template_file_name: str, template_path="templates"):
+    environments = {}
+
+    @staticmethod
+    def get_environment(template_path="templates"):
         bundle_dir = getattr(sys, '_MEIPASS', os.getcwd())
         path_to_template = os.path.abspath(os.path.join(bundle_dir, template_path))
-        self.env = Environment(loader=FileSystemLoader(path_to_template), trim_blocks=True,
-                               lstrip_blocks=True)
-        self.env.filters['bool'] = bool
+        if path_to_template not in Renderer.environments:
+            env = Environment(loader=FileSystemLoader(path_to_template), trim_blocks=True, lstrip_blocks=True,
+                              bytecode_cache=Renderer.get_bytecode_cache(template_path))
+            env.filters['bool'] = bool
+            Renderer.environments[path_to_template] = env
+        return Renderer.environments[path_to_template]
+
+    @staticmethod
+    def get_bytecode_cache(template_path):
+        cache_dir = os.path.join(Helpers.get_cache_dir(), "templates")
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError:
+            return None
+        if not os.access(cache_dir, os.W_OK):
+            return None
+        return TemplateBytecodeCache(cache_dir, template_path)
+
+    @staticmethod
+    def template_checksum(template_file_name: str, template_path="templates"):
+        env = Renderer.get_environment(template_path)
+        source, _, _ = env.loader.get_source(env, template_file_name)
+        return sha1(source.encode("utf-8")).hexdigest()
+
+    def load_file_based_template(self, template_file_name: str, template_path="templates"):
+        self.env = Renderer.get_environment(template_path)
         self.template = self.env.get_template(template_file_name)
         return self
 
     def render(self, config):
-        self.rendered = self.template.render(config)
+        with Tracer.instance().span(self.template.name, "render"):
+            self.rendered = self.template.render(config)
         return self
 
     def to_yaml(self):
-        def represent_none(self, _):
-            return self.represent_scalar('tag:yaml.org,2002:null', '')
+        return YamlIO.load(self.rendered)
 
-        yaml.add_representer(type(None), represent_none)
-        return yaml.safe_load(self.rendered)
+    def to_json_file(self, filepath: str, validate=False):
+        """
+        Writes a rendered JSON template as is, without parsing it as YAML first.
+        Returns True if the file content changed.
+        """
+        if validate:
+            try:
+                json.loads(self.rendered)
+            except ValueError as e:
+                print(f"Rendered template {self.template.name} is not valid JSON: {e}")
+                sys.exit(1)
+        return Helpers.write_file_if_changed(filepath, self.rendered)
 
     def to_file(self, filepath: str):
         with open(filepath, 'w') as f:
@@ -2,9 +2,9 @@ import json
 import os
 from pathlib import Path
 
-import yaml
-
+from config.ArtifactManifest import ArtifactManifest
 from config.BaseConfig import BaseConfig, SetupMode
+from config.JvmSizing import JvmSizing
 from config.KeyDetails import KeyDetails
 from config.Nginx import SystemdNginxConfig
 from config.Renderer import Renderer
@@ -12,9 +12,12 @@ from env_vars import MOUNT_LEDGER_VOLUME, NODE_BINARY_OVERIDE, NGINX_BINARY_OVER
 from github import github
 from github.github import latest_release
 from setup.Base import Base
+from utils.Host import Host
 from utils.Network import Network
 from utils.Prompts import Prompts
-from utils.utils import Helpers, run_shell_command
+from utils.SudoPlan import SudoPlan
+from utils.utils import Helpers
+from utils.YamlIO import YamlIO
 
 
 class CoreSystemdSettings(BaseConfig):
@@ -82,8 +85,15 @@ class CoreSystemdSettings(BaseConfig):
         self.core_binary_url = os.getenv(NODE_BINARY_OVERIDE,
                                          f"https://github.com/radixdlt/babylon-node/releases/download/{self.core_release}/babylon-node-{self.core_release}.zip")
         self.core_library_url = f"https://github.com/radixdlt/babylon-node/releases/download/{self.core_release}/babylon-node-rust-arch-linux-x86_64-release-{self.core_release}.zip"
+        self.size_jvm()
         return self
 
+    def size_jvm(self, sizing: JvmSizing = None):
+        """The heap and direct memory follow the memory and CPUs of the host"""
+        sizing = sizing or JvmSizing.for_host()
+        self.java_opts = sizing.java_opts(self.java_opts)
+        sizing.print_summary()
+
     def set_validator_address(self, validator_address: str):
         self.validator_address = validator_address
 
@@ -183,8 +193,7 @@ class SystemDSettings(BaseConfig):
         config_to_dump["core_node"]["keydetails"] = dict(self.core_node.keydetails)
         config_to_dump["common_config"] = dict(self.common_config)
         config_to_dump["common_config"]["nginx_settings"] = dict(self.common_config.nginx_settings)
-        return yaml.dump(config_to_dump, sort_keys=True, default_flow_style=False, explicit_start=True,
-                         allow_unicode=True)
+        return YamlIO.dump_config(config_to_dump)
 
     def to_file(self, config_file):
         config_to_dump = dict(self)
@@ -193,7 +202,7 @@ class SystemDSettings(BaseConfig):
         config_to_dump["common_config"] = dict(self.common_config)
         config_to_dump["common_config"]["nginx_settings"] = dict(self.common_config.nginx_settings)
         with open(config_file, 'w') as f:
-            yaml.dump(config_to_dump, f, sort_keys=True, default_flow_style=False)
+            YamlIO.dump(config_to_dump, f, sort_keys=True, default_flow_style=False)
 
     def parse_config_from_args(self, args):
         self.core_node.trusted_node = args.trustednode
@@ -216,18 +225,39 @@ class SystemDSettings(BaseConfig):
                                                                  f"https://github.com/radixdlt/babylon-nginx/releases/download/{self.common_config.nginx_settings.release}/babylon-nginx-{self.core_node.nodetype}-conf.zip")
         return self
 
-    def create_environment_file(self):
-        run_shell_command(f'mkdir -p {self.core_node.node_secrets_dir}', shell=True)
+    def create_environment_file(self, manifest: ArtifactManifest = None, backup_time=None, auto_approve=None):
+        Host.instance().make_dirs(self.core_node.node_secrets_dir)
+        file_location = f"{self.core_node.node_secrets_dir}/environment"
+        environment = dict(self.core_node.keydetails, java_opts=self.core_node.java_opts)
+        inputs = ArtifactManifest.template_inputs("systemd-environment.j2", environment)
+        if manifest and manifest.is_up_to_date(file_location, inputs):
+            Helpers.print_info(f"{file_location} is up to date")
+            return False
+        if backup_time:
+            Base.backup_file(self.core_node.node_secrets_dir, "environment", backup_time, auto_approve)
         Renderer().load_file_based_template("systemd-environment.j2") \
-            .render(dict(self.core_node.keydetails)) \
-            .to_file(f"{self.core_node.node_secrets_dir}/environment")
+            .render(environment) \
+            .to_file(file_location)
+        if manifest:
+            manifest.record(file_location, inputs)
+        return True
 
-    def create_default_config(self):
+    def create_default_config(self, manifest: ArtifactManifest = None, backup_time=None, auto_approve=None):
         self.common_config.genesis_json_location = Network.path_to_genesis_json(self.common_config.network_id)
+        file_location = f"{self.core_node.node_dir}/default.config"
+        # Overrides are typed in on every run, so a file with overrides cannot be tracked in the manifest
+        append_overrides = os.getenv(APPEND_DEFAULT_CONFIG_OVERIDES) is not None
+        inputs = ArtifactManifest.template_inputs("systemd-default.config.j2",
+                                                  [dict(self), self.common_config.genesis_json_location])
+        if manifest and not append_overrides and manifest.is_up_to_date(file_location, inputs):
+            Helpers.print_info(f"{file_location} is up to date")
+            return False
+        if backup_time:
+            Base.backup_file(self.core_node.node_dir, "default.config", backup_time, auto_approve)
         Renderer().load_file_based_template("systemd-default.config.j2").render(
-            dict(self)).to_file(f"{self.core_node.node_dir}/default.config")
+            dict(self)).to_file(file_location)
 
-        if (os.getenv(APPEND_DEFAULT_CONFIG_OVERIDES)) is not None:
+        if append_overrides:
             print("Add overides")
             lines = []
             while True:
@@ -236,16 +266,29 @@ class SystemDSettings(BaseConfig):
                     lines.append(line)
                 else:
                     break
-            for text in lines:
-                run_shell_command(f"echo {text} >> {self.core_node.node_dir}/default.config", shell=True)
+            Host.instance().append_lines(file_location, lines)
+        elif manifest:
+            manifest.record(file_location, inputs)
+        return True
 
     def create_service_file(self,
-                            service_file_path="/etc/systemd/system/radixdlt-node.service"):
+                            service_file_path="/etc/systemd/system/radixdlt-node.service",
+                            manifest: ArtifactManifest = None, backup_time=None, auto_approve=None,
+                            plan: SudoPlan = None):
+        inputs = ArtifactManifest.template_inputs("systemd.service.j2", dict(self))
+        if manifest and manifest.is_up_to_date(service_file_path, inputs):
+            Helpers.print_info(f"{service_file_path} is up to date")
+            return False
+        if backup_time:
+            Base.backup_file(os.path.dirname(service_file_path), os.path.basename(service_file_path), backup_time,
+                             auto_approve)
         # This may need to be moved to jinja template
         tmp_service: str = "/tmp/radixdlt-node.service"
         Renderer().load_file_based_template("systemd.service.j2").render(dict(self)).to_file(tmp_service)
-        command = f"sudo mv {tmp_service} {service_file_path}"
-        run_shell_command(command, shell=True)
+        SudoPlan.sudo(f"mv {tmp_service} {service_file_path}", plan)
+        if manifest:
+            manifest.record(service_file_path, inputs, content_file=tmp_service if plan else None)
+        return True
 
 
 def from_dict(dictionary: dict) -> SystemDSettings:
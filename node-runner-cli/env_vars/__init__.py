@@ -24,4 +24,6 @@ RADIXDLT_APP_VERSION_OVERRIDE = "RADIXDLT_APP_VERSION_OVERRIDE"
 RADIXDLT_NGINX_VERSION_OVERRIDE = "RADIXDLT_NGINX_VERSION_OVERRIDE"
 RADIXDLT_CLI_VERSION_OVERRIDE = "RADIXDLT_CLI_VERSION_OVERRIDE"
 RADIXDLT_GATEWAY_VERSION_OVERRIDE = "RADIXDLT_GATEWAY_VERSION_OVERRIDE"
+RADIXNODE_CACHE_DIR = "RADIXNODE_CACHE_DIR"
+DOCKER_HOST = "DOCKER_HOST"
 NODE_END_POINT = "NODE_END_POINT"
@@ -1,27 +1,51 @@
 import hashlib
+from typing import Iterable, Iterator
 
 import bech32
 import ecdsa
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
 from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat, NoEncryption
 from cryptography.hazmat.primitives.serialization import pkcs12
 from ecdsa import SigningKey
 from ecdsa.util import sigencode_der
 
 
+SIGNING_BACKENDS = ["cryptography", "ecdsa"]
+SHA256_DIGEST_SIZE = 32
+
+
 class KeyInteraction:
+    """
+    Signs with the OpenSSL backed ECDSA of `cryptography` by default. The pure Python `ecdsa` backend is kept
+    for comparison, both return the signature of the digest as hex encoded DER.
+    """
     private_signing_key: SigningKey = None
+    private_key: ec.EllipticCurvePrivateKey = None
 
-    def __init__(self, keystore_password: bytes, keystore_path):
-        self.set_private_signing_key(keystore_path, keystore_password)
+    def __init__(self, keystore_password: bytes, keystore_path=None, keystore_bytes: bytes = None,
+                 signing_backend="cryptography"):
+        if signing_backend not in SIGNING_BACKENDS:
+            raise ValueError(f"Unknown signing backend {signing_backend}, expected one of {SIGNING_BACKENDS}")
+        self.signing_backend = signing_backend
+        if keystore_bytes is not None:
+            self.set_private_signing_key_from_bytes(keystore_bytes, keystore_password)
+        else:
+            self.set_private_signing_key(keystore_path, keystore_password)
 
     def set_private_signing_key(self, keystore_path: bytes, keystore_password):
         with open(keystore_path, "rb") as f:
-            private_key, certificate, additional_certificates = pkcs12.load_key_and_certificates(f.read(),
-                                                                                                 keystore_password,
-                                                                                                 default_backend())
-            private_key_bytes = private_key.private_bytes(Encoding.DER, PrivateFormat.PKCS8, NoEncryption())
-            self.private_signing_key: SigningKey = ecdsa.SigningKey.from_der(private_key_bytes, hashfunc=hashlib.sha256)
+            self.set_private_signing_key_from_bytes(f.read(), keystore_password)
+
+    def set_private_signing_key_from_bytes(self, keystore_bytes: bytes, keystore_password):
+        private_key, certificate, additional_certificates = pkcs12.load_key_and_certificates(keystore_bytes,
+                                                                                             keystore_password,
+                                                                                             default_backend())
+        self.private_key = private_key
+        private_key_bytes = private_key.private_bytes(Encoding.DER, PrivateFormat.PKCS8, NoEncryption())
+        self.private_signing_key: SigningKey = ecdsa.SigningKey.from_der(private_key_bytes, hashfunc=hashlib.sha256)
 
     def get_verifying_key(self):
         return self.private_signing_key.get_verifying_key()
@@ -43,5 +67,15 @@ class KeyInteraction:
         return validator_wallet_address
 
     def sign_payload(self, payload_to_sign):
-        return self.private_signing_key.sign_digest(bytearray.fromhex(payload_to_sign),
-                                                    sigencode=sigencode_der).hex()
+        return self.sign_digest(bytes.fromhex(payload_to_sign)).hex()
+
+    def sign_digest(self, digest: bytes) -> bytes:
+        # OpenSSL only accepts a prehashed digest of the size of the hash, other sizes are left to ecdsa
+        if self.signing_backend == "cryptography" and len(digest) == SHA256_DIGEST_SIZE:
+            return self.private_key.sign(digest, ec.ECDSA(Prehashed(hashes.SHA256())))
+        return self.private_signing_key.sign_digest(digest, sigencode=sigencode_der)
+
+    def sign_many(self, digests: Iterable) -> Iterator[str]:
+        """Signs a stream of hex encoded digests, yielding the hex encoded DER signatures in the same order"""
+        for digest in digests:
+            yield self.sign_digest(bytes.fromhex(digest)).hex()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from key_interaction.KeyInteraction import KeyInteraction
+from utils.utils import Helpers
+
+
+def inspect_keystore(keystore_bytes: bytes, keystore_password: bytes) -> dict:
+    """Runs in a worker process, decrypting the keystore is the expensive part"""
+    key = KeyInteraction(keystore_password, keystore_bytes=keystore_bytes)
+    return {
+        "validator_hex_public_key": key.get_validator_hex_public_key(),
+        "validator_address": key.get_validator_address(),
+        "validator_wallet_address": key.get_validator_wallet_address()
+    }
+
+
+def inspect_keystore_or_error(keystore_bytes: bytes, keystore_password: bytes) -> dict:
+    try:
+        return inspect_keystore(keystore_bytes, keystore_password)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+class KeystoreBatch:
+    """
+    Prints the public key and addresses of many keystores as JSON lines, decrypting them on a process pool.
+    The public data is cached by the SHA-256 of the keystore file and a digest of the password, so a keystore that
+    was decrypted once with the password is not decrypted again, while another password is never a cache hit.
+    The digest is a salted PBKDF2, as slow to guess from the cache as the keystore itself is.
+    """
+    password_digest_iterations = 200000
+
+    def __init__(self, keystore_password: bytes, jobs=None, use_cache=True, cache_file=None):
+        self.keystore_password = keystore_password
+        self.jobs = jobs or os.cpu_count()
+        self.use_cache = use_cache
+        self.cache_file = cache_file or os.path.join(Helpers.get_cache_dir(), "keystores.json")
+
+    @staticmethod
+    def keystore_files(batch: str) -> list:
+        """A directory is searched recursively, any other file is a manifest listing one keystore per line"""
+        if os.path.isdir(batch):
+            return sorted(os.path.join(root, name) for root, _, names in os.walk(batch) for name in names)
+        base_dir = os.path.dirname(os.path.abspath(batch))
+        with open(batch) as f:
+            lines = [line.strip() for line in f]
+        return [os.path.join(base_dir, line) for line in lines if line and not line.startswith("#")]
+
+    def load_cache(self) -> dict:
+        """A cache without a salt is from a version that did not key entries by the password, it is dropped"""
+        cache = {}
+        if self.use_cache and os.path.isfile(self.cache_file):
+            try:
+                with open(self.cache_file) as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                pass
+        if "salt" not in cache:
+            cache = {"salt": os.urandom(16).hex(), "keystores": {}}
+        return cache
+
+    def password_digest(self, salt: str) -> str:
+        return hashlib.pbkdf2_hmac("sha256", self.keystore_password, bytes.fromhex(salt),
+                                   KeystoreBatch.password_digest_iterations).hex()
+
+    def save_cache(self, cache: dict):
+        if not self.use_cache:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            fd = os.open(f"{self.cache_file}.tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.replace(f"{self.cache_file}.tmp", self.cache_file)
+        except OSError as e:
+            print(f"Could not update the keystore cache {self.cache_file}: {e}")
+
+    def inspect(self, keystore_files: list):
+        """Yields one result per keystore file, in the order of the files"""
+        cache = self.load_cache()
+        cached_keystores = cache["keystores"]
+        password_digest = self.password_digest(cache["salt"]) if self.use_cache else None
+        results = {}
+        to_decrypt = {}
+        for keystore_file in keystore_files:
+            try:
+                with open(keystore_file, "rb") as f:
+                    keystore_bytes = f.read()
+            except OSError as e:
+                results[keystore_file] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            file_hash = hashlib.sha256(keystore_bytes).hexdigest()
+            results[keystore_file] = {"sha256": file_hash}
+            if f"{file_hash}:{password_digest}" in cached_keystores:
+                results[keystore_file].update(cached_keystores[f"{file_hash}:{password_digest}"], cached=True)
+            else:
+                to_decrypt.setdefault(file_hash, keystore_bytes)
+
+        if to_decrypt:
+            hashes = list(to_decrypt)
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(hashes))) as executor:
+                decrypted = dict(zip(hashes, executor.map(inspect_keystore_or_error,
+                                                          [to_decrypt[file_hash] for file_hash in hashes],
+                                                          [self.keystore_password] * len(hashes))))
+            for file_hash, public_data in decrypted.items():
+                if "error" not in public_data:
+                    cached_keystores[f"{file_hash}:{password_digest}"] = public_data
+            for result in results.values():
+                if result.get("sha256") in decrypted:
+                    result.update(decrypted[result["sha256"]], cached=False)
+            self.save_cache(cache)
+
+        for keystore_file in keystore_files:
+            yield dict({"file": keystore_file}, **results[keystore_file])
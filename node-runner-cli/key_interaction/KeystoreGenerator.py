@@ -0,0 +1,43 @@
+import datetime
+import os
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import BestAvailableEncryption, NoEncryption
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
+
+
+class KeystoreGenerator:
+    """
+    Creates the node keystore in process, in place of the radixdlt/keygen container: a secp256k1 key under the
+    alias `node` with a self-signed certificate, in a PKCS12 file protected by the keystore password.
+    """
+    key_pair_name = "node"
+
+    @staticmethod
+    def create_keystore(keystore_password: str, key_pair_name: str = key_pair_name) -> bytes:
+        private_key = ec.generate_private_key(ec.SECP256K1())
+        subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Radix Self-Signed")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = x509.CertificateBuilder() \
+            .subject_name(subject) \
+            .issuer_name(subject) \
+            .public_key(private_key.public_key()) \
+            .serial_number(x509.random_serial_number()) \
+            .not_valid_before(now - datetime.timedelta(days=1)) \
+            .not_valid_after(now + datetime.timedelta(days=365 * 100)) \
+            .sign(private_key, hashes.SHA256())
+        encryption = BestAvailableEncryption(keystore_password.encode("utf-8")) if keystore_password \
+            else NoEncryption()
+        return pkcs12.serialize_key_and_certificates(key_pair_name.encode("utf-8"), private_key, certificate, None,
+                                                     encryption)
+
+    @staticmethod
+    def write_keystore(keystore_file: str, keystore_password: str):
+        """Writes a new keystore, an existing file is never overwritten"""
+        keystore = KeystoreGenerator.create_keystore(keystore_password)
+        with open(keystore_file, "xb") as f:
+            f.write(keystore)
+        os.chmod(keystore_file, 0o644)
@@ -0,0 +1,123 @@
+import json
+import re
+
+import requests
+
+from config.Renderer import Renderer
+from monitoring.PrometheusText import PrometheusText
+from utils.utils import Helpers
+
+DASHBOARD_FILES = ["babylon-node-dashboard.json", "babylon-jvm-dashboard.json", "network-gateway-dashboard.json"]
+# Same as the longest scrape_timeout ScrapeTuning suggests, a target that does not answer must not hang the CLI
+SCRAPE_TIMEOUT_SECONDS = 30
+TARGETS = {"monitor_core": "mynode", "monitor_gateway_api": "gateway", "monitor_aggregator": "aggregator"}
+
+PROMQL_STRING = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+PROMQL_GROUPING = re.compile(r"\b(?:by|without|on|ignoring|group_left|group_right)\s*\([^)]*\)")
+PROMQL_IGNORED = re.compile(r"\{[^}]*\}|\[[^\]]*\]|\$\{[^}]*\}|\$\w+")
+PROMQL_IDENTIFIER = re.compile(r"(?<![\w:.])([a-zA-Z_:][a-zA-Z0-9_:]*)(\s*\()?")
+PROMQL_KEYWORDS = {"and", "or", "unless", "bool", "offset", "by", "without", "on", "ignoring", "group_left",
+                   "group_right", "inf", "nan"}
+
+
+class Cardinality:
+    """
+    Counts the series every configured Prometheus target exposes, per metric family and label, and finds the
+    families that none of the bundled Grafana dashboards query. Those families can be dropped at scrape time
+    with metric_relabel_configs.
+    """
+
+    @staticmethod
+    def targets(monitoring_config: dict) -> dict:
+        """Prometheus job name to the target settings of the monitoring config"""
+        return {job: monitoring_config[key] for key, job in TARGETS.items() if monitoring_config.get(key)}
+
+    @staticmethod
+    def scrape(target: dict, timeout=SCRAPE_TIMEOUT_SECONDS) -> str:
+        url = f"{target.get('scheme', 'https')}://{target['metrics_target']}{target['metrics_path']}"
+        headers = {}
+        if target.get("basic_auth_user"):
+            headers = Helpers.get_basic_auth_header({"name": target["basic_auth_user"],
+                                                     "password": target.get("basic_auth_password", "")})
+        prepared = requests.Request("GET", url, headers=headers).prepare()
+        resp = Helpers.send_request(prepared, print_response=False, timeout=timeout)
+        if not resp.ok:
+            raise requests.exceptions.HTTPError(f"{url} returned {resp.status_code}", response=resp)
+        return resp.content.decode("utf-8")
+
+    @staticmethod
+    def analyze(metrics_text: str) -> dict:
+        """Per metric family: the number of series, the sample names and the number of values of every label"""
+        types = PrometheusText.types(metrics_text)
+        families = {}
+        for name, labels, _ in PrometheusText.parse(metrics_text):
+            family = families.setdefault(PrometheusText.family(name, types),
+                                         {"series": 0, "names": set(), "labels": {}})
+            family["series"] += 1
+            family["names"].add(name)
+            for label, value in labels.items():
+                family["labels"].setdefault(label, set()).add(value)
+        return families
+
+    @staticmethod
+    def promql_metrics(expression: str) -> set:
+        """Metric names an expression selects, functions, keywords, label names and grafana variables excluded"""
+        expression = PROMQL_STRING.sub(" ", expression)
+        expression = PROMQL_GROUPING.sub(" ", expression)
+        expression = PROMQL_IGNORED.sub(" ", expression)
+        return {name for name, call in PROMQL_IDENTIFIER.findall(expression)
+                if not call and name.lower() not in PROMQL_KEYWORDS}
+
+    @staticmethod
+    def dashboard_expressions(dashboard) -> list:
+        """The panel expressions and templating queries of a grafana dashboard"""
+        if isinstance(dashboard, list):
+            return [expression for item in dashboard for expression in Cardinality.dashboard_expressions(item)]
+        if not isinstance(dashboard, dict):
+            return []
+        expressions = []
+        for key, value in dashboard.items():
+            if key in ("expr", "query") and isinstance(value, str):
+                expressions.append(value)
+            else:
+                expressions.extend(Cardinality.dashboard_expressions(value))
+        return expressions
+
+    @staticmethod
+    def dashboard_metrics(dashboard_files=None) -> set:
+        metrics = set()
+        for file in dashboard_files or DASHBOARD_FILES:
+            dashboard = json.loads(Renderer().load_file_based_template(f"{file}.j2").render({}).rendered)
+            for expression in Cardinality.dashboard_expressions(dashboard):
+                metrics |= Cardinality.promql_metrics(expression)
+        return metrics
+
+    @staticmethod
+    def unused_families(families: dict, used_metrics: set) -> list:
+        return sorted(family for family, details in families.items()
+                      if family not in used_metrics and not details["names"] & used_metrics)
+
+    @staticmethod
+    def dropped_metrics(families: dict, unused_families: list) -> list:
+        """The exact sample names of the unused families, so a used family sharing a prefix is never dropped"""
+        return sorted(name for family in unused_families for name in families[family]["names"])
+
+    @staticmethod
+    def metric_relabel_configs(dropped_metrics: list) -> list:
+        if not dropped_metrics:
+            return []
+        return [{"source_labels": ["__name__"], "regex": "|".join(dropped_metrics), "action": "drop"}]
+
+    @staticmethod
+    def report(job: str, families: dict, unused_families: list, top=20) -> str:
+        total = sum(details["series"] for details in families.values())
+        unused = sum(families[family]["series"] for family in unused_families)
+        lines = [f"Target {job}: {total} series in {len(families)} metric families. "
+                 f"{len(unused_families)} families with {unused} series are not used by the dashboards",
+                 f"{'family':55} {'series':>7} {'used':>5}  labels (values)"]
+        for family, details in sorted(families.items(), key=lambda item: (-item[1]["series"], item[0]))[:top]:
+            labels = " ".join(f"{label}({len(values)})" for label, values in
+                              sorted(details["labels"].items(), key=lambda item: -len(item[1])))
+            used = "no" if family in unused_families else "yes"
+            lines.append(f"{family:55} {details['series']:7} {used:>5}  {labels}")
+        return "\n".join(lines)
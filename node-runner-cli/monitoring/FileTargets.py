@@ -0,0 +1,67 @@
+import json
+import os
+
+TARGETS_FILE_NAME = "targets.json"
+
+
+class FileTargets:
+    """
+    The nodes scraped by the `nodes` job, kept in the file_sd_configs format in the folder prometheus mounts on
+    /nodes. Prometheus watches the file, so a target that is added or removed is picked up without a restart.
+    Every target is its own group, so it can have its own labels.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.file_location = os.path.join(directory, TARGETS_FILE_NAME)
+
+    def load(self) -> list:
+        if not os.path.isfile(self.file_location):
+            return []
+        with open(self.file_location) as f:
+            return json.load(f)
+
+    def save(self, groups: list):
+        """Replaces the file in one rename, prometheus never reads a partly written file"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self.file_location}.tmp", "w") as f:
+            json.dump(groups, f, indent=2)
+        os.chmod(f"{self.file_location}.tmp", 0o644)
+        os.replace(f"{self.file_location}.tmp", self.file_location)
+
+    def targets(self) -> dict:
+        return {target: group.get("labels", {}) for group in self.load() for target in group["targets"]}
+
+    def add(self, targets: list, labels: dict) -> list:
+        """Returns the targets that were added or had their labels changed"""
+        current = self.targets()
+        changed = [target for target in targets if current.get(target) != labels]
+        for target in targets:
+            current[target] = labels
+        if changed:
+            self.save(FileTargets.groups(current))
+        return changed
+
+    def remove(self, targets: list) -> list:
+        current = self.targets()
+        removed = [target for target in targets if target in current]
+        for target in removed:
+            del current[target]
+        if removed:
+            self.save(FileTargets.groups(current))
+        return removed
+
+    @staticmethod
+    def groups(targets: dict) -> list:
+        return [{"targets": [target], "labels": labels} if labels else {"targets": [target]}
+                for target, labels in sorted(targets.items())]
+
+    @staticmethod
+    def parse_labels(labels: list) -> dict:
+        parsed = {}
+        for label in labels or []:
+            name, separator, value = label.partition("=")
+            if not separator or not name:
+                raise ValueError(f"Label {label} is not in the format name=value")
+            parsed[name] = value
+        return parsed
@@ -0,0 +1,196 @@
+import fcntl
+import os
+import re
+import socket
+import struct
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from monitoring.PrometheusText import PrometheusText
+
+SECTOR_BYTES = 512
+IGNORED_DEVICES = re.compile(r"^(loop|ram|zram|fd|sr)\d+$")
+DEFAULT_PROCESS_MATCH = "com.radixdlt"
+DEFAULT_PORT = 9101
+LOOPBACK_ADDRESS = "127.0.0.1"
+DOCKER_BRIDGE = "docker0"
+SIOCGIFADDR = 0x8915
+
+
+class HostExporter:
+    """
+    Collects the host metrics the node does not export: the usage of the filesystem of the data directory, the
+    I/O of every block device from /proc/diskstats and the memory, file descriptors, threads and CPU of the node
+    process from /proc/<pid>. Latency and throughput are exported as counters like node_exporter does, e.g.
+    rate(radixnode_host_disk_write_time_seconds_total[1m]) / rate(radixnode_host_disk_writes_completed_total[1m]).
+    A collection only reads a few small files, the process is looked up again only when it is gone.
+    """
+
+    def __init__(self, data_directory: str, process_match=DEFAULT_PROCESS_MATCH, proc="/proc"):
+        self.data_directory = data_directory
+        self.process_match = process_match
+        self.proc = proc
+        self.pid = None
+        self.device = None
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def read(self, *path) -> str:
+        with open(os.path.join(self.proc, *path), "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+
+    def is_node_process(self, pid: str) -> bool:
+        try:
+            cmdline = self.read(pid, "cmdline").replace("\0", " ")
+        except OSError:
+            return False
+        return "java" in cmdline and self.process_match in cmdline
+
+    def find_pid(self):
+        if self.pid and self.is_node_process(self.pid):
+            return self.pid
+        own_pid = str(os.getpid())
+        self.pid = next((entry for entry in sorted(os.listdir(self.proc), key=lambda entry: (len(entry), entry))
+                         if entry.isdigit() and entry != own_pid and self.is_node_process(entry)), None)
+        return self.pid
+
+    def collect(self) -> str:
+        lines = []
+        self.collect_filesystem(lines)
+        self.collect_diskstats(lines)
+        self.collect_process(lines)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def add(lines: list, name: str, metric_type: str, help_text: str, samples: list):
+        """Samples are a list of the labels and the value"""
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"])
+        for labels, value in samples:
+            lines.append(f"{PrometheusText.series_key(name, labels)} {value}")
+
+    def data_device(self):
+        """The name of the block device of the data directory, as in /proc/diskstats"""
+        if self.device is not None:
+            return self.device
+        self.device = ""
+        st_dev = os.stat(self.data_directory).st_dev
+        for line in self.read("diskstats").splitlines():
+            fields = line.split()
+            if len(fields) > 3 and (int(fields[0]), int(fields[1])) == (os.major(st_dev), os.minor(st_dev)):
+                self.device = fields[2]
+        return self.device
+
+    def collect_filesystem(self, lines: list):
+        try:
+            stat = os.statvfs(self.data_directory)
+            labels = {"path": self.data_directory, "device": self.data_device()}
+        except OSError:
+            return
+        self.add(lines, "radixnode_host_filesystem_size_bytes", "gauge",
+                 "Size of the filesystem of the data directory", [(labels, stat.f_blocks * stat.f_frsize)])
+        self.add(lines, "radixnode_host_filesystem_avail_bytes", "gauge",
+                 "Space of the filesystem of the data directory available to the node",
+                 [(labels, stat.f_bavail * stat.f_frsize)])
+        self.add(lines, "radixnode_host_filesystem_files", "gauge",
+                 "Inodes of the filesystem of the data directory", [(labels, stat.f_files)])
+        self.add(lines, "radixnode_host_filesystem_files_free", "gauge",
+                 "Free inodes of the filesystem of the data directory", [(labels, stat.f_ffree)])
+
+    def collect_diskstats(self, lines: list):
+        try:
+            diskstats = self.read("diskstats")
+        except OSError:
+            return
+        devices = []
+        for line in diskstats.splitlines():
+            fields = line.split()
+            if len(fields) < 14 or IGNORED_DEVICES.match(fields[2]):
+                continue
+            devices.append(({"device": fields[2]}, [int(field) for field in fields[3:14]]))
+        # The fields of /proc/diskstats, in the order of Documentation/admin-guide/iostats.rst
+        for name, metric_type, help_text, index, scale in [
+            ("reads_completed_total", "counter", "Reads completed", 0, 1),
+            ("read_bytes_total", "counter", "Bytes read", 2, SECTOR_BYTES),
+            ("read_time_seconds_total", "counter", "Time spent by all reads", 3, 0.001),
+            ("writes_completed_total", "counter", "Writes completed", 4, 1),
+            ("written_bytes_total", "counter", "Bytes written", 6, SECTOR_BYTES),
+            ("write_time_seconds_total", "counter", "Time spent by all writes", 7, 0.001),
+            ("io_now", "gauge", "I/Os in progress", 8, 1),
+            ("io_time_seconds_total", "counter", "Time the device was busy", 9, 0.001),
+        ]:
+            self.add(lines, f"radixnode_host_disk_{name}", metric_type, help_text,
+                     [(labels, values[index] * scale) for labels, values in devices])
+
+    def collect_process(self, lines: list):
+        pid = self.find_pid()
+        self.add(lines, "radixnode_host_process_up", "gauge", "Whether the node process was found",
+                 [({}, 1 if pid else 0)])
+        if not pid:
+            return
+        try:
+            # The fields after the command, which is in parentheses and can contain spaces
+            stat = self.read(pid, "stat").rsplit(")", 1)[1].split()
+            limits = self.read(pid, "limits")
+        except OSError:
+            return
+        labels = {}
+        self.add(lines, "radixnode_host_process_cpu_seconds_total", "counter", "User and system CPU time",
+                 [(labels, (int(stat[11]) + int(stat[12])) / self.clock_ticks)])
+        self.add(lines, "radixnode_host_process_resident_memory_bytes", "gauge", "Resident memory",
+                 [(labels, int(stat[21]) * self.page_size)])
+        self.add(lines, "radixnode_host_process_threads", "gauge", "Threads", [(labels, int(stat[17]))])
+        try:
+            open_fds = len(os.listdir(os.path.join(self.proc, pid, "fd")))
+            self.add(lines, "radixnode_host_process_open_fds", "gauge", "Open file descriptors",
+                     [(labels, open_fds)])
+        except OSError:
+            # Only the owner of the process or root can list its file descriptors
+            pass
+        max_fds = re.search(r"^Max open files\s+(\d+)", limits, re.MULTILINE)
+        if max_fds:
+            self.add(lines, "radixnode_host_process_max_fds", "gauge", "Limit of open file descriptors",
+                     [(labels, int(max_fds.group(1)))])
+
+    def write_textfile(self, file_location: str):
+        """Replaces the file in one rename, a textfile collector never reads a partly written file"""
+        with open(f"{file_location}.tmp", "w") as f:
+            f.write(self.collect())
+        os.replace(f"{file_location}.tmp", file_location)
+
+    @staticmethod
+    def interface_address(interface: str):
+        """The IPv4 address of a network interface, None when there is no such interface"""
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                request = struct.pack("256s", interface.encode("utf-8")[:15])
+                return socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)[20:24])
+        except OSError:
+            return None
+
+    @staticmethod
+    def default_address() -> str:
+        """
+        The metrics are served without authentication, so not on the public address of the host. The address of
+        the docker bridge can be reached by the prometheus container and not from outside the host
+        """
+        return HostExporter.interface_address(DOCKER_BRIDGE) or LOOPBACK_ADDRESS
+
+    def http_server(self, port: int, address=LOOPBACK_ADDRESS):
+        """A server of the metrics on /metrics, they are collected when they are scraped"""
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.collect().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ThreadingHTTPServer((address, port), MetricsHandler)
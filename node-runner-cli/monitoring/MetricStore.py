@@ -0,0 +1,138 @@
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+from fnmatch import fnmatchcase
+
+from monitoring.PrometheusText import PrometheusText
+
+HEADER_SIZE = 8
+DEFAULT_SERIES = ["rn_sync_current_state_version", "rn_sync_target_state_version", "rn_misc_peer_count",
+                  "rn_epoch_manager_current_epoch", "rn_bft_validator_count", "process_cpu_seconds_total",
+                  "jvm_memory_bytes_used"]
+
+
+class MetricStore:
+    """
+    Keeps the recent history of a fixed set of series in a ring buffer of doubles, in a file that is memory mapped.
+    Each row holds the scrape timestamp followed by one value per series, and a row is overwritten once the buffer
+    has wrapped around. The size of the file is fixed when the store is created: capacity * (series + 1) * 8 bytes.
+    """
+    series_file_name = "series.json"
+    samples_file_name = "samples.ring"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MetricStore.series_file_name)) as f:
+            layout = json.load(f)
+        self.capacity = layout["capacity"]
+        self.series = layout["series"]
+        self.row_width = len(self.series) + 1
+        self.file = open(os.path.join(directory, MetricStore.samples_file_name), "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        if len(self.map) != HEADER_SIZE + self.capacity * self.row_width * 8:
+            self.close()
+            raise ValueError(f"{directory}/{MetricStore.samples_file_name} does not match {MetricStore.series_file_name}")
+        self.header = memoryview(self.map)[:HEADER_SIZE].cast("Q")
+        self.rows = memoryview(self.map)[HEADER_SIZE:].cast("d")
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.isfile(os.path.join(directory, MetricStore.series_file_name))
+
+    @staticmethod
+    def create(directory: str, series: list, capacity: int):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, MetricStore.samples_file_name), "wb") as f:
+            f.write(struct.pack("Q", 0))
+            f.truncate(HEADER_SIZE + capacity * (len(series) + 1) * 8)
+        with open(os.path.join(directory, MetricStore.series_file_name), "w") as f:
+            json.dump({"capacity": capacity, "series": series}, f, indent=2)
+        return MetricStore(directory)
+
+    @staticmethod
+    def select_series(metrics_text: str, patterns: list) -> list:
+        """Series whose metric name or full series key matches one of the glob patterns"""
+        selected = {}
+        for name, labels, _ in PrometheusText.parse(metrics_text):
+            key = PrometheusText.series_key(name, labels)
+            if any(fnmatchcase(name, pattern) or fnmatchcase(key, pattern) for pattern in patterns):
+                selected[key] = True
+        return list(selected)
+
+    def close(self):
+        for view in ("header", "rows"):
+            if getattr(self, view, None) is not None:
+                getattr(self, view).release()
+                setattr(self, view, None)
+        self.map.close()
+        self.file.close()
+
+    @property
+    def count(self) -> int:
+        return self.header[0]
+
+    def append(self, timestamp: float, values: dict):
+        """Values of series that were not scraped are stored as NaN"""
+        offset = (self.count % self.capacity) * self.row_width
+        self.rows[offset] = timestamp
+        for index, key in enumerate(self.series):
+            self.rows[offset + 1 + index] = values.get(key, math.nan)
+        self.header[0] = self.count + 1
+
+    def record(self, metrics_text: str, timestamp: float) -> int:
+        wanted = set(self.series)
+        values = {}
+        for name, labels, value in PrometheusText.parse(metrics_text):
+            key = PrometheusText.series_key(name, labels)
+            if key in wanted:
+                values[key] = value
+        self.append(timestamp, values)
+        return len(values)
+
+    def window(self, series_key: str, since: float = 0.0) -> tuple:
+        """Timestamps and values of one series from `since` on, oldest first"""
+        index = self.series.index(series_key) + 1
+        timestamps, values = array("d"), array("d")
+        for position in range(max(0, self.count - self.capacity), self.count):
+            offset = (position % self.capacity) * self.row_width
+            timestamp, value = self.rows[offset], self.rows[offset + index]
+            if timestamp >= since and not math.isnan(value):
+                timestamps.append(timestamp)
+                values.append(value)
+        return timestamps, values
+
+    @staticmethod
+    def summarize(timestamps: array, values: array, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        if not values:
+            return {"samples": 0}
+        ordered = sorted(values)
+        summary = {
+            "samples": len(values),
+            "min": ordered[0],
+            "max": ordered[-1],
+            "avg": sum(values) / len(values),
+            "rate": MetricStore.rate(timestamps, values)
+        }
+        for quantile in quantiles:
+            summary[f"p{quantile * 100:g}"] = MetricStore.quantile(ordered, quantile)
+        return summary
+
+    @staticmethod
+    def rate(timestamps: array, values: array):
+        """Per second increase of a counter, a value lower than the previous one is a counter reset"""
+        if len(values) < 2 or timestamps[-1] == timestamps[0]:
+            return None
+        increase = 0.0
+        for previous, current in zip(values, values[1:]):
+            increase += current - previous if current >= previous else current
+        return increase / (timestamps[-1] - timestamps[0])
+
+    @staticmethod
+    def quantile(ordered: list, quantile: float) -> float:
+        position = (len(ordered) - 1) * quantile
+        lower = math.floor(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
@@ -0,0 +1,238 @@
+import math
+import time
+
+import requests
+
+from config.JavaOpts import JavaOpts
+from monitoring.MetricStore import MetricStore
+from monitoring.PrometheusText import PrometheusText
+from utils.utils import Helpers
+
+REPORT_METRICS = r"jvm_gc_collection_seconds_(sum|count)|jvm_memory_bytes_(used|max)|jvm_buffer_pool_used_bytes|" \
+                 r"rn_sync_(current|target)_state_version|rn_bft_.*"
+THRESHOLDS = {
+    "gc_time_percent": 5,
+    "gc_pause_p99_ms": 200,
+    "heap_used_percent": 85,
+    "direct_used_percent": 85,
+    "sync_lag": 1000,
+}
+# A range query over a long window can take a while on a busy Prometheus, but must not hang the report
+QUERY_TIMEOUT_SECONDS = 60
+
+
+def matches(labels: dict, wanted: dict) -> bool:
+    return all(labels.get(key) == value for key, value in wanted.items())
+
+
+def gigabytes(value) -> str:
+    return f"{value / 1024 ** 3:.2f} GB" if value is not None else "unknown"
+
+
+class PerfReport:
+    """
+    Summarises the performance of the node over a window from snapshots of its metrics: GC pauses, heap and direct
+    memory against the limits in java_opts, ledger throughput and sync lag, and consensus timings.
+    A snapshot is the timestamp and the samples of one scrape. The JVM only exports the total time and count of
+    the collections, so the pause percentiles are over the mean pause of each interval between two snapshots.
+    """
+
+    def __init__(self, snapshots: list, java_opts: str = None, thresholds: dict = None):
+        self.snapshots = sorted(snapshots, key=lambda snapshot: snapshot[0])
+        self.java_opts = java_opts
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self.lines = []
+        self.anomalies = []
+
+    @staticmethod
+    def sample_node(fetch_metrics, window: float, interval: float) -> list:
+        """Scrapes the node at the interval for the window, at least twice"""
+        snapshots = []
+        for index in range(max(2, int(window / interval) + 1)):
+            started = time.time()
+            snapshots.append((started, list(PrometheusText.parse(fetch_metrics()))))
+            if index < max(2, int(window / interval) + 1) - 1:
+                time.sleep(max(0.0, interval - (time.time() - started)))
+        return snapshots
+
+    @staticmethod
+    def query_prometheus(prometheus_url: str, window: float, step: float, job="mynode",
+                         timeout=QUERY_TIMEOUT_SECONDS) -> list:
+        """The same snapshots, from the series prometheus stored for the job over the window"""
+        end = time.time()
+        query = f'{{job="{job}",__name__=~"{REPORT_METRICS}"}}'
+        prepared = requests.Request("GET", f"{prometheus_url}/api/v1/query_range", params={
+            "query": query, "start": end - window, "end": end, "step": step}).prepare()
+        resp = Helpers.send_request(prepared, print_response=False, timeout=timeout)
+        if not resp.ok:
+            raise requests.exceptions.HTTPError(f"{prometheus_url} returned {resp.status_code}", response=resp)
+        snapshots = {}
+        for series in resp.json()["data"]["result"]:
+            labels = dict(series["metric"])
+            name = labels.pop("__name__")
+            for timestamp, value in series["values"]:
+                snapshots.setdefault(float(timestamp), []).append((name, labels, float(value)))
+        return sorted(snapshots.items())
+
+    def values(self, name: str, **labels) -> list:
+        """The timestamp and the sum of the matching samples of every snapshot that has the metric"""
+        values = []
+        for timestamp, samples in self.snapshots:
+            matching = [value for sample_name, sample_labels, value in samples
+                        if sample_name == name and matches(sample_labels, labels)]
+            if matching:
+                values.append((timestamp, sum(matching)))
+        return values
+
+    def label_values(self, name: str, label: str) -> list:
+        return sorted({sample_labels[label] for _, samples in self.snapshots
+                       for sample_name, sample_labels, _ in samples if sample_name == name and label in sample_labels})
+
+    def check(self, value, threshold: str, message: str):
+        if value is not None and value > self.thresholds[threshold]:
+            self.anomalies.append(f"{message} (threshold {self.thresholds[threshold]})")
+
+    def report(self) -> tuple:
+        if len(self.snapshots) < 2:
+            return ["At least two snapshots of the metrics are needed for a report"], []
+        self.lines = [f"Window of {self.snapshots[-1][0] - self.snapshots[0][0]:.0f}s, "
+                      f"{len(self.snapshots)} snapshots"]
+        self.anomalies = []
+        self.report_gc()
+        self.report_memory()
+        self.report_ledger()
+        self.report_consensus()
+        return self.lines, self.anomalies
+
+    def report_gc(self):
+        self.lines.append("\nGARBAGE COLLECTION")
+        duration = self.snapshots[-1][0] - self.snapshots[0][0]
+        for collector in self.label_values("jvm_gc_collection_seconds_count", "gc"):
+            counts = self.values("jvm_gc_collection_seconds_count", gc=collector)
+            sums = dict(self.values("jvm_gc_collection_seconds_sum", gc=collector))
+            pauses, collections, seconds = [], 0, 0.0
+            for (previous_time, previous_count), (current_time, current_count) in zip(counts, counts[1:]):
+                count_delta = current_count - previous_count
+                sum_delta = sums.get(current_time, 0) - sums.get(previous_time, 0)
+                if count_delta <= 0 or sum_delta < 0:
+                    continue
+                collections += count_delta
+                seconds += sum_delta
+                pauses.append(sum_delta / count_delta * 1000)
+            if not pauses:
+                self.lines.append(f"  {collector}: no collections")
+                continue
+            ordered = sorted(pauses)
+            p99 = MetricStore.quantile(ordered, 0.99)
+            time_percent = seconds / duration * 100 if duration else 0
+            self.lines.append(f"  {collector}: {collections:.0f} collections, {time_percent:.2f}% of the time, "
+                              f"pause p50 {MetricStore.quantile(ordered, 0.5):.1f} ms, "
+                              f"p90 {MetricStore.quantile(ordered, 0.9):.1f} ms, p99 {p99:.1f} ms, "
+                              f"max {ordered[-1]:.1f} ms")
+            self.check(time_percent, "gc_time_percent", f"{collector} spent {time_percent:.2f}% of the time in GC")
+            self.check(p99, "gc_pause_p99_ms", f"{collector} p99 pause is {p99:.1f} ms")
+
+    def report_memory(self):
+        self.lines.append("\nMEMORY")
+        heap_limit = JavaOpts.max_heap_bytes(self.java_opts)
+        jvm_heap_max = self.values("jvm_memory_bytes_max", area="heap")
+        if heap_limit is None and jvm_heap_max:
+            heap_limit = jvm_heap_max[-1][1]
+        heap_used = [value for _, value in self.values("jvm_memory_bytes_used", area="heap")]
+        self.report_headroom("heap", heap_used, heap_limit, "heap_used_percent")
+
+        # Without -XX:MaxDirectMemorySize the JVM allows as much direct memory as heap
+        direct_limit = JavaOpts.max_direct_memory_bytes(self.java_opts) or heap_limit
+        direct_used = [value for _, value in self.values("jvm_buffer_pool_used_bytes", pool="direct")]
+        self.report_headroom("direct memory", direct_used, direct_limit, "direct_used_percent")
+
+    def report_headroom(self, name, used: list, limit, threshold: str):
+        if not used:
+            self.lines.append(f"  {name}: not exported")
+            return
+        peak = max(used)
+        if not limit:
+            self.lines.append(f"  {name}: peak {gigabytes(peak)}, limit unknown")
+            return
+        used_percent = peak / limit * 100
+        self.lines.append(f"  {name}: peak {gigabytes(peak)} of {gigabytes(limit)} ({used_percent:.0f}%), "
+                          f"headroom {gigabytes(limit - peak)}")
+        self.check(used_percent, threshold, f"{name} peaked at {used_percent:.0f}% of its limit")
+
+    def report_ledger(self):
+        self.lines.append("\nLEDGER")
+        current = self.values("rn_sync_current_state_version")
+        target = dict(self.values("rn_sync_target_state_version"))
+        if len(current) < 2:
+            self.lines.append("  state version: not exported")
+            return
+        duration = current[-1][0] - current[0][0]
+        throughput = (current[-1][1] - current[0][1]) / duration if duration else 0
+        lags = [target[timestamp] - value for timestamp, value in current if timestamp in target]
+        self.lines.append(f"  state version {current[-1][1]:.0f}, {throughput:.2f} state versions/s")
+        if lags:
+            self.lines.append(f"  sync lag at the end {lags[-1]:.0f}, max {max(lags):.0f} state versions")
+            self.check(lags[-1], "sync_lag", f"the node is {lags[-1]:.0f} state versions behind")
+            if lags[-1] > 0 and throughput <= 0:
+                self.anomalies.append("the node is behind and its state version did not move")
+
+    def report_consensus(self):
+        self.lines.append("\nCONSENSUS")
+        names = sorted({name for _, samples in self.snapshots for name, _, _ in samples if name.startswith("rn_bft_")})
+        reported = False
+        for name in names:
+            if name.endswith("_bucket"):
+                family = name[:-len("_bucket")]
+                quantiles = self.histogram_quantiles(name, [0.5, 0.9, 0.99])
+                if quantiles:
+                    reported = True
+                    self.lines.append(f"  {family}: p50 {quantiles[0]:.3g}, p90 {quantiles[1]:.3g}, "
+                                      f"p99 {quantiles[2]:.3g}")
+            elif name.endswith("_sum") and f"{name[:-len('_sum')]}_bucket" not in names:
+                family = name[:-len("_sum")]
+                sums, counts = self.values(name), self.values(f"{family}_count")
+                if len(sums) > 1 and len(counts) > 1 and counts[-1][1] > counts[0][1]:
+                    reported = True
+                    mean = (sums[-1][1] - sums[0][1]) / (counts[-1][1] - counts[0][1])
+                    self.lines.append(f"  {family}: mean {mean:.3g} over {counts[-1][1] - counts[0][1]:.0f}")
+            elif "timeout" in name and not name.endswith("_count"):
+                values = self.values(name)
+                increase = values[-1][1] - values[0][1] if len(values) > 1 else 0
+                reported = True
+                self.lines.append(f"  {name}: {increase:.0f} in the window")
+                if increase > 0:
+                    self.anomalies.append(f"{name} increased by {increase:.0f}")
+        if not reported:
+            self.lines.append("  no round timings or timeouts exported")
+
+    def histogram_quantiles(self, bucket_name: str, quantiles: list):
+        """Like histogram_quantile over the increase of the buckets in the window"""
+        first, last = self.snapshots[0][1], self.snapshots[-1][1]
+
+        def buckets(samples):
+            counts = {}
+            for name, labels, value in samples:
+                if name == bucket_name:
+                    bound = float(labels.get("le", "+Inf"))
+                    counts[bound] = counts.get(bound, 0) + value
+            return counts
+
+        start, end = buckets(first), buckets(last)
+        increases = sorted((bound, end[bound] - start.get(bound, 0)) for bound in end)
+        if not increases or increases[-1][1] <= 0:
+            return None
+        total = increases[-1][1]
+        results = []
+        for quantile in quantiles:
+            rank = quantile * total
+            previous_bound, previous_count = 0.0, 0.0
+            for bound, count in increases:
+                if count >= rank:
+                    if math.isinf(bound):
+                        results.append(previous_bound)
+                    else:
+                        fraction = (rank - previous_count) / (count - previous_count) if count > previous_count else 1
+                        results.append(previous_bound + (bound - previous_bound) * fraction)
+                    break
+                previous_bound, previous_count = bound, count
+        return results
@@ -0,0 +1,59 @@
+import re
+
+SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+-?\d+)?$")
+ESCAPED = re.compile(r"\\(.)")
+TYPE_LINE = re.compile(r"^#\s*TYPE\s+([a-zA-Z_:][a-zA-Z0-9_:]*)\s+(\w+)")
+FAMILY_SUFFIXES = ["_bucket", "_sum", "_count", "_total", "_created"]
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+
+
+class PrometheusText:
+    """Parses the Prometheus text exposition format served on /prometheus/metrics"""
+
+    @staticmethod
+    def parse(text: str):
+        """Yields the name, the labels and the value of every sample"""
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            match = SAMPLE_LINE.match(line)
+            if not match:
+                continue
+            name, labels, value = match.groups()
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+            yield name, {key: PrometheusText.unescape(label_value) for key, label_value in
+                         LABEL.findall(labels or "")}, value
+
+    @staticmethod
+    def types(text: str) -> dict:
+        """The type declared by the # TYPE line of every metric family"""
+        return {match.group(1): match.group(2) for match in map(TYPE_LINE.match, text.splitlines()) if match}
+
+    @staticmethod
+    def family(name: str, types: dict) -> str:
+        """Histograms, summaries and counters expose samples with a suffix on the name of the family"""
+        if name in types:
+            return name
+        for suffix in FAMILY_SUFFIXES:
+            if name.endswith(suffix) and name[:-len(suffix)] in types:
+                return name[:-len(suffix)]
+        return name
+
+    @staticmethod
+    def unescape(label_value: str) -> str:
+        return ESCAPED.sub(lambda match: "\n" if match.group(1) == "n" else match.group(1), label_value)
+
+    @staticmethod
+    def escape(label_value: str) -> str:
+        return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @staticmethod
+    def series_key(name: str, labels: dict) -> str:
+        if not labels:
+            return name
+        label_text = ",".join(f'{key}="{PrometheusText.escape(value)}"' for key, value in sorted(labels.items()))
+        return f"{name}{{{label_text}}}"
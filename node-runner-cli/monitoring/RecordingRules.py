@@ -0,0 +1,159 @@
+import json
+import re
+
+from config.Renderer import Renderer
+
+RANGE_FUNCTION = re.compile(r"\b(rate|irate|increase)\s*\(")
+SELECTOR = re.compile(r"^\s*([a-zA-Z_:][a-zA-Z0-9_:]*)\s*(?:\{(.*)\})?\s*\[\s*(\d+)([smhdwy])\s*\]\s*$", re.S)
+MATCHER = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*("(?:[^"\\]|\\.)*")')
+AGGREGATION_BEFORE = re.compile(r"\b(sum|avg|min|max|count)\s*(?:(by|without)\s*\(([^)]*)\))?\s*\(\s*$")
+GROUPING_AFTER = re.compile(r"^\s*(by|without)\s*\(([^)]*)\)")
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+MAX_RANGE_SECONDS = 3600
+GROUP_NAME = "radixnode-dashboards"
+
+
+def closing_parenthesis(text: str, opening: int) -> int:
+    depth = 0
+    quote = None
+    escaped = False
+    for position in range(opening, len(text)):
+        character = text[position]
+        if quote:
+            if escaped:
+                escaped = False
+            elif character == "\\":
+                escaped = True
+            elif character == quote:
+                quote = None
+        elif character in "\"'":
+            quote = character
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return -1
+
+
+class RecordingRules:
+    """
+    Finds the rate(), irate() and increase() calls of the bundled dashboards, with the aggregation around them,
+    that can be precomputed by Prometheus: a fixed range of at most an hour and no Grafana variables.
+    Each of them becomes a recording rule and the dashboards query the recorded series instead.
+    Recorded series only exist from the time the rules are loaded, older data is not backfilled.
+    """
+
+    @staticmethod
+    def candidates(expression: str) -> list:
+        """The start, the end and the normalized form of every subexpression that can be recorded"""
+        found = []
+        for match in RANGE_FUNCTION.finditer(expression):
+            call_end = closing_parenthesis(expression, match.end() - 1)
+            if call_end < 0:
+                continue
+            selector = SELECTOR.match(expression[match.end():call_end])
+            if not selector or "$" in selector.group(0):
+                continue
+            metric, matchers, amount, unit = selector.groups()
+            if int(amount) * UNIT_SECONDS[unit] > MAX_RANGE_SECONDS:
+                continue
+            labels = ",".join(sorted(f"{name}{operator}{value}" for name, operator, value in
+                                     MATCHER.findall(matchers or "")))
+            call = f"{match.group(1)}({metric}{{{labels}}}[{amount}{unit}])" if labels else \
+                f"{match.group(1)}({metric}[{amount}{unit}])"
+            operation = f"{match.group(1)}{amount}{unit}"
+            start, end, normalized, name = match.start(), call_end + 1, call, f"{metric}:{operation}"
+
+            aggregation = AGGREGATION_BEFORE.search(expression[:match.start()])
+            if aggregation:
+                aggregation_end = closing_parenthesis(expression, expression.rindex("(", 0, match.start()))
+                if aggregation_end >= 0 and not expression[end:aggregation_end].strip():
+                    operator, grouping, grouping_labels = aggregation.groups()
+                    after = GROUPING_AFTER.match(expression[aggregation_end + 1:])
+                    end = aggregation_end + 1
+                    if not grouping and after:
+                        grouping, grouping_labels = after.groups()
+                        end += after.end()
+                    grouping_labels = [label.strip() for label in (grouping_labels or "").split(",") if label.strip()]
+                    start = aggregation.start()
+                    if grouping:
+                        normalized = f"{operator} {grouping} ({', '.join(grouping_labels)}) ({call})"
+                    else:
+                        normalized = f"{operator}({call})"
+                    level = "_".join(grouping_labels) if grouping == "by" and grouping_labels else operator
+                    name = f"{level}:{metric}:{operation}"
+            found.append((start, end, normalized, name))
+        # An aggregation contains its rate call, keep only the outermost span
+        return [candidate for candidate in found
+                if not any(other is not candidate and other[0] <= candidate[0] and candidate[1] <= other[1]
+                           for other in found)]
+
+    @staticmethod
+    def expressions(dashboard) -> list:
+        if isinstance(dashboard, list):
+            return [expression for item in dashboard for expression in RecordingRules.expressions(item)]
+        if not isinstance(dashboard, dict):
+            return []
+        expressions = []
+        for key, value in dashboard.items():
+            if key == "expr" and isinstance(value, str):
+                expressions.append(value)
+            else:
+                expressions.extend(RecordingRules.expressions(value))
+        return expressions
+
+    @staticmethod
+    def for_dashboards(dashboard_files: list) -> dict:
+        """Record name by normalized expression, over all the JSON dashboards"""
+        normalized_names = {}
+        for file in dashboard_files:
+            if not file.endswith(".json"):
+                continue
+            dashboard = json.loads(Renderer().load_file_based_template(f"{file}.j2").render({}).rendered)
+            for expression in RecordingRules.expressions(dashboard):
+                for _, _, normalized, name in RecordingRules.candidates(expression):
+                    normalized_names[normalized] = name
+        rules = {}
+        used_names = set()
+        for normalized in sorted(normalized_names):
+            name = normalized_names[normalized]
+            suffix = 2
+            while name in used_names:
+                name = f"{normalized_names[normalized]}_{suffix}"
+                suffix += 1
+            used_names.add(name)
+            rules[normalized] = name
+        return rules
+
+    @staticmethod
+    def rewrite(expression: str, rules: dict) -> str:
+        for start, end, normalized, _ in reversed(RecordingRules.candidates(expression)):
+            if normalized in rules:
+                expression = f"{expression[:start]}{rules[normalized]}{expression[end:]}"
+        return expression
+
+    @staticmethod
+    def rewrite_dashboard(rendered: str, rules: dict) -> str:
+        """Returns the dashboard as it was rendered when none of its queries is recorded"""
+        dashboard = json.loads(rendered)
+        changed = False
+
+        def walk(node):
+            nonlocal changed
+            children = node if isinstance(node, list) else node.values() if isinstance(node, dict) else []
+            if isinstance(node, dict) and isinstance(node.get("expr"), str):
+                expression = RecordingRules.rewrite(node["expr"], rules)
+                changed = changed or expression != node["expr"]
+                node["expr"] = expression
+            for child in children:
+                walk(child)
+
+        walk(dashboard)
+        return json.dumps(dashboard, indent=2) if changed else rendered
+
+    @staticmethod
+    def rules_file(rules: dict) -> dict:
+        return {"groups": [{"name": GROUP_NAME, "rules": [{"record": name, "expr": normalized}
+                                                          for normalized, name in rules.items()]}]}
@@ -0,0 +1,67 @@
+import math
+import re
+import time
+
+import requests
+
+from monitoring.Cardinality import Cardinality
+from monitoring.PrometheusText import PrometheusText
+
+DURATION = re.compile(r"^(\d+)(ms|s|m|h)$")
+DURATION_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+STANDARD_INTERVALS = [5, 10, 15, 30, 60, 120, 300]
+MAX_TIMEOUT_SECONDS = 30
+SECONDS_PER_MB = 10
+
+
+class ScrapeTuning:
+    """
+    Suggests the scrape interval, timeout and sample limit of a target from one measured scrape.
+    The timeout leaves room for three times the measured duration, the interval is at least twice the timeout and
+    grows with the size of the payload, and the sample limit is twice the number of series that were exposed.
+    """
+
+    @staticmethod
+    def duration_seconds(duration: str) -> float:
+        match = DURATION.match(str(duration).strip())
+        if not match:
+            raise ValueError(f"{duration} is not a duration like 500ms, 15s, 1m or 1h")
+        return int(match.group(1)) * DURATION_SECONDS[match.group(2)]
+
+    @staticmethod
+    def default_timeout(interval: str) -> str:
+        """Prometheus rejects a timeout longer than the interval, its default timeout is 10s"""
+        return interval if ScrapeTuning.duration_seconds(interval) <= 10 else "10s"
+
+    @staticmethod
+    def measure(target: dict) -> tuple:
+        started = time.perf_counter()
+        metrics_text = Cardinality.scrape(target)
+        elapsed = time.perf_counter() - started
+        series = sum(1 for _ in PrometheusText.parse(metrics_text))
+        return elapsed, len(metrics_text.encode("utf-8")), series
+
+    @staticmethod
+    def suggest(scrape_seconds: float, payload_bytes: int, series: int, base_interval: int) -> dict:
+        timeout = min(MAX_TIMEOUT_SECONDS, max(1, math.ceil(scrape_seconds * 3)))
+        minimum = max(base_interval, timeout * 2, payload_bytes / 1e6 * SECONDS_PER_MB)
+        interval = next((standard for standard in STANDARD_INTERVALS if standard >= minimum), STANDARD_INTERVALS[-1])
+        return {
+            "scrape_interval": f"{interval}s",
+            "scrape_timeout": f"{min(timeout, interval)}s",
+            "sample_limit": int(math.ceil(series * 2 / 1000) * 1000) if series else None
+        }
+
+    @staticmethod
+    def suggest_for_target(target: dict, base_interval: int):
+        """Returns None when the target cannot be scraped"""
+        try:
+            scrape_seconds, payload_bytes, series = ScrapeTuning.measure(target)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not scrape {target.get('metrics_target')} to suggest the scrape settings: {e}")
+            return None
+        suggestion = ScrapeTuning.suggest(scrape_seconds, payload_bytes, series, base_interval)
+        print(f"Scraped {series} series, {payload_bytes / 1024:.0f} KB in {scrape_seconds * 1000:.0f} ms from "
+              f"{target.get('metrics_target')}. Suggested interval {suggestion['scrape_interval']}, "
+              f"timeout {suggestion['scrape_timeout']}, sample limit {suggestion['sample_limit']}")
+        return suggestion
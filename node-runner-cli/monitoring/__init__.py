@@ -1,146 +1,138 @@
-import os
-import os.path
-import sys
 from pathlib import Path
 
-import requests
-import yaml
-
+from config.ArtifactManifest import ArtifactManifest
 from config.Renderer import Renderer
-from env_vars import COMPOSE_HTTP_TIMEOUT
-from utils.utils import Helpers, run_shell_command
+from monitoring.RecordingRules import RecordingRules
+from utils.DockerEngine import DockerEngine, DockerEngineError
+from utils.Host import Host
+from utils.utils import Helpers
+from utils.YamlIO import YamlIO
 
 
 class Monitoring:
+    dashboard_files = ["dashboard.yml", "babylon-node-dashboard.json", "babylon-jvm-dashboard.json",
+                       "network-gateway-dashboard.json"]
 
     @staticmethod
-    def setup_prometheus_yml(default_prometheus_yaml_url):
-        req = requests.Request('GET', f'{default_prometheus_yaml_url}')
-        prepared = req.prepare()
-
-        resp = Helpers.send_request(prepared, print_response=False)
-
-        if not resp.ok:
-            print(f" Errored downloading file {default_prometheus_yaml_url}. Exitting ... ")
-            sys.exit(1)
-
-        default_prometheus_yaml = yaml.safe_load(resp.content)
-        prometheus_yaml = Monitoring.merge_auth_config(default_prometheus_yaml, Monitoring.get_node_host_ip())
-
-        def represent_none(self, _):
-            return self.represent_scalar('tag:yaml.org,2002:null', '')
-
-        yaml.add_representer(type(None), represent_none)
-        Path("monitoring/prometheus").mkdir(parents=True, exist_ok=True)
-
-        with open("monitoring/prometheus/prometheus.yml", 'w') as f:
-            yaml.dump(prometheus_yaml, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
-
-    @staticmethod
-    def template_prometheus_yml(monitoring_config, monitoring_config_dir):
+    def template_prometheus_yml(monitoring_config, monitoring_config_dir, manifest: ArtifactManifest = None):
+        prometheus_file_location = f"{monitoring_config_dir}/prometheus/prometheus.yml"
+        inputs = ArtifactManifest.template_inputs("prometheus.yml.j2", monitoring_config)
+        if manifest and manifest.is_up_to_date(prometheus_file_location, inputs):
+            Helpers.print_info(f"{prometheus_file_location} is up to date")
+            return False
         render_template = Renderer().load_file_based_template("prometheus.yml.j2").render(monitoring_config).to_yaml()
 
-        yaml.add_representer(type(None), Helpers.represent_none)
-
         Path(f"{monitoring_config_dir}/prometheus").mkdir(parents=True, exist_ok=True)
-        prometheus_file_location = f"{monitoring_config_dir}/prometheus/prometheus.yml"
         Helpers.section_headline("Promtheus config is Generated as below")
 
-        print(f"\n{yaml.dump(render_template)}"
+        print(f"\n{YamlIO.dump(render_template)}"
               f"\n\n Saving to file {prometheus_file_location} ")
 
-        with open(prometheus_file_location, 'w') as f:
-            yaml.dump(render_template, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
-
-    @staticmethod
-    def merge_auth_config(default_prometheus_yaml, node_ip):
-        user = Helpers.get_nginx_user("metrics", "metrics")
-        # TODO fix the issue where volumes array gets merged correctly
-        scrape_config = yaml.safe_load(f"""
-            scrape_configs:
-              - job_name: mynode
-                metrics_path: /prometheus/metrics
-                scheme: https
-                basic_auth:
-                  username: {user["name"]}
-                  password: {user["password"]}
-                tls_config:
-                  insecure_skip_verify: true
-                static_configs:
-                  - targets:
-                      - {node_ip}
-           """)
-        final_conf = Helpers.merge(scrape_config, default_prometheus_yaml)
-        return final_conf
-
-    @staticmethod
-    def setup_datasource(default_datasource_cfg_url, monitoring_config_dir):
-        req = requests.Request('GET', f'{default_datasource_cfg_url}')
-        prepared = req.prepare()
-        resp = Helpers.send_request(prepared, print_response=False)
-        Path(f"{monitoring_config_dir}/grafana/provisioning/datasources").mkdir(parents=True, exist_ok=True)
-        with open(f"{monitoring_config_dir}/grafana/provisioning/datasources/datasource.yml", 'wb') as f:
-            f.write(resp.content)
+        content = YamlIO.dump_config(render_template)
+        changed = Helpers.write_file_if_changed(prometheus_file_location, content)
+        if manifest:
+            manifest.record(prometheus_file_location, inputs)
+        return changed
 
     @staticmethod
-    def template_datasource(monitoring_config_dir):
+    def template_datasource(monitoring_config_dir, manifest: ArtifactManifest = None):
+        file_location = f"{monitoring_config_dir}/grafana/provisioning/datasources/datasource.yml"
+        inputs = ArtifactManifest.template_inputs("datasource.yml.j2", {})
+        if manifest and manifest.is_up_to_date(file_location, inputs):
+            Helpers.print_info(f"{file_location} is up to date")
+            return False
         render_template = Renderer().load_file_based_template("datasource.yml.j2").render({}).to_yaml()
         Path(f"{monitoring_config_dir}/grafana/provisioning/datasources").mkdir(parents=True, exist_ok=True)
-        file_location = f"{monitoring_config_dir}/grafana/provisioning/datasources/datasource.yml"
         Helpers.section_headline("Downloading datasource for grafana")
-        Helpers.dump_rendered_template(render_template, file_location)
+        changed = Helpers.dump_rendered_template(render_template, file_location)
+        if manifest:
+            manifest.record(file_location, inputs)
+        return changed
 
     @staticmethod
-    def setup_dashboard(default_dashboard_cfg_url, files, monitoring_config_dir):
-        for file in files:
-            req = requests.Request('GET', f'{default_dashboard_cfg_url}/{file}')
-            prepared = req.prepare()
-            resp = Helpers.send_request(prepared, print_response=False)
-            Path(f"{monitoring_config_dir}/grafana/provisioning/dashboards").mkdir(parents=True, exist_ok=True)
-            with open(f"{monitoring_config_dir}/grafana/provisioning/dashboards/{file}", 'wb') as f:
-                f.write(resp.content)
-
-    @staticmethod
-    def template_dashboards(files, monitoring_config_dir):
+    def template_dashboards(files, monitoring_config_dir, manifest: ArtifactManifest = None):
         Helpers.section_headline("Downloading Dashboard files for grafana")
 
         Path(f"{monitoring_config_dir}/grafana/provisioning/dashboards").mkdir(parents=True, exist_ok=True)
+        rules = RecordingRules.for_dashboards(files)
+        changed = False
         for file in files:
-            render_template = Renderer().load_file_based_template(f"{file}.j2").render({}).to_yaml()
             file_location = f"{monitoring_config_dir}/grafana/provisioning/dashboards/{file}"
+            inputs = ArtifactManifest.template_inputs(f"{file}.j2", {"recording_rules": rules})
+            if manifest and manifest.is_up_to_date(file_location, inputs):
+                continue
+            renderer = Renderer().load_file_based_template(f"{file}.j2").render({})
             if file.endswith('.yml') or file.endswith('.yaml'):
-                Helpers.dump_rendered_template(render_template, file_location, quiet=True)
+                changed = Helpers.dump_rendered_template(renderer.to_yaml(), file_location, quiet=True) or changed
             if file.endswith('.json'):
-                import json
-                with open(file_location, 'w') as fp:
-                    json.dump(render_template, fp)
+                renderer.rendered = RecordingRules.rewrite_dashboard(renderer.rendered, rules)
+                changed = renderer.to_json_file(file_location, validate=True) or changed
+            if manifest:
+                manifest.record(file_location, inputs)
+        return changed
 
     @staticmethod
-    def setup_external_volumes():
-        run_shell_command(["docker", "volume", "create", "prometheus_tsdb"])
-        run_shell_command(["docker", "volume", "create", "grafana-storage"])
+    def template_recording_rules(dashboard_files, monitoring_config_dir, manifest: ArtifactManifest = None):
+        """The recording rules for the queries of the dashboards, prometheus loads them from its config folder"""
+        file_location = f"{monitoring_config_dir}/prometheus/recording_rules.yml"
+        rules = RecordingRules.for_dashboards(dashboard_files)
+        inputs = ArtifactManifest.hash_inputs("recording_rules", rules)
+        if manifest and manifest.is_up_to_date(file_location, inputs):
+            Helpers.print_info(f"{file_location} is up to date")
+            return False
+        Path(f"{monitoring_config_dir}/prometheus").mkdir(parents=True, exist_ok=True)
+        print(f"Saving {len(rules)} recording rules for the dashboards to {file_location}")
+        changed = Helpers.write_file_if_changed(file_location, YamlIO.dump_config(RecordingRules.rules_file(rules),
+                                                                                   sort_keys=False))
+        if manifest:
+            manifest.record(file_location, inputs)
+        return changed
 
     @staticmethod
-    def setup_monitoring_containers(default_monitoring_cfg_url, monitoring_config_dir):
-        req = requests.Request('GET', f'{default_monitoring_cfg_url}')
-        prepared = req.prepare()
-        resp = Helpers.send_request(prepared, print_response=False)
-        Path(monitoring_config_dir).mkdir(parents=True, exist_ok=True)
-        with open(f"{monitoring_config_dir}/node-monitoring.yml", 'wb') as f:
-            f.write(resp.content)
+    def setup_external_volumes():
+        engine = DockerEngine.instance()
+        try:
+            engine.create_volume("prometheus_tsdb")
+            engine.create_volume("grafana-storage")
+        except DockerEngineError as e:
+            DockerEngine.exit_on_error(e)
 
     @staticmethod
-    def template_monitoring_containers(monitoring_config_dir):
+    def template_monitoring_containers(monitoring_config_dir, manifest: ArtifactManifest = None):
+        file_location = f"{monitoring_config_dir}/node-monitoring.yml"
+        # Docker would create the bind mounted folder of the file_sd targets as root
+        Path(f"{monitoring_config_dir}/nodes").mkdir(parents=True, exist_ok=True)
+        inputs = ArtifactManifest.template_inputs("node-monitoring.yml.j2", {})
+        if manifest and manifest.is_up_to_date(file_location, inputs):
+            Helpers.print_info(f"{file_location} is up to date")
+            return False
         render_template = Renderer().load_file_based_template("node-monitoring.yml.j2").render({}).to_yaml()
         Path(monitoring_config_dir).mkdir(parents=True, exist_ok=True)
-        file_location = f"{monitoring_config_dir}/node-monitoring.yml"
         Helpers.section_headline("Docker compose for monitoring containers")
-        Helpers.dump_rendered_template(render_template, file_location)
+        changed = Helpers.dump_rendered_template(render_template, file_location)
+        if manifest:
+            manifest.record(file_location, inputs)
+        return changed
+
+    @staticmethod
+    def services_to_recreate(existing_compose, new_compose, prometheus_config_changed, grafana_config_changed):
+        """
+        Prometheus and grafana read their config from bind mounted folders, so a change in those files needs the
+        container to be recreated even though its compose definition stays the same.
+        """
+        services = Helpers.compose_services_to_recreate(existing_compose, new_compose)
+        if services is None:
+            return None
+        if prometheus_config_changed and "prometheus" not in services:
+            services.append("prometheus")
+        if grafana_config_changed and "grafana" not in services:
+            services.append("grafana")
+        return services
 
     @staticmethod
-    def start_monitoring(composefile, auto_approve=False):
+    def start_monitoring(composefile, auto_approve=False, services=None):
         print(f"----- output of node monitoring docker compose file {composefile}")
-        run_shell_command(f"cat {composefile}", shell=True)
+        Host.instance().print_file(composefile)
         start_monitoring_answer = ""
         if auto_approve:
             print("In Auto mode -  Updating the monitoring as per above docker compose file")
@@ -149,11 +141,9 @@ class Monitoring:
                 f"Do you want to start monitoring using file {composefile} [Y/n]?")
 
         if Helpers.check_Yes(start_monitoring_answer) or auto_approve:
-            docker_compose_binary = os.getenv("DOCKER_COMPOSE_LOCATION", 'docker-compose')
-            run_shell_command([docker_compose_binary, '-f', composefile, 'up', '-d'],
-                              env={
-                                  COMPOSE_HTTP_TIMEOUT: os.getenv(COMPOSE_HTTP_TIMEOUT, "200")
-                              }, fail_on_error=False)
+            if services:
+                print(f"Recreating only the changed services: {', '.join(services)}")
+            Helpers.docker_compose_up(composefile, services, force_recreate=True)
         else:
             print(f"""Exiting the command ..
                      Once you verified the file {composefile}, you can start the monitoring by running
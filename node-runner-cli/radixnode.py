@@ -12,17 +12,19 @@ from commands.dockercommand import dockercli
 from commands.key import keycli
 from commands.monitoring import monitoringcli
 from commands.othercommands import other_command_cli
+from commands.perfcommand import perfcli
 from commands.systemapi import handle_systemapi
 from commands.systemdcommand import systemdcli
 from env_vars import DISABLE_VERSION_CHECK
 from github.github import latest_release
+from utils.Tracer import Tracer
 from utils.utils import Helpers
 
 urllib3.disable_warnings()
 
-cli = ArgumentParser()
+cli = ArgumentParser(epilog="Add --profile <file> to any command to write a Chrome trace of where its time went")
 cli.add_argument('subcommand', help='Subcommand to run',
-                 choices=["docker", "systemd", "api", "monitoring", "version", "optimise-node", "auth", "key"])
+                 choices=["docker", "systemd", "api", "monitoring", "version", "optimise-node", "auth", "key", "perf"])
 
 apicli = ArgumentParser(
     description='API commands')
@@ -49,7 +51,36 @@ def check_latest_cli():
                 """)
 
 
+def pop_profile_argument(argv):
+    """Removes `--profile <file>` from the arguments, so it can be passed with any subcommand"""
+    if "--profile" not in argv:
+        return None
+    index = argv.index("--profile")
+    if index + 1 >= len(argv):
+        print("--profile requires the path of the trace file to write, e.g. --profile out.json")
+        sys.exit(1)
+    profile_file = argv[index + 1]
+    del argv[index:index + 2]
+    return profile_file
+
+
 def main():
+    profile_file = pop_profile_argument(sys.argv)
+    if profile_file is None:
+        run_command()
+        return
+    tracer = Tracer.instance()
+    tracer.enable()
+    try:
+        run_command()
+    finally:
+        tracer.write_chrome_trace(profile_file)
+        Helpers.section_headline("PROFILE")
+        print(tracer.summary())
+        print(f"Trace written to {profile_file}. Open it in chrome://tracing or https://ui.perfetto.dev")
+
+
+def run_command():
     args = cli.parse_args(sys.argv[1:2])
 
     if args.subcommand is None:
@@ -103,6 +134,12 @@ def main():
             keycli.print_help()
         else:
             keycli_args.func(keycli_args)
+    elif args.subcommand == "perf":
+        perfcli_args = perfcli.parse_args(sys.argv[2:])
+        if perfcli_args.perfcommand is None:
+            perfcli.print_help()
+        else:
+            perfcli_args.func(perfcli_args)
     elif args.subcommand in ["version", "optimise-node"]:
         other_command_cli_args = other_command_cli.parse_args(sys.argv[1:])
         if sys.argv[2:] == "-h":
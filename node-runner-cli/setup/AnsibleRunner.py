@@ -1,10 +1,10 @@
 import os
-import subprocess
 import sys
 from pathlib import Path
 
 import requests
 
+from utils.Host import Host
 from utils.utils import run_shell_command, Helpers, bcolors
 
 
@@ -33,12 +33,11 @@ class AnsibleRunner:
             f.write(resp.content)
 
     def check_install_ansible(self, exit_cmd=False):
-        check_ansible = run_shell_command(f"pip list | grep ansible", shell=True, fail_on_error=False)
-        user = subprocess.check_output('whoami', shell=True).strip()
-        if check_ansible.returncode != 0:
-            print(f"Ansible not found for the user {user.decode('utf-8')}. Installing ansible now")
-            check_pip = run_shell_command("pip -V ", shell=True, fail_on_error=False)
-            if check_pip.returncode != 0:
+        host = Host.instance()
+        if not host.command_exists("ansible-playbook") and not host.path_exists(
+                f"{Path.home()}/.local/bin/ansible-playbook"):
+            print(f"Ansible not found for the user {host.current_user()}. Installing ansible now")
+            if not host.command_exists("pip"):
                 print(f"Pip is not installed. Installing pip now")
                 run_shell_command('sudo apt install python3-pip -y', shell=True)
             run_shell_command(f"pip install --user ansible==2.10.0", shell=True)
@@ -51,17 +50,6 @@ class AnsibleRunner:
     def install_ansible_modules(self):
         run_shell_command(f"ansible-galaxy collection install community.postgresql", shell=True, fail_on_error=True)
 
-    @classmethod
-    def run_setup_limits(cls, setup_limits):
-        run_shell_command(
-            f"ansible-playbook ansible/project/provision.yml -e setup_limits={setup_limits}",
-            shell=True)
-
-    def run_swap_size(self, setup_swap, setup_swap_size):
-        run_shell_command(
-            f"ansible-playbook ansible/project/provision.yml -e setup_swap={setup_swap} -e swap_size={setup_swap_size}",
-            shell=True)
-
     def run_setup_postgress(self, postgress_password, postgresql_user, postgresql_db_name, file):
         self.check_install_ansible()
         self.download_ansible_file(file)
@@ -3,14 +3,16 @@ import os
 import sys
 from pathlib import Path
 
-import yaml
-
 from config.BaseConfig import SetupMode
 from config.KeyDetails import KeyDetails
+from key_interaction.KeystoreGenerator import KeystoreGenerator
 from setup.AnsibleRunner import AnsibleRunner
+from setup.HostOptimiser import HostOptimiser
+from utils.Host import Host
 from utils.PromptFeeder import QuestionKeys
 from utils.Prompts import Prompts
 from utils.utils import run_shell_command, Helpers, bcolors
+from utils.YamlIO import YamlIO
 
 
 class Base:
@@ -24,8 +26,7 @@ class Base:
     def add_user_docker_group():
 
         run_shell_command('sudo groupadd docker', shell=True, fail_on_error=False)
-        is_in_docker_group = run_shell_command('groups | grep docker', shell=True, fail_on_error=False)
-        if is_in_docker_group.returncode != 0:
+        if not Host.instance().user_in_group("docker"):
             run_shell_command(f"sudo usermod -aG docker  {os.environ.get('USER')}", shell=True)
             print('Exit ssh login and relogin back for user addition to group "docker" to take effect')
 
@@ -60,12 +61,8 @@ class Base:
             """)
             key_details.keystore_password = keystore_password if keystore_password else getpass.getpass(
                 f"Enter the password of the new file '{key_details.keyfile_name}':")
-            run_shell_command(['docker', 'run', '--rm', '-v', key_details.keyfile_path + ':/keygen/key',
-                               f'radixdlt/keygen:{key_details.keygen_tag}',
-                               f'--keystore=/keygen/key/{key_details.keyfile_name}',
-                               '--password=' + key_details.keystore_password], quite=True
-                              )
-            run_shell_command(['sudo', 'chmod', '644', f'{key_details.keyfile_path}/{key_details.keyfile_name}'])
+            KeystoreGenerator.write_keystore(f'{key_details.keyfile_path}/{key_details.keyfile_name}',
+                                             key_details.keystore_password)
 
         return key_details
 
@@ -83,21 +80,39 @@ class Base:
         return keydetails
 
     @staticmethod
-    def setup_node_optimisation_config(version):
-        ansibleRunner = AnsibleRunner(
-            f'https://raw.githubusercontent.com/radixdlt/babylon-nodecli/{version}/node-runner-cli')
-        file = 'ansible/project/provision.yml'
-        ansibleRunner.check_install_ansible()
-        ansibleRunner.download_ansible_file(file)
-        # ansibleRunner.install_ansible_modules()
-        setup_limits = Prompts.ask_ansible_setup_limits()
-
-        if setup_limits:
-            ansibleRunner.run_setup_limits(setup_limits)
-
-        setup_swap, ask_swap_size = Prompts.ask_ansible_swap_setup()
+    def setup_node_optimisation_config(dry_run=False, optimiser=None):
+        optimiser = optimiser or HostOptimiser()
+        if Prompts.ask_setup_limits():
+            optimiser.plan_limits(os.environ.get("SUDO_USER") or Host.instance().current_user())
+
+        setup_swap, swap_size = Prompts.ask_swap_setup()
         if setup_swap:
-            ansibleRunner.run_swap_size(setup_swap, ask_swap_size)
+            try:
+                optimiser.plan_swap(swap_size)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+
+        if not optimiser.has_changes():
+            print("The node is already optimised, nothing to change")
+            return
+        Helpers.section_headline("CHANGES")
+        print(optimiser.diff())
+        if dry_run:
+            return
+        optimiser.apply()
+        if "/etc/security/limits.conf" in optimiser.files:
+            print(f"{bcolors.WARNING}Log out and back in for the new limits to apply{bcolors.ENDC}")
+
+    @staticmethod
+    def backup_file(filepath, filename, backup_time, auto_approve=False):
+        if os.path.isfile(f"{filepath}/{filename}"):
+            backup_yes = "Y"
+            if auto_approve is None:
+                backup_yes = input(f"{filename} file exists. Do you want to back up [Y/n]:")
+            if Helpers.check_Yes(backup_yes) or auto_approve:
+                Path(f"{backup_time}").mkdir(parents=True, exist_ok=True)
+                Host.instance().copy_file(f"{filepath}/{filename}", f"{backup_time}/{filename}")
 
     @staticmethod
     def get_data_dir(create_dir=True):
@@ -116,12 +131,8 @@ class Base:
 
     @staticmethod
     def load_all_config(configfile):
-        yaml.add_representer(type(None), Helpers.represent_none)
-
         if os.path.exists(configfile):
-            with open(configfile, 'r') as file:
-                all_config = yaml.safe_load(file)
-                return all_config
+            return YamlIO.load_file(configfile)
         else:
             print(f"Config file '{configfile}' doesn't exist");
             return {}
@@ -2,14 +2,14 @@ import getpass
 import os
 import sys
 
-import yaml
-
-from env_vars import DOCKER_COMPOSE_FOLDER_PREFIX, COMPOSE_HTTP_TIMEOUT, RADIXDLT_NODE_KEY_PASSWORD, POSTGRES_PASSWORD
+from env_vars import DOCKER_COMPOSE_FOLDER_PREFIX, RADIXDLT_NODE_KEY_PASSWORD, POSTGRES_PASSWORD
 from github import github
 from setup.AnsibleRunner import AnsibleRunner
 from setup.Base import Base
+from utils.DockerEngine import DockerEngine
 from utils.Prompts import Prompts
-from utils.utils import run_shell_command, Helpers
+from utils.utils import Helpers
+from utils.YamlIO import YamlIO
 
 
 class Docker(Base):
@@ -23,10 +23,10 @@ class Docker(Base):
         else:
             nginx_password = password
         docker_compose_folder_prefix = os.getenv(DOCKER_COMPOSE_FOLDER_PREFIX, os.getcwd().rsplit('/', 1)[-1])
-        run_shell_command(['docker', 'run', '--rm', '-v',
-                           docker_compose_folder_prefix + '_nginx_secrets:/secrets',
-                           'radixdlt/htpasswd:v1.0.0',
-                           'htpasswd', '-bc', f'/secrets/htpasswd.{usertype}', username, nginx_password])
+        DockerEngine.instance().run_container('radixdlt/htpasswd:v1.0.0',
+                                              ['htpasswd', '-bc', f'/secrets/htpasswd.{usertype}', username,
+                                               nginx_password],
+                                              binds=[docker_compose_folder_prefix + '_nginx_secrets:/secrets'])
 
         print(
             f"""
@@ -43,22 +43,12 @@ class Docker(Base):
         return nginx_password
 
     @staticmethod
-    def run_docker_compose_up(composefile):
-        docker_compose_binary = os.getenv("DOCKER_COMPOSE_LOCATION", 'docker-compose')
-        result = run_shell_command([docker_compose_binary, '-f', composefile, 'up', '-d'],
-                                   env={
-                                       COMPOSE_HTTP_TIMEOUT: os.getenv(COMPOSE_HTTP_TIMEOUT, "200")
-                                   }, fail_on_error=False)
-        if result.returncode != 0:
-            run_shell_command([docker_compose_binary, '-f', composefile, 'up', '-d'],
-                              env={
-                                  COMPOSE_HTTP_TIMEOUT: os.getenv(COMPOSE_HTTP_TIMEOUT, "200")
-                              }, fail_on_error=True)
+    def run_docker_compose_up(composefile, services=None):
+        Helpers.docker_compose_up(composefile, services)
 
     @staticmethod
     def save_compose_file(existing_docker_compose: str, composefile_yaml: dict):
-        with open(existing_docker_compose, 'w') as f:
-            yaml.dump(composefile_yaml, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
+        YamlIO.dump_config_file(composefile_yaml, existing_docker_compose)
 
     @staticmethod
     def run_docker_compose_down(composefile, removevolumes=False):
@@ -168,5 +158,4 @@ class Docker(Base):
                 print(f"\n\n Backing up existing config file")
                 Helpers.backup_file(config_file, f"{config_file}_{backup_time}")
             print(f"\n\n Saving to file {config_file} ")
-            with open(config_file, 'w') as f:
-                yaml.dump(new_config, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
+            YamlIO.dump_config_file(new_config, config_file)
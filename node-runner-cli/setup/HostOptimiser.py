@@ -0,0 +1,160 @@
+import difflib
+import os
+import re
+import tempfile
+import time
+
+from utils.Host import Host
+from utils.utils import run_shell_command
+
+LIMITS = [("-", "nofile", "65536"), ("-", "nproc", "65536"), ("soft", "memlock", "unlimited"),
+          ("hard", "memlock", "unlimited")]
+SWAP_SYSCTL = {"vm.swappiness": "10", "vm.vfs_cache_pressure": "50"}
+SWAPFILE = "/swapfile"
+SWAP_SIZE = re.compile(r"^(\d+)\s*([MmGg])[Bb]?$")
+
+
+class HostOptimiser:
+    """
+    Sets the file descriptor, thread and memlock limits of the user running the node and sets up a swapfile,
+    the steps the provision.yml playbook used to run with ansible. Every step checks the current state first, so
+    running it again changes nothing. The files are planned first, which gives the dry run its diff, and are
+    all read and written under root, so it can be tried on a copy of the filesystem. Like the playbook, the
+    swapfile is created and enabled before fstab refers to it, a failed mkswap leaves fstab as it was.
+    """
+
+    def __init__(self, root="/", run=None):
+        self.root = root
+        self.run = run or self.run_command
+        self.files = {}
+        self.swap_commands = []
+        self.commands = []
+        self.swapfile_size = None
+
+    def path(self, path: str) -> str:
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def current(self, path: str) -> str:
+        """The planned content of the file, or what is on disk"""
+        return self.files[path] if path in self.files else self.current_on_disk(path)
+
+    def needs_sudo(self) -> bool:
+        return self.root == "/" and os.geteuid() != 0
+
+    def run_command(self, command: str):
+        run_shell_command(f"sudo {command}" if self.needs_sudo() else command, shell=True)
+
+    @staticmethod
+    def set_limits(limits_conf: str, domain: str) -> str:
+        """Replaces the value of the limits of the domain like pam_limits does, the missing ones are appended"""
+        lines = limits_conf.splitlines()
+        for limit_type, item, value in LIMITS:
+            line = f"{domain} {limit_type} {item} {value}"
+            index = next((index for index, current in enumerate(lines)
+                          if current.split()[:3] == [domain, limit_type, item]), None)
+            if index is None:
+                lines.append(line)
+            elif lines[index].split()[3:4] != [value]:
+                lines[index] = line
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def set_sysctl(sysctl_conf: str, settings: dict) -> str:
+        lines = sysctl_conf.splitlines()
+        for key, value in settings.items():
+            index = next((index for index, line in enumerate(lines)
+                          if "=" in line and line.split("=")[0].strip() == key), None)
+            if index is None:
+                lines.append(f"{key}={value}")
+            elif lines[index].split("=", 1)[1].strip() != value:
+                lines[index] = f"{key}={value}"
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def swap_size_bytes(swap_size: str) -> int:
+        match = SWAP_SIZE.match(swap_size.strip())
+        if not match:
+            raise ValueError(f"{swap_size} is not a swap size like 8G or 512M")
+        return int(match.group(1)) * 1024 ** (3 if match.group(2).lower() == "g" else 2)
+
+    def plan_limits(self, user: str):
+        limits_conf = self.current("/etc/security/limits.conf")
+        updated = HostOptimiser.set_limits(limits_conf, user)
+        if updated != limits_conf:
+            self.files["/etc/security/limits.conf"] = updated
+
+    def plan_swap(self, swap_size: str):
+        size = HostOptimiser.swap_size_bytes(swap_size)
+        swaps = self.current("/proc/swaps")
+        if not any(line.split()[:1] == [SWAPFILE] for line in swaps.splitlines()):
+            if not os.path.exists(self.path(SWAPFILE)):
+                self.swapfile_size = size
+            self.swap_commands.extend([f"mkswap {self.path(SWAPFILE)}", f"swapon {self.path(SWAPFILE)}"])
+        fstab = self.current("/etc/fstab")
+        if not any(line.split()[:1] == [SWAPFILE] for line in fstab.splitlines()):
+            self.files["/etc/fstab"] = fstab + ("" if not fstab or fstab.endswith("\n") else "\n") + \
+                                       f"{SWAPFILE} none swap sw 0 0\n"
+        sysctl_conf = self.current("/etc/sysctl.conf")
+        updated = HostOptimiser.set_sysctl(sysctl_conf, SWAP_SYSCTL)
+        if updated != sysctl_conf:
+            self.files["/etc/sysctl.conf"] = updated
+            self.commands.append("sysctl " + " ".join(f"-w {key}={value}" for key, value in SWAP_SYSCTL.items()))
+
+    def has_changes(self) -> bool:
+        return bool(self.files or self.swap_commands or self.commands or self.swapfile_size)
+
+    def diff(self) -> str:
+        lines = []
+        if self.swapfile_size:
+            lines.append(f"create {SWAPFILE} of {self.swapfile_size // 1024 ** 2} MB with mode 600")
+        lines.extend(f"run {command}" for command in self.swap_commands)
+        for path, content in self.files.items():
+            lines.extend(difflib.unified_diff(self.current_on_disk(path).splitlines(), content.splitlines(),
+                                              fromfile=path, tofile=path, lineterm=""))
+        lines.extend(f"run {command}" for command in self.commands)
+        return "\n".join(lines)
+
+    def current_on_disk(self, path: str) -> str:
+        try:
+            return Host.instance().read_text(self.path(path))
+        except FileNotFoundError:
+            return ""
+
+    def write_file(self, path: str, content: str):
+        if self.needs_sudo():
+            with tempfile.NamedTemporaryFile("w", delete=False) as f:
+                f.write(content)
+            run_shell_command(f"sudo cp {f.name} {path}", shell=True)
+            os.remove(f.name)
+            return
+        Host.instance().make_dirs(os.path.dirname(self.path(path)))
+        with open(self.path(path), "w") as f:
+            f.write(content)
+
+    def create_swapfile(self):
+        if self.needs_sudo():
+            self.run_command(f"fallocate -l {self.swapfile_size} {SWAPFILE}")
+            self.run_command(f"chmod 600 {SWAPFILE}")
+            return
+        fd = os.open(self.path(SWAPFILE), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.posix_fallocate(fd, 0, self.swapfile_size)
+        finally:
+            os.close(fd)
+
+    def apply(self):
+        """The changed files are backed up next to themselves like the playbook did with fstab"""
+        if self.swapfile_size:
+            self.create_swapfile()
+        for command in self.swap_commands:
+            self.run(command)
+        backup_suffix = time.strftime("%Y%m%dT%H%M%S")
+        for path, content in self.files.items():
+            if os.path.exists(self.path(path)):
+                if self.needs_sudo():
+                    self.run_command(f"cp {path} {path}_{backup_suffix}.bak")
+                else:
+                    Host.instance().copy_file(self.path(path), f"{self.path(path)}_{backup_suffix}.bak")
+            self.write_file(path, content)
+        for command in self.commands:
+            self.run(command)
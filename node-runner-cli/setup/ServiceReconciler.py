@@ -0,0 +1,52 @@
+from utils.Host import Host
+from utils.SudoPlan import SudoPlan
+
+ACTIVE_STATES = ["active", "activating", "reloading"]
+
+
+class ServiceReconciler:
+    """
+    Brings systemd units to running and enabled with the fewest transitions, based on their current state:
+    a unit whose configuration changed is restarted, which also starts it when it is stopped, an unchanged stopped
+    unit is started once (enable --now when it is not enabled yet) and an unchanged running unit is left alone.
+    The states are read before the deferred steps of a SudoPlan run, e.g. apt install nginx, which starts nginx
+    with the stock config, so a changed unit is restarted even when it looked stopped.
+    Units that need the same transition share one systemctl call.
+    """
+
+    def __init__(self):
+        self.units = {}
+
+    def want_running(self, unit: str, config_changed=False, unit_file_changed=False):
+        self.units[unit] = (config_changed or unit_file_changed, unit_file_changed)
+
+    def commands(self, states: dict) -> list:
+        daemon_reload = False
+        transitions = {"enable --now": [], "enable": [], "start": [], "restart": []}
+        for unit, (changed, unit_file_changed) in self.units.items():
+            state = states.get(unit, {})
+            active = state.get("ActiveState") in ACTIVE_STATES
+            enabled = state.get("UnitFileState") == "enabled"
+            daemon_reload = daemon_reload or unit_file_changed or state.get("NeedDaemonReload") == "yes"
+            if not active and not enabled and not changed:
+                transitions["enable --now"].append(unit)
+                continue
+            if not enabled:
+                transitions["enable"].append(unit)
+            if changed:
+                transitions["restart"].append(unit)
+            elif not active:
+                transitions["start"].append(unit)
+        commands = ["systemctl daemon-reload"] if daemon_reload else []
+        for transition, units in transitions.items():
+            if units:
+                commands.append(f"systemctl {transition} {' '.join(units)}")
+        return commands
+
+    def apply(self, plan: SudoPlan = None) -> list:
+        commands = self.commands(Host.instance().unit_states(list(self.units)))
+        if not commands:
+            print(f"{', '.join(self.units)} already running with the current configuration")
+        for command in commands:
+            SudoPlan.sudo(command, plan)
+        return commands
@@ -2,15 +2,15 @@ import os
 import sys
 from pathlib import Path
 
-import yaml
-from yaml import UnsafeLoader
-
 from config.Renderer import Renderer
 from config.SystemDConfig import SystemDSettings, from_dict
 from env_vars import UNZIPPED_NODE_DIST_FOLDER
 from setup.Base import Base
+from utils.Host import Host
 from utils.PromptFeeder import QuestionKeys
+from utils.SudoPlan import SudoPlan
 from utils.utils import run_shell_command, Helpers
+from utils.YamlIO import YamlIO
 
 
 class SystemD(Base):
@@ -22,8 +22,7 @@ class SystemD(Base):
     @staticmethod
     def setup_user():
         print("Checking if user radixdlt already exists")
-        user_exists = run_shell_command("cat /etc/passwd | grep radixdlt", shell=True, fail_on_error=False)
-        if user_exists.returncode != 0:
+        if not Host.instance().user_exists("radixdlt"):
             run_shell_command('sudo useradd -m -s /bin/bash radixdlt', shell=True)
         run_shell_command(['sudo', 'usermod', '-aG', 'docker', 'radixdlt'])
 
@@ -71,16 +70,6 @@ class SystemD(Base):
     def fetch_universe_json(trustenode, extraction_path):
         Base.fetch_universe_json(trustenode, extraction_path)
 
-    @staticmethod
-    def backup_file(filepath, filename, backup_time, auto_approve=False):
-        if os.path.isfile(f"{filepath}/{filename}"):
-            backup_yes = "Y"
-            if auto_approve is None:
-                backup_yes = input(f"{filename} file exists. Do you want to back up [Y/n]:")
-            if Helpers.check_Yes(backup_yes) or auto_approve:
-                Path(f"{backup_time}").mkdir(parents=True, exist_ok=True)
-                run_shell_command(f"cp {filepath}/{filename} {backup_time}/{filename}", shell=True)
-
     @staticmethod
     def setup_service_file(settings: SystemDSettings,
                            service_file_path="/etc/systemd/system/radixdlt-node.service"):
@@ -91,11 +80,12 @@ class SystemD(Base):
         run_shell_command(command, shell=True)
 
     @staticmethod
-    def download_binaries(binary_location_url, library_location_url, node_dir, node_version, auto_approve=None):
+    def download_binaries(binary_location_url, library_location_url, node_dir, node_version, auto_approve=None,
+                          plan: SudoPlan = None):
         run_shell_command(
             ['wget', '--no-check-certificate', '-O', 'babylon-node-dist.zip', binary_location_url])
         run_shell_command('unzip babylon-node-dist.zip', shell=True)
-        run_shell_command(f'mkdir -p {node_dir}/{node_version}', shell=True)
+        Host.instance().make_dirs(f'{node_dir}/{node_version}')
         if os.listdir(f'{node_dir}/{node_version}'):
             if auto_approve is None:
                 print(f"Directory {node_dir}/{node_version} is not empty")
@@ -103,38 +93,36 @@ class SystemD(Base):
             else:
                 okay = "Y"
             if Helpers.check_Yes(okay):
-                run_shell_command(f"rm -rf {node_dir}/{node_version}/*", shell=True)
+                Host.instance().remove_dir_contents(f'{node_dir}/{node_version}')
         unzipped_folder_name = os.getenv(UNZIPPED_NODE_DIST_FOLDER, f"core-{node_version}")
-        run_shell_command(f'mv {unzipped_folder_name}/* {node_dir}/{node_version}', shell=True)
+        Host.instance().move_dir_contents(unzipped_folder_name, f'{node_dir}/{node_version}')
 
         # Download and unzip library
         run_shell_command(
             ['wget', '--no-check-certificate', '-O', 'babylon-node-lib.zip', library_location_url])
         run_shell_command('unzip babylon-node-lib.zip', shell=True)
-        run_shell_command(f'mkdir -p /usr/lib/jni', shell=True)
-        run_shell_command(f'sudo mv libcorerust.so /usr/lib/jni/libcorerust.so', shell=True)
+        Host.instance().make_dirs('/usr/lib/jni')
+        SudoPlan.sudo(f'mv {os.path.abspath("libcorerust.so")} /usr/lib/jni/libcorerust.so', plan)
 
     @staticmethod
-    def start_node_service():
-        run_shell_command('sudo chown radixdlt:radixdlt -R /etc/radixdlt', shell=True)
-        run_shell_command('sudo systemctl start radixdlt-node.service', shell=True)
-        run_shell_command('sudo systemctl enable radixdlt-node.service', shell=True)
-        run_shell_command('sudo systemctl restart radixdlt-node.service', shell=True)
+    def set_etc_directory_owner(plan: SudoPlan = None):
+        SudoPlan.sudo('chown radixdlt:radixdlt -R /etc/radixdlt', plan)
 
     @staticmethod
-    def install_nginx():
-        nginx_installed = run_shell_command("sudo service --status-all | grep nginx", shell=True, fail_on_error=False)
-        if nginx_installed.returncode != 0:
-            run_shell_command('sudo apt install -y nginx apache2-utils', shell=True)
-            run_shell_command('sudo rm -rf /etc/nginx/{sites-available,sites-enabled}', shell=True)
+    def install_nginx(plan: SudoPlan = None):
+        # `service --status-all` lists the scripts in /etc/init.d
+        if not Host.instance().path_exists("/etc/init.d/nginx"):
+            SudoPlan.sudo('apt install -y nginx apache2-utils', plan)
+            SudoPlan.sudo('rm -rf /etc/nginx/{sites-available,sites-enabled}', plan)
 
     @staticmethod
-    def make_nginx_secrets_directory():
-        run_shell_command('sudo mkdir -p /etc/nginx/secrets', shell=True)
+    def make_nginx_secrets_directory(plan: SudoPlan = None):
+        SudoPlan.sudo('mkdir -p /etc/nginx/secrets', plan)
 
     @staticmethod
-    def setup_nginx_config(nginx_config_location_url, node_type, nginx_etc_dir, backup_time, auto_approve=None):
-        SystemD.install_nginx()
+    def setup_nginx_config(nginx_config_location_url, node_type, nginx_etc_dir, backup_time, auto_approve=None,
+                           plan: SudoPlan = None):
+        SystemD.install_nginx(plan)
         if node_type == "archivenode":
             conf_file = 'nginx-archive.conf'
         elif node_type == "fullnode":
@@ -147,7 +135,7 @@ class SystemD(Base):
             backup_yes = input("Do you want to backup existing nginx config [Y/n]?:")
             if Helpers.check_Yes(backup_yes):
                 Path(f"{backup_time}/nginx-config").mkdir(parents=True, exist_ok=True)
-                run_shell_command(f"sudo cp -r {nginx_etc_dir} {backup_time}/nginx-config", shell=True)
+                SudoPlan.sudo(f"cp -r {nginx_etc_dir} {os.path.abspath(backup_time)}/nginx-config", plan)
 
         if auto_approve is None:
             continue_nginx = input("Do you want to continue with nginx setup [Y/n]?:")
@@ -156,43 +144,43 @@ class SystemD(Base):
         if Helpers.check_Yes(continue_nginx):
             run_shell_command(
                 ['wget', '--no-check-certificate', '-O', 'radixdlt-nginx.zip', nginx_config_location_url])
-            run_shell_command(f'sudo unzip -o radixdlt-nginx.zip -d {nginx_etc_dir}', shell=True)
-            run_shell_command(f'sudo mv {nginx_etc_dir}/{conf_file}  /etc/nginx/nginx.conf', shell=True)
-            run_shell_command(f'sudo mkdir -p /var/cache/nginx/radixdlt-hot', shell=True)
+            SudoPlan.sudo(f'unzip -o {os.path.abspath("radixdlt-nginx.zip")} -d {nginx_etc_dir}', plan)
+            SudoPlan.sudo(f'mv {nginx_etc_dir}/{conf_file}  /etc/nginx/nginx.conf', plan)
+            SudoPlan.sudo('mkdir -p /var/cache/nginx/radixdlt-hot', plan)
             return True
         else:
             return False
 
     @staticmethod
-    def create_ssl_certs(secrets_dir, auto_approve=None):
-        SystemD.make_nginx_secrets_directory()
+    def create_ssl_certs(secrets_dir, auto_approve=None, plan: SudoPlan = None):
+        SystemD.make_nginx_secrets_directory(plan)
         if os.path.isfile(f'{secrets_dir}/server.key') and os.path.isfile(f'{secrets_dir}/server.pem'):
             if auto_approve is None:
                 print(f"Files  {secrets_dir}/server.key and os.path.isfile(f'{secrets_dir}/server.pem already exists")
                 answer = input("Do you want to regenerate y/n :")
                 if Helpers.check_Yes(answer):
-                    run_shell_command(f"""
-                         sudo openssl req  -nodes -new -x509 -nodes -subj '/CN=localhost' \
+                    SudoPlan.sudo(f"""
+                         openssl req  -nodes -new -x509 -nodes -subj '/CN=localhost' \
                           -keyout "{secrets_dir}/server.key" \
                           -out "{secrets_dir}/server.pem"
-                         """, shell=True)
+                         """, plan)
         else:
 
-            run_shell_command(f"""
-                 sudo openssl req  -nodes -new -x509 -nodes -subj '/CN=localhost' \
+            SudoPlan.sudo(f"""
+                 openssl req  -nodes -new -x509 -nodes -subj '/CN=localhost' \
                   -keyout "{secrets_dir}/server.key" \
                   -out "{secrets_dir}/server.pem"
-            """, shell=True)
+            """, plan)
 
         if os.path.isfile(f'{secrets_dir}/dhparam.pem'):
             if auto_approve is None:
                 print(f"File {secrets_dir}/dhparam.pem already exists")
                 answer = input("Do you want to regenerate y/n :")
                 if Helpers.check_Yes(answer):
-                    run_shell_command(f"sudo openssl dhparam -out {secrets_dir}/dhparam.pem  4096", shell=True)
+                    SudoPlan.sudo(f"openssl dhparam -out {secrets_dir}/dhparam.pem  4096", plan)
         else:
             print("Generating a dhparam.pem file")
-            run_shell_command(f"sudo openssl dhparam -out {secrets_dir}/dhparam.pem  4096", shell=True)
+            SudoPlan.sudo(f"openssl dhparam -out {secrets_dir}/dhparam.pem  4096", plan)
 
     @staticmethod
     def setup_nginx_password(secrets_dir, usertype, username, password=None):
@@ -219,12 +207,6 @@ class SystemD(Base):
             """
             )
 
-    @staticmethod
-    def start_nginx_service():
-        run_shell_command(f'sudo systemctl start nginx', shell=True)
-        run_shell_command('sudo systemctl enable nginx', shell=True)
-        run_shell_command('sudo systemctl restart nginx', shell=True)
-
     @staticmethod
     def restart_nginx_service():
         run_shell_command('sudo systemctl daemon-reload', shell=True)
@@ -238,8 +220,7 @@ class SystemD(Base):
     @staticmethod
     def checkUser():
         print("\nChecking the user is radixdlt")
-        result = run_shell_command(f'whoami | grep radixdlt', shell=True, fail_on_error=False)
-        if result.returncode != 0:
+        if Host.instance().current_user() != "radixdlt":
             print(" You are not logged as radixdlt user. Logout and login as radixdlt user")
             sys.exit(1)
         else:
@@ -251,9 +232,9 @@ class SystemD(Base):
         run_shell_command("sudo chown radixdlt:radixdlt /etc/systemd/system/radixdlt-node.service", shell=True)
 
     @staticmethod
-    def restart_node_service():
-        run_shell_command('sudo systemctl daemon-reload', shell=True)
-        run_shell_command('sudo systemctl restart radixdlt-node.service', shell=True)
+    def restart_node_service(plan: SudoPlan = None):
+        SudoPlan.sudo('systemctl daemon-reload', plan)
+        SudoPlan.sudo('systemctl restart radixdlt-node.service', plan)
 
     @staticmethod
     def stop_node_service():
@@ -286,6 +267,4 @@ class SystemD(Base):
         if not os.path.isfile(config_file):
             print(f"No configuration found. Execute 'radixnode systemd config' first.")
             sys.exit(1)
-        with open(config_file, 'r') as f:
-            dictionary = yaml.load(f, Loader=UnsafeLoader)
-        return from_dict(dictionary)
+        return from_dict(YamlIO.load_file(config_file))
@@ -0,0 +1,108 @@
+import json
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+
+
+class FakeDockerEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body=None, content_type="application/json"):
+        content = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append((method, url.path, query, body))
+        engine = self.server
+        parts = url.path.strip("/").split("/")
+
+        if method == "POST" and url.path == "/volumes/create":
+            engine.volumes.add(body["Name"])
+            return self.send(201, {"Name": body["Name"]})
+        if method == "GET" and parts[0] == "images":
+            image = unquote("/".join(parts[1:-1]))
+            return self.send(200, {"Id": image}) if image in engine.images else self.send(404, {
+                "message": f"No such image: {image}"})
+        if method == "POST" and url.path == "/images/create":
+            image = f"{query['fromImage']}:{query['tag']}"
+            if image in engine.registry:
+                engine.images.add(image)
+                lines = [{"status": "Downloading"}, {"status": f"Downloaded newer image for {image}"}]
+            else:
+                lines = [{"error": f"manifest for {image} not found"}]
+            return self.send(200, "".join(json.dumps(line) + "\r\n" for line in lines).encode(), "application/json")
+        if method == "POST" and url.path == "/containers/create":
+            if body["Image"] not in engine.images:
+                return self.send(404, {"message": f"No such image: {body['Image']}"})
+            container_id = f"container{len(engine.containers)}"
+            engine.containers[container_id] = body
+            return self.send(201, {"Id": container_id})
+        if parts[0] == "containers" and parts[1] in engine.containers:
+            container = engine.containers[parts[1]]
+            if method == "DELETE":
+                engine.removed.append(parts[1])
+                return self.send(204)
+            if parts[2] == "start":
+                return self.send(204)
+            if parts[2] == "wait":
+                return self.send(200, {"StatusCode": engine.run(container)[0]})
+            if parts[2] == "logs":
+                output = engine.run(container)[1].encode()
+                return self.send(200, struct.pack(">BxxxL", 1, len(output)) + output,
+                                 "application/vnd.docker.raw-stream")
+        return self.send(404, {"message": f"page not found {url.path}"})
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+
+class FakeDockerEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Docker Engine API on a temporary unix socket, serving the endpoints used by utils.DockerEngine"""
+    daemon_threads = True
+
+    def __init__(self, images=(), registry=(), run=None):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "docker.sock")
+        super().__init__(self.socket_path, FakeDockerEngineHandler)
+        self.images = set(images)
+        self.registry = set(registry)
+        self.run = run or (lambda container: (0, ""))
+        self.volumes = set()
+        self.containers = {}
+        self.removed = []
+        self.requests = []
+        self.connections = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self.directory.cleanup()
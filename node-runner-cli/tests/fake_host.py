@@ -0,0 +1,35 @@
+from utils.Host import Host
+
+
+class FakeHost(Host):
+    """In memory users, groups and commands. Filesystem methods are inherited and should be used on temp folders"""
+
+    def __init__(self, user="radixdlt", users=None, groups=None, commands=None, paths=None, units=None):
+        self.user = user
+        self.users = set(users if users is not None else [user])
+        self.groups = set(groups or [])
+        self.commands = set(commands or [])
+        self.paths = set(paths or [])
+        self.units = units or {}
+        self.printed_files = []
+
+    def current_user(self) -> str:
+        return self.user
+
+    def user_exists(self, username: str) -> bool:
+        return username in self.users
+
+    def user_in_group(self, group: str) -> bool:
+        return group in self.groups
+
+    def command_exists(self, command: str) -> bool:
+        return command in self.commands
+
+    def path_exists(self, path: str) -> bool:
+        return path in self.paths
+
+    def print_file(self, path: str):
+        self.printed_files.append(path)
+
+    def unit_states(self, units: list) -> dict:
+        return {unit: self.units[unit] for unit in units if unit in self.units}
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from config.ArtifactManifest import ArtifactManifest
+from monitoring import Monitoring
+
+
+class ArtifactManifestUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_location = f"{self.directory}/default.config"
+        with open(self.file_location, 'w') as f:
+            f.write("network.id=1\n")
+
+    def test_artifact_is_up_to_date_until_inputs_or_file_change(self):
+        manifest = ArtifactManifest.in_directory(self.directory)
+        inputs = ArtifactManifest.template_inputs("systemd-default.config.j2", {"network_id": 1})
+        self.assertFalse(manifest.is_up_to_date(self.file_location, inputs))
+
+        manifest.record(self.file_location, inputs)
+        manifest = ArtifactManifest.in_directory(self.directory)
+        self.assertTrue(manifest.is_up_to_date(self.file_location, inputs))
+        self.assertFalse(manifest.is_up_to_date(
+            self.file_location, ArtifactManifest.template_inputs("systemd-default.config.j2", {"network_id": 2})))
+
+        with open(self.file_location, 'a') as f:
+            f.write("log.level=debug\n")
+        self.assertFalse(manifest.is_up_to_date(self.file_location, inputs))
+
+    def test_manifest_does_not_store_the_hash_of_secrets(self):
+        manifest = ArtifactManifest.in_directory(self.directory)
+        inputs = ArtifactManifest.template_inputs("systemd-environment.j2", {"keystore_password": "secret"})
+        manifest.record(self.file_location, inputs)
+        with open(manifest.manifest_file) as f:
+            self.assertNotIn(inputs, f.read())
+        self.assertEqual(os.stat(manifest.key_file).st_mode & 0o777, 0o600)
+        self.assertTrue(ArtifactManifest.in_directory(self.directory).is_up_to_date(self.file_location, inputs))
+
+        other_directory = tempfile.mkdtemp()
+        other_manifest = ArtifactManifest.in_directory(other_directory)
+        other_manifest.record(f"{other_directory}/default.config", inputs)
+        self.assertNotEqual(other_manifest.keyed_inputs(inputs), manifest.keyed_inputs(inputs))
+
+    def test_unkeyed_manifest_is_dropped(self):
+        with open(f"{self.directory}/{ArtifactManifest.manifest_file_name}", 'w') as f:
+            f.write('{"version": 1, "artifacts": {"%s": {"inputs": "abc", "output": null}}}' % self.file_location)
+        self.assertEqual(ArtifactManifest.in_directory(self.directory).artifacts, {})
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_unchanged_monitoring_templates_are_skipped(self, mock_stdout):
+        manifest = ArtifactManifest.in_directory(self.directory)
+        self.assertTrue(Monitoring.template_datasource(self.directory, manifest))
+        datasource = f"{self.directory}/grafana/provisioning/datasources/datasource.yml"
+        modified_time = os.path.getmtime(datasource)
+
+        self.assertFalse(Monitoring.template_datasource(self.directory, manifest))
+        self.assertEqual(os.path.getmtime(datasource), modified_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
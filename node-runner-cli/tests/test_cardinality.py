@@ -0,0 +1,99 @@
+import os
+import socket
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+import requests
+
+from config.Renderer import Renderer
+from monitoring.Cardinality import Cardinality
+from radixnode import main
+from utils.YamlIO import YamlIO
+
+METRICS = """# TYPE rn_misc_peer_count gauge
+rn_misc_peer_count 12.0
+# TYPE http_request_duration_seconds histogram
+http_request_duration_seconds_bucket{le="0.1",path="/a"} 1
+http_request_duration_seconds_bucket{le="+Inf",path="/a"} 2
+http_request_duration_seconds_bucket{le="0.1",path="/b"} 1
+http_request_duration_seconds_bucket{le="+Inf",path="/b"} 2
+http_request_duration_seconds_sum{path="/a"} 0.3
+http_request_duration_seconds_count{path="/a"} 2
+# TYPE jvm_threads_state gauge
+jvm_threads_state{state="RUNNABLE"} 10
+# TYPE unused_bytes gauge
+unused_bytes 1
+# TYPE unused_bytes_count gauge
+unused_bytes_count 1
+"""
+
+
+class CardinalityTests(unittest.TestCase):
+
+    def test_series_are_counted_per_family_and_label(self):
+        families = Cardinality.analyze(METRICS)
+        histogram = families["http_request_duration_seconds"]
+        self.assertEqual(histogram["series"], 6)
+        self.assertEqual({label: len(values) for label, values in histogram["labels"].items()},
+                         {"le": 2, "path": 2})
+        self.assertEqual(families["rn_misc_peer_count"]["series"], 1)
+
+    def test_scrape_of_a_target_that_does_not_answer_times_out(self):
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            target = {"scheme": "http", "metrics_target": f"127.0.0.1:{server.getsockname()[1]}",
+                      "metrics_path": "/metrics"}
+            with self.assertRaises(requests.exceptions.Timeout):
+                Cardinality.scrape(target, timeout=0.2)
+
+    def test_promql_metrics(self):
+        self.assertEqual(Cardinality.promql_metrics(
+            'sum by (job) (rate(http_request_duration_seconds_bucket{path="/a"}[$__rate_interval])) '
+            '/ on(instance) group_left rn_misc_peer_count offset 5m > 1e3 and nodeinfo{job="${job}"}'),
+            {"http_request_duration_seconds_bucket", "rn_misc_peer_count", "nodeinfo"})
+        self.assertEqual(Cardinality.dashboard_expressions(
+            {"panels": [{"targets": [{"expr": "up"}]}], "templating": {"list": [{"query": "label_values(x, y)"}]}}),
+            ["up", "label_values(x, y)"])
+        self.assertIn("rn_sync_current_state_version", Cardinality.dashboard_metrics())
+
+    def test_only_the_samples_of_unused_families_are_dropped(self):
+        families = Cardinality.analyze(METRICS)
+        unused = Cardinality.unused_families(families, {"http_request_duration_seconds_bucket",
+                                                        "rn_misc_peer_count", "unused_bytes_count"})
+        self.assertEqual(unused, ["jvm_threads_state", "unused_bytes"])
+        self.assertEqual(Cardinality.dropped_metrics(families, unused), ["jvm_threads_state", "unused_bytes"])
+        self.assertEqual(Cardinality.metric_relabel_configs(["a", "b"]),
+                         [{"source_labels": ["__name__"], "regex": "a|b", "action": "drop"}])
+
+    def test_prometheus_config_drops_the_metrics(self):
+        target = {"metrics_path": "/prometheus/metrics", "metrics_target": "10.0.0.1", "scheme": "http"}
+        rendered = Renderer().load_file_based_template("prometheus.yml.j2").render(
+            {"monitor_core": dict(target, dropped_metrics=["a", "b_total"]), "monitor_gateway_api": target}).to_yaml()
+        core, gateway = rendered["scrape_configs"]
+        self.assertEqual(core["metric_relabel_configs"],
+                         [{"source_labels": ["__name__"], "regex": "a|b_total", "action": "drop"}])
+        self.assertNotIn("metric_relabel_configs", gateway)
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_cardinality_command_updates_the_config(self, mock_stdout):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = f"{tmpdir}/monitoring_config.yaml"
+            YamlIO.dump_config_file({"common_config": {"config_dir": tmpdir}, "monitor_core": {
+                "metrics_path": "/prometheus/metrics", "metrics_target": "10.0.0.1", "scheme": "https",
+                "basic_auth_user": "metrics", "basic_auth_password": "secret"}}, config_file)
+            with mock.patch("monitoring.Cardinality.Cardinality.scrape", return_value=METRICS) as scrape, \
+                    mock.patch("sys.argv", ["main", "monitoring", "cardinality", "-f", config_file, "-u"]):
+                main()
+            self.assertEqual(scrape.call_args[0][0]["metrics_target"], "10.0.0.1")
+            self.assertEqual(YamlIO.load_file(config_file)["monitor_core"]["dropped_metrics"],
+                             ["unused_bytes", "unused_bytes_count"])
+        output = mock_stdout.getvalue()
+        self.assertIn("Target mynode: 10 series in 5 metric families", output)
+        self.assertIn("regex: unused_bytes|unused_bytes_count", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
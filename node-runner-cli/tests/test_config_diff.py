@@ -0,0 +1,55 @@
+import copy
+import unittest
+
+from utils.ConfigDiff import ConfigDiff, ADDED, REMOVED, CHANGED
+
+
+class ConfigDiffUnitTests(unittest.TestCase):
+    old_config = {
+        "core_node": {"core_release": "v1.0.0", "memory_limit": "14000m", "java_opts": "-Xms8g"},
+        "common_config": {"network_id": 1, "nginx_settings": {"release": "1.0.0"}},
+        "migration": None,
+        "ports": [30000, 3333]
+    }
+
+    def new_config(self):
+        return {
+            "core_node": {"core_release": "v1.0.1", "memory_limit": "14000m", "data_directory": "/data"},
+            "common_config": {"network_id": 1, "nginx_settings": {"release": "1.0.0"}},
+            "migration": None,
+            "ports": [30000, 3334, 443]
+        }
+
+    def test_identical_configs_have_no_changes(self):
+        self.assertEqual(ConfigDiff.diff(self.old_config, copy.deepcopy(self.old_config)), [])
+        self.assertEqual(ConfigDiff.format([]), "No differences")
+
+    def test_changes_are_path_based(self):
+        changes = {(change.path, change.kind) for change in ConfigDiff.diff(self.old_config, self.new_config())}
+        self.assertEqual(changes, {
+            (("core_node", "core_release"), CHANGED),
+            (("core_node", "java_opts"), REMOVED),
+            (("core_node", "data_directory"), ADDED),
+            (("ports", 1), CHANGED),
+            (("ports", 2), ADDED),
+        })
+
+    def test_type_change_is_a_change(self):
+        self.assertEqual(len(ConfigDiff.diff({"network_id": 1}, {"network_id": "1"})), 1)
+        self.assertEqual(len(ConfigDiff.diff({"enabled": True}, {"enabled": 1})), 1)
+
+    def test_hash_collision_is_a_change(self):
+        # hash(-1) == hash(-2) in CPython
+        self.assertEqual(ConfigDiff.diff({"a": -1}, {"a": -2}), [(("a",), CHANGED, -1, -2)])
+        self.assertEqual(len(ConfigDiff.diff({"ports": [-1]}, {"ports": [-2]})), 1)
+
+    def test_unified_format(self):
+        output = ConfigDiff.format(ConfigDiff.diff(self.old_config, self.new_config()))
+        self.assertIn("--- existing\n+++ new\n", output)
+        self.assertIn("- core_node.core_release: v1.0.0\n+ core_node.core_release: v1.0.1", output)
+        self.assertIn("- core_node.java_opts: -Xms8g", output)
+        self.assertIn("+ ports[2]: 443", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
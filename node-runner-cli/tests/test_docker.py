@@ -0,0 +1,61 @@
+import copy
+import unittest
+from unittest import mock
+
+from utils.utils import Helpers
+
+
+class DockerComposeUnitTests(unittest.TestCase):
+    existing_compose = {
+        "version": "2.4",
+        "services": {
+            "core": {"image": "radixdlt/babylon-node:v1.0.0"},
+            "nginx": {"image": "radixdlt/babylon-nginx:1.0.0"}
+        },
+        "volumes": {"nginx_secrets": None}
+    }
+
+    def new_compose(self):
+        return copy.deepcopy(self.existing_compose)
+
+    def test_nginx_only_update_does_not_recreate_core(self):
+        new_compose = self.new_compose()
+        new_compose["services"]["nginx"]["image"] = "radixdlt/babylon-nginx:1.0.1"
+        self.assertEqual(Helpers.compose_services_to_recreate(self.existing_compose, new_compose), ["nginx"])
+
+    def test_unchanged_compose_recreates_nothing(self):
+        self.assertEqual(Helpers.compose_services_to_recreate(self.existing_compose, self.new_compose()), [])
+
+    def test_new_service_is_started(self):
+        new_compose = self.new_compose()
+        new_compose["services"]["gateway_api"] = {"image": "radixdlt/babylon-ng-gateway-api:v1.0.0"}
+        self.assertEqual(Helpers.compose_services_to_recreate(self.existing_compose, new_compose), ["gateway_api"])
+
+    def test_full_up_when_volumes_change_or_service_removed(self):
+        new_compose = self.new_compose()
+        new_compose["volumes"]["core_ledger"] = {"driver": "local"}
+        self.assertIsNone(Helpers.compose_services_to_recreate(self.existing_compose, new_compose))
+
+        new_compose = self.new_compose()
+        del new_compose["services"]["nginx"]
+        self.assertIsNone(Helpers.compose_services_to_recreate(self.existing_compose, new_compose))
+        self.assertIsNone(Helpers.compose_services_to_recreate({}, new_compose))
+
+    @mock.patch("utils.utils.run_shell_command")
+    def test_compose_up_targets_services(self, run_shell_command):
+        run_shell_command.return_value.returncode = 0
+        Helpers.docker_compose_up("/tmp/docker-compose.yml", ["nginx"])
+        self.assertEqual(run_shell_command.call_args[0][0],
+                         ["docker-compose", "-f", "/tmp/docker-compose.yml", "up", "-d", "--no-deps", "nginx"])
+
+        Helpers.docker_compose_up("/tmp/docker-compose.yml", [])
+        self.assertEqual(run_shell_command.call_args[0][0],
+                         ["docker-compose", "-f", "/tmp/docker-compose.yml", "up", "-d", "--no-recreate"])
+
+        Helpers.docker_compose_up("/tmp/docker-compose.yml")
+        self.assertEqual(run_shell_command.call_args[0][0],
+                         ["docker-compose", "-f", "/tmp/docker-compose.yml", "up", "-d"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from monitoring import Monitoring
+from tests.fake_docker_engine import FakeDockerEngine
+from utils.DockerEngine import DockerEngine, DockerEngineError, split_image
+from utils.utils import Helpers
+
+
+class DockerEngineUnitTests(unittest.TestCase):
+
+    def tearDown(self):
+        DockerEngine.use(None)
+
+    def test_volumes_are_created_over_one_connection(self):
+        with FakeDockerEngine() as fake:
+            DockerEngine.use(DockerEngine(fake.socket_path))
+            Monitoring.setup_external_volumes()
+            DockerEngine.instance().close()
+        self.assertEqual(fake.volumes, {"prometheus_tsdb", "grafana-storage"})
+        self.assertEqual(fake.connections, 1)
+
+    def test_missing_images_are_pulled(self):
+        with FakeDockerEngine(images=["radixdlt/babylon-nginx:1.0.0"],
+                              registry=["radixdlt/babylon-node:v1.0.0"]) as fake, redirect_stdout(io.StringIO()):
+            engine = DockerEngine(fake.socket_path)
+            engine.ensure_images(["radixdlt/babylon-nginx:1.0.0", "radixdlt/babylon-node:v1.0.0",
+                                  "radixdlt/babylon-node:v1.0.0"])
+            self.assertEqual([request[2] for request in fake.requests if request[1] == "/images/create"],
+                             [{"fromImage": "radixdlt/babylon-node", "tag": "v1.0.0"}])
+            with self.assertRaises(DockerEngineError):
+                engine.pull_image("radixdlt/babylon-node:missing")
+            engine.close()
+
+    def test_run_container_pulls_runs_and_removes(self):
+        def run(container):
+            return (0, "done") if container["Cmd"][0] == "htpasswd" else (2, "bad arguments")
+
+        with FakeDockerEngine(registry=["radixdlt/htpasswd:v1.0.0"], run=run) as fake, \
+                redirect_stdout(io.StringIO()):
+            engine = DockerEngine(fake.socket_path)
+            exit_code, output = engine.run_container("radixdlt/htpasswd:v1.0.0", ["htpasswd", "-bc", "f", "u", "p"],
+                                                     binds=["node_nginx_secrets:/secrets"])
+            self.assertEqual((exit_code, output), (0, "done"))
+            self.assertEqual(fake.containers["container0"]["HostConfig"]["Binds"], ["node_nginx_secrets:/secrets"])
+            with self.assertRaises(SystemExit):
+                engine.run_container("radixdlt/htpasswd:v1.0.0", ["false"])
+            self.assertEqual(fake.removed, ["container0", "container1"])
+            engine.close()
+
+    def test_engine_errors_exit_with_a_message(self):
+        with FakeDockerEngine() as fake, tempfile.TemporaryDirectory() as tmpdir:
+            DockerEngine.use(DockerEngine(fake.socket_path))
+            output = io.StringIO()
+            with redirect_stdout(output):
+                with self.assertRaises(SystemExit):
+                    DockerEngine.instance().run_container("radixdlt/htpasswd:missing", ["htpasswd"])
+                self.assertEqual(DockerEngine.instance().run_container("radixdlt/htpasswd:missing", ["htpasswd"],
+                                                                       fail_on_error=False)[0], 125)
+                with open(f"{tmpdir}/compose.yml", "w") as f:
+                    f.write("services:\n  core:\n    image: radixdlt/babylon-node:missing\n")
+                with self.assertRaises(SystemExit):
+                    Helpers.docker_compose_up(f"{tmpdir}/compose.yml", ["core"])
+            DockerEngine.instance().close()
+        self.assertIn("Docker engine returned", output.getvalue())
+        self.assertIn("Command failed. Exiting...", output.getvalue())
+
+    def test_split_image(self):
+        self.assertEqual(split_image("localhost:5000/radixdlt/babylon-node"), ("localhost:5000/radixdlt/babylon-node",
+                                                                               "latest"))
+        self.assertEqual(split_image("radixdlt/babylon-node:v1.0.0"), ("radixdlt/babylon-node", "v1.0.0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from config.Renderer import Renderer
+from monitoring.FileTargets import FileTargets
+from radixnode import main
+from utils.YamlIO import YamlIO
+
+
+class FileTargetsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_file = f"{self.tmpdir.name}/monitoring_config.yaml"
+        YamlIO.dump_config_file({"common_config": {"config_dir": self.tmpdir.name}, "monitor_core": {
+            "metrics_path": "/prometheus/metrics", "metrics_target": "10.0.0.1", "scheme": "https",
+            "basic_auth_user": "metrics", "basic_auth_password": "secret", "scrape_interval": "5s",
+            "scrape_timeout": "5s"}}, self.config_file)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_targets(self, *args):
+        with mock.patch("sys.argv", ["main", "monitoring", "targets", *args, "-f", self.config_file]):
+            main()
+
+    def test_targets_file(self):
+        file_targets = FileTargets(f"{self.tmpdir.name}/nodes")
+        self.assertEqual(file_targets.add(["10.0.0.3:443", "10.0.0.2"], {"node": "a"}), ["10.0.0.3:443", "10.0.0.2"])
+        self.assertEqual(file_targets.add(["10.0.0.2"], {"node": "a"}), [])
+        self.assertEqual(file_targets.add(["10.0.0.4"], {}), ["10.0.0.4"])
+        with open(f"{self.tmpdir.name}/nodes/targets.json") as f:
+            self.assertEqual(json.load(f), [{"targets": ["10.0.0.2"], "labels": {"node": "a"}},
+                                            {"targets": ["10.0.0.3:443"], "labels": {"node": "a"}},
+                                            {"targets": ["10.0.0.4"]}])
+        self.assertEqual(file_targets.remove(["10.0.0.2", "10.0.0.9"]), ["10.0.0.2"])
+        self.assertEqual(list(file_targets.targets()), ["10.0.0.3:443", "10.0.0.4"])
+        with self.assertRaises(ValueError):
+            FileTargets.parse_labels(["node"])
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_targets_command_creates_the_nodes_job_once(self, mock_stdout):
+        self.run_targets("add", "10.0.0.2", "10.0.0.3", "-l", "region=eu")
+        self.run_targets("add", "10.0.0.4")
+        self.run_targets("remove", "10.0.0.3")
+        self.run_targets("list")
+        output = mock_stdout.getvalue()
+        self.assertEqual(output.count("Added the nodes job"), 1)
+        self.assertIn("10.0.0.2                                 region=eu", output)
+        self.assertNotIn("10.0.0.3 ", output.split("Removed 10.0.0.3")[1])
+
+        all_config = YamlIO.load_file(self.config_file)
+        self.assertEqual(all_config["monitor_nodes"]["basic_auth_password"], "secret")
+        rendered = Renderer().load_file_based_template("prometheus.yml.j2").render(all_config).to_yaml()
+        nodes_job = rendered["scrape_configs"][-1]
+        self.assertEqual(nodes_job["job_name"], "nodes")
+        self.assertEqual(nodes_job["file_sd_configs"], [{"files": ["/nodes/*.json"]}])
+        self.assertEqual(nodes_job["basic_auth"], {"username": "metrics", "password": "secret"})
+        self.assertEqual(nodes_job["scrape_interval"], "5s")
+
+    def test_nodes_folder_is_bind_mounted(self):
+        compose = Renderer().load_file_based_template("node-monitoring.yml.j2").render({}).to_yaml()
+        self.assertIn("./nodes/:/nodes", compose["services"]["prometheus"]["volumes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
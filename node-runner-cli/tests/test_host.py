@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from setup.Base import Base
+from setup.SystemD import SystemD
+from tests.fake_host import FakeHost
+from utils.Host import Host
+
+
+class HostUnitTests(unittest.TestCase):
+
+    def tearDown(self):
+        Host.use(None)
+
+    @mock.patch("setup.SystemD.run_shell_command")
+    def test_setup_user_only_adds_missing_user(self, run_shell_command):
+        Host.use(FakeHost(user="ubuntu", users=["ubuntu", "radixdlt"]))
+        SystemD.setup_user()
+        self.assertEqual([call.args[0] for call in run_shell_command.call_args_list],
+                         [['sudo', 'usermod', '-aG', 'docker', 'radixdlt']])
+
+        Host.use(FakeHost(user="ubuntu"))
+        SystemD.setup_user()
+        self.assertEqual(run_shell_command.call_args_list[1].args[0], 'sudo useradd -m -s /bin/bash radixdlt')
+
+    @mock.patch("setup.Base.run_shell_command")
+    def test_docker_group_is_checked_without_a_shell(self, run_shell_command):
+        Host.use(FakeHost(groups=["docker"]))
+        Base.add_user_docker_group()
+        self.assertEqual(run_shell_command.call_count, 1)
+
+        Host.use(FakeHost(groups=[]))
+        Base.add_user_docker_group()
+        self.assertIn("usermod -aG docker", run_shell_command.call_args.args[0])
+
+    def test_check_user(self):
+        Host.use(FakeHost(user="radixdlt"))
+        SystemD.checkUser()
+        Host.use(FakeHost(user="radixdlt-other"))
+        with self.assertRaises(SystemExit):
+            SystemD.checkUser()
+
+    def test_filesystem_operations(self):
+        host = Host.instance()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            node_dir = f"{tmpdir}/node/v1.0.0"
+            host.make_dirs(node_dir)
+            host.make_dirs(node_dir)
+            host.append_lines(f"{tmpdir}/default.config", ["network.id=1", "a=$HOME"])
+            self.assertEqual(host.read_text(f"{tmpdir}/default.config"), "network.id=1\na=$HOME\n")
+
+            host.make_dirs(f"{tmpdir}/core-v1.0.0/bin")
+            host.copy_file(f"{tmpdir}/default.config", f"{tmpdir}/core-v1.0.0/bin/core")
+            host.move_dir_contents(f"{tmpdir}/core-v1.0.0", node_dir)
+            self.assertTrue(os.path.isfile(f"{node_dir}/bin/core"))
+            self.assertEqual(os.listdir(f"{tmpdir}/core-v1.0.0"), [])
+
+            # Not clearing the node folder must not nest the new bin folder in the old one
+            host.make_dirs(f"{tmpdir}/core-v1.0.0/bin")
+            host.copy_file(f"{tmpdir}/default.config", f"{tmpdir}/core-v1.0.0/bin/core")
+            with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit):
+                host.move_dir_contents(f"{tmpdir}/core-v1.0.0", node_dir)
+            self.assertEqual(os.listdir(f"{node_dir}/bin"), ["core"])
+            self.assertEqual(os.listdir(f"{tmpdir}/core-v1.0.0"), ["bin"])
+
+            host.remove_dir_contents(node_dir)
+            self.assertEqual(os.listdir(node_dir), [])
+            self.assertTrue(host.path_exists(node_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
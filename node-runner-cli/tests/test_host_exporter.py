@@ -0,0 +1,134 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from io import StringIO
+from unittest import mock
+
+from config.Renderer import Renderer
+from monitoring.HostExporter import HostExporter
+from monitoring.PrometheusText import PrometheusText
+from radixnode import main
+from utils.YamlIO import YamlIO
+
+DISKSTATS = """   7       0 loop0 10 0 20 1 0 0 0 0 0 1 1 0 0 0 0 0 0
+   8       0 sda 1000 10 204800 1500 400 20 81920 2500 2 3000 4000 0 0 0 0 0 0
+ 253       0 dm-0 5 0 10 2 3 0 6 4 0 5 6
+"""
+
+
+class HostExporterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.proc = f"{self.tmpdir.name}/proc"
+        self.data_directory = f"{self.tmpdir.name}/data"
+        os.makedirs(self.data_directory)
+        self.write_proc("diskstats", DISKSTATS)
+        self.add_process("120", "bash\0-c\0sleep 10\0", "S")
+        self.add_process("4242", "java\0-Xmx8g\0com.radixdlt.RadixNodeModule\0", "S", fds=3)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_proc(self, path, content):
+        os.makedirs(os.path.dirname(f"{self.proc}/{path}"), exist_ok=True)
+        with open(f"{self.proc}/{path}", "w") as f:
+            f.write(content)
+
+    def add_process(self, pid, cmdline, state, fds=0):
+        self.write_proc(f"{pid}/cmdline", cmdline)
+        # utime 300 and stime 100 ticks, 42 threads, 1000 pages resident
+        fields = [state] + ["0"] * 10 + ["300", "100"] + ["0"] * 4 + ["42", "0", "0", "0", "1000"]
+        self.write_proc(f"{pid}/stat", f"{pid} (java (main)) {' '.join(fields)}")
+        self.write_proc(f"{pid}/limits", "Limit                     Soft Limit           Hard Limit           Units\n"
+                                         "Max open files            65536                65536                files\n")
+        os.makedirs(f"{self.proc}/{pid}/fd", exist_ok=True)
+        for fd in range(fds):
+            self.write_proc(f"{pid}/fd/{fd}", "")
+
+    def metrics(self, exporter) -> dict:
+        return {PrometheusText.series_key(name, labels): value
+                for name, labels, value in PrometheusText.parse(exporter.collect())}
+
+    def test_collects_disk_and_process_metrics(self):
+        metrics = self.metrics(HostExporter(self.data_directory, proc=self.proc))
+        self.assertEqual(metrics['radixnode_host_disk_read_bytes_total{device="sda"}'], 204800 * 512)
+        self.assertEqual(metrics['radixnode_host_disk_write_time_seconds_total{device="sda"}'], 2.5)
+        self.assertEqual(metrics['radixnode_host_disk_io_now{device="dm-0"}'], 0)
+        self.assertNotIn('radixnode_host_disk_reads_completed_total{device="loop0"}', metrics)
+        self.assertEqual(metrics["radixnode_host_process_up"], 1)
+        self.assertEqual(metrics["radixnode_host_process_cpu_seconds_total"], 400 / os.sysconf("SC_CLK_TCK"))
+        self.assertEqual(metrics["radixnode_host_process_resident_memory_bytes"],
+                         1000 * os.sysconf("SC_PAGE_SIZE"))
+        self.assertEqual(metrics["radixnode_host_process_threads"], 42)
+        self.assertEqual(metrics["radixnode_host_process_open_fds"], 3)
+        self.assertEqual(metrics["radixnode_host_process_max_fds"], 65536)
+        size = next(value for key, value in metrics.items() if key.startswith("radixnode_host_filesystem_size"))
+        self.assertGreater(size, 0)
+        self.assertIn(f'path="{self.data_directory}"', next(key for key in metrics if "filesystem_avail" in key))
+
+    def test_process_is_looked_up_again_when_it_is_gone(self):
+        exporter = HostExporter(self.data_directory, proc=self.proc)
+        self.assertEqual(exporter.find_pid(), "4242")
+        os.remove(f"{self.proc}/4242/cmdline")
+        self.assertEqual(self.metrics(exporter)["radixnode_host_process_up"], 0)
+        self.add_process("5000", "/usr/bin/java\0com.radixdlt.RadixNodeModule\0", "R")
+        self.assertEqual(exporter.find_pid(), "5000")
+
+    def test_textfile_and_http_server(self):
+        exporter = HostExporter(self.data_directory, proc=self.proc)
+        textfile = f"{self.tmpdir.name}/radixnode.prom"
+        exporter.write_textfile(textfile)
+        with open(textfile) as f:
+            self.assertIn("radixnode_host_process_threads 42", f.read())
+        self.assertFalse(os.path.exists(f"{textfile}.tmp"))
+
+        server = exporter.http_server(0, "127.0.0.1")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as resp:
+                self.assertIn("radixnode_host_process_up 1", resp.read().decode("utf-8"))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_default_address_is_not_public(self):
+        self.assertEqual(HostExporter.interface_address("lo"), "127.0.0.1")
+        self.assertIsNone(HostExporter.interface_address("missing0"))
+        with mock.patch("monitoring.HostExporter.HostExporter.interface_address", return_value=None):
+            self.assertEqual(HostExporter.default_address(), "127.0.0.1")
+        with mock.patch("monitoring.HostExporter.HostExporter.interface_address", return_value="172.17.0.1"):
+            self.assertEqual(HostExporter.default_address(), "172.17.0.1")
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    @mock.patch.dict(os.environ, {"NODE_HOST_IP_OR_NAME": "10.0.0.1"})
+    def test_update_config_adds_the_host_job(self, mock_stdout):
+        config_file = f"{self.tmpdir.name}/monitoring_config.yaml"
+        YamlIO.dump_config_file({"common_config": {"config_dir": self.tmpdir.name}}, config_file)
+        with mock.patch("monitoring.HostExporter.HostExporter.http_server") as http_server, \
+                mock.patch("monitoring.HostExporter.HostExporter.interface_address", return_value="172.17.0.1"), \
+                mock.patch("sys.argv", ["main", "monitoring", "host-exporter", "-d", self.data_directory, "-u",
+                                        "-p", "9200", "-f", config_file]):
+            main()
+        http_server.assert_called_once_with(9200, "172.17.0.1")
+
+        all_config = YamlIO.load_file(config_file)
+        rendered = Renderer().load_file_based_template("prometheus.yml.j2").render(all_config).to_yaml()
+        host_job = rendered["scrape_configs"][-1]
+        self.assertEqual(host_job["job_name"], "host")
+        self.assertEqual(host_job["metrics_path"], "/metrics")
+        self.assertEqual(host_job["static_configs"][0]["targets"], ["172.17.0.1:9200"])
+        self.assertNotIn("basic_auth", host_job)
+
+        with mock.patch("monitoring.HostExporter.HostExporter.http_server") as http_server, \
+                mock.patch("sys.argv", ["main", "monitoring", "host-exporter", "-d", self.data_directory, "-u",
+                                        "-b", "0.0.0.0", "-f", config_file]):
+            with self.assertRaises(SystemExit):
+                main()
+        http_server.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
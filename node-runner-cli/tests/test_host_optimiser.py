@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from setup.Base import Base
+from setup.HostOptimiser import HostOptimiser
+
+LIMITS_CONF = """# /etc/security/limits.conf
+#<domain>      <type>  <item>         <value>
+radix - nofile 1024
+*     soft core 0
+"""
+
+
+class HostOptimiserTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.write("etc/security/limits.conf", LIMITS_CONF)
+        self.write("etc/fstab", "UUID=1234 / ext4 defaults 0 1\n")
+        self.write("etc/sysctl.conf", "vm.swappiness=60\n")
+        self.write("proc/swaps", "Filename\tType\tSize\tUsed\tPriority\n")
+        self.commands = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(f"{self.root}/{path}"), exist_ok=True)
+        with open(f"{self.root}/{path}", "w") as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(f"{self.root}/{path}") as f:
+            return f.read()
+
+    def optimiser(self):
+        return HostOptimiser(self.root, run=self.commands.append)
+
+    def test_limits_replace_the_values_of_the_user(self):
+        updated = HostOptimiser.set_limits(LIMITS_CONF, "radix")
+        self.assertIn("radix - nofile 65536\n", updated)
+        self.assertNotIn("1024", updated)
+        self.assertIn("radix hard memlock unlimited\n", updated)
+        self.assertIn("*     soft core 0\n", updated)
+        self.assertEqual(HostOptimiser.set_limits(updated, "radix"), updated)
+        self.assertEqual(HostOptimiser.swap_size_bytes("8G"), 8 * 1024 ** 3)
+        with self.assertRaises(ValueError):
+            HostOptimiser.swap_size_bytes("lots")
+
+    def test_dry_run_prints_the_diff_and_changes_nothing(self):
+        optimiser = self.optimiser()
+        optimiser.plan_limits("radix")
+        optimiser.plan_swap("1M")
+        diff = optimiser.diff()
+        self.assertIn("-radix - nofile 1024\n+radix - nofile 65536", diff)
+        self.assertIn("+/swapfile none swap sw 0 0", diff)
+        self.assertIn("-vm.swappiness=60\n+vm.swappiness=10\n+vm.vfs_cache_pressure=50", diff)
+        self.assertIn("create /swapfile of 1 MB with mode 600", diff)
+        self.assertIn(f"run swapon {self.root}/swapfile", diff)
+        self.assertEqual(self.read("etc/security/limits.conf"), LIMITS_CONF)
+        self.assertFalse(os.path.exists(f"{self.root}/swapfile"))
+
+    def test_apply_is_idempotent(self):
+        optimiser = self.optimiser()
+        optimiser.plan_limits("radix")
+        optimiser.plan_swap("1M")
+        optimiser.apply()
+        self.assertEqual(os.path.getsize(f"{self.root}/swapfile"), 1024 ** 2)
+        self.assertEqual(os.stat(f"{self.root}/swapfile").st_mode & 0o777, 0o600)
+        self.assertEqual(self.read("etc/fstab"), "UUID=1234 / ext4 defaults 0 1\n/swapfile none swap sw 0 0\n")
+        self.assertEqual(self.read("etc/sysctl.conf"), "vm.swappiness=10\nvm.vfs_cache_pressure=50\n")
+        self.assertEqual(self.commands, [f"mkswap {self.root}/swapfile", f"swapon {self.root}/swapfile",
+                                         "sysctl -w vm.swappiness=10 -w vm.vfs_cache_pressure=50"])
+        self.assertEqual(len([file for file in os.listdir(f"{self.root}/etc") if file.startswith("fstab_")]), 1)
+
+        self.write("proc/swaps", "Filename\tType\tSize\tUsed\tPriority\n/swapfile file 1024 0 -2\n")
+        optimiser = self.optimiser()
+        optimiser.plan_limits("radix")
+        optimiser.plan_swap("1M")
+        self.assertFalse(optimiser.has_changes())
+
+    def test_failed_swap_command_leaves_fstab_alone(self):
+        def run(command):
+            self.commands.append(command)
+            if command.startswith("mkswap"):
+                sys.exit(1)
+
+        optimiser = HostOptimiser(self.root, run=run)
+        optimiser.plan_swap("1M")
+        with self.assertRaises(SystemExit):
+            optimiser.apply()
+        self.assertEqual(self.commands, [f"mkswap {self.root}/swapfile"])
+        self.assertEqual(self.read("etc/fstab"), "UUID=1234 / ext4 defaults 0 1\n")
+        self.assertEqual(self.read("etc/sysctl.conf"), "vm.swappiness=60\n")
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_optimise_node_prompts(self, mock_stdout):
+        with mock.patch('builtins.input', side_effect=["", "Y", "1G"]):
+            Base.setup_node_optimisation_config(dry_run=True, optimiser=self.optimiser())
+        self.assertIn("+/swapfile none swap sw 0 0", mock_stdout.getvalue())
+        self.assertEqual(self.commands, [])
+        self.assertEqual(self.read("etc/fstab"), "UUID=1234 / ext4 defaults 0 1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from config.DockerConfig import CoreDockerSettings
+from config.JavaOpts import JavaOpts
+from config.JvmSizing import JvmSizing
+from config.Renderer import Renderer
+from config.SystemDConfig import SystemDSettings, CoreSystemdSettings
+
+DEFAULT_JAVA_OPTS = "--enable-preview -server -Xms8g -Xmx8g  -XX:MaxDirectMemorySize=2048m " \
+                    "-XX:+HeapDumpOnOutOfMemoryError -XX:+UseCompressedOops " \
+                    "-Djavax.net.ssl.trustStore=/etc/ssl/certs/java/cacerts " \
+                    "-Djavax.net.ssl.trustStoreType=jks -Djava.security.egd=file:/dev/urandom " \
+                    "-DLog4jContextSelector=org.apache.logging.log4j.core.async.AsyncLoggerContextSelector"
+
+
+class JvmSizingTests(unittest.TestCase):
+
+    def test_sizing_follows_the_host_memory(self):
+        sizing = JvmSizing(16 * 1024, 4)
+        self.assertEqual((sizing.heap_mb, sizing.direct_memory_mb, sizing.memory_limit_mb), (8704, 2048, 12928))
+        self.assertEqual(sizing.warnings, [])
+        sizing = JvmSizing(32 * 1024, 8)
+        self.assertEqual((sizing.heap_mb, sizing.direct_memory_mb, sizing.memory_limit_mb), (17408, 4096, 25856))
+        sizing = JvmSizing(256 * 1024, 64)
+        self.assertEqual((sizing.heap_mb, sizing.direct_memory_mb), (31 * 1024, 4096))
+
+    def test_guard_rails_on_small_hosts(self):
+        sizing = JvmSizing(4 * 1024, 1)
+        self.assertEqual((sizing.heap_mb, sizing.direct_memory_mb), (2048, 1024))
+        self.assertEqual(len(sizing.warnings), 2)
+        self.assertIn("-XX:+UseG1GC", sizing.java_opts(DEFAULT_JAVA_OPTS))
+
+    def test_java_opts_keep_the_other_options(self):
+        java_opts = JvmSizing(32 * 1024, 8).java_opts(DEFAULT_JAVA_OPTS + " -XX:+UseParallelGC -Xmx2g")
+        self.assertEqual(JavaOpts.max_heap_bytes(java_opts), 17408 * 1024 ** 2)
+        self.assertEqual(JavaOpts.max_direct_memory_bytes(java_opts), 4 * 1024 ** 3)
+        self.assertEqual(java_opts.split().count("-Xmx17408m"), 1)
+        self.assertNotIn("-XX:+UseParallelGC", java_opts)
+        self.assertIn("-XX:+UseCompressedOops", java_opts)
+        self.assertTrue(java_opts.startswith("--enable-preview -server -Xms17408m -Xmx17408m "
+                                             "-XX:MaxDirectMemorySize=4096m -XX:+HeapDumpOnOutOfMemoryError"))
+        self.assertTrue(java_opts.endswith("-XX:+UseG1GC -XX:ActiveProcessorCount=8"))
+
+    def test_cgroup_limits_are_used_when_smaller(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(f"{tmpdir}/proc")
+            os.makedirs(f"{tmpdir}/cgroup")
+            with open(f"{tmpdir}/proc/meminfo", "w") as f:
+                f.write("MemTotal:       65768268 kB\nMemFree:        1000 kB\n")
+            self.assertEqual(JvmSizing.host_memory_mb(f"{tmpdir}/proc", f"{tmpdir}/cgroup"), 64226)
+            with open(f"{tmpdir}/cgroup/memory.max", "w") as f:
+                f.write(f"{16 * 1024 ** 3}\n")
+            with open(f"{tmpdir}/cgroup/cpu.max", "w") as f:
+                f.write("150000 100000\n")
+            self.assertEqual(JvmSizing.host_memory_mb(f"{tmpdir}/proc", f"{tmpdir}/cgroup"), 16384)
+            with mock.patch("os.sched_getaffinity", return_value=set(range(8))):
+                self.assertEqual(JvmSizing.host_cpus(f"{tmpdir}/cgroup"), 2)
+            with open(f"{tmpdir}/cgroup/memory.max", "w") as f:
+                f.write("max\n")
+            self.assertEqual(JvmSizing.host_memory_mb(f"{tmpdir}/proc", f"{tmpdir}/cgroup"), 64226)
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_docker_config_and_compose_file(self, mock_stdout):
+        settings = CoreDockerSettings({})
+        settings.core_release = "v1.0.0"
+        settings.size_jvm(JvmSizing(32 * 1024, 8))
+        self.assertEqual(settings.memory_limit, "25856m")
+        self.assertIn("heap 17408 MB", mock_stdout.getvalue())
+        self.assertIn("memory_limit", dict(settings))
+        self.assertNotIn("memory_limit", dict(CoreDockerSettings({})))
+        compose = Renderer().load_file_based_template("radix-fullnode-compose.yml.j2").render(
+            {"core_node": dict(settings), "common_config": {"network_id": 1}}).to_yaml()
+        self.assertEqual(compose["services"]["core"]["mem_limit"], "25856m")
+        self.assertIn("-Xmx17408m", compose["services"]["core"]["environment"]["JAVA_OPTS"])
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_systemd_environment_file(self, mock_stdout):
+        settings = SystemDSettings({})
+        settings.core_node = CoreSystemdSettings({})
+        settings.core_node.size_jvm(JvmSizing(16 * 1024, 4))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            settings.core_node.node_secrets_dir = tmpdir
+            settings.create_environment_file()
+            with open(f"{tmpdir}/environment") as f:
+                self.assertIn("-Xms8704m -Xmx8704m -XX:MaxDirectMemorySize=2048m", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
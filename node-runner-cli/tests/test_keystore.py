@@ -0,0 +1,44 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from cryptography.hazmat.primitives.serialization import pkcs12
+from ecdsa.util import sigdecode_der
+
+from key_interaction.KeyInteraction import KeyInteraction
+from key_interaction.KeystoreGenerator import KeystoreGenerator
+
+
+class KeystoreGeneratorUnitTests(unittest.TestCase):
+
+    def test_generated_keystore_is_read_by_key_interaction(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            keystore_file = f"{tmpdir}/node-keystore.ks"
+            KeystoreGenerator.write_keystore(keystore_file, "nodepassword")
+            self.assertEqual(os.stat(keystore_file).st_mode & 0o777, 0o644)
+
+            key = KeyInteraction(b"nodepassword", keystore_file)
+            self.assertEqual(key.private_signing_key.curve.name, "SECP256k1")
+            self.assertTrue(key.get_validator_address().startswith("rv1"))
+            self.assertEqual(len(key.get_validator_hex_public_key()), 66)
+
+            payload = hashlib.sha256(b"payload").hexdigest()
+            signature = bytes.fromhex(key.sign_payload(payload))
+            self.assertTrue(key.get_verifying_key().verify_digest(signature, bytes.fromhex(payload),
+                                                                  sigdecode=sigdecode_der))
+
+            with self.assertRaises(ValueError):
+                KeyInteraction(b"wrongpassword", keystore_file)
+            with self.assertRaises(FileExistsError):
+                KeystoreGenerator.write_keystore(keystore_file, "nodepassword")
+
+    def test_key_is_stored_under_the_node_alias_with_a_certificate(self):
+        keystore = pkcs12.load_pkcs12(KeystoreGenerator.create_keystore("nodepassword"), b"nodepassword")
+        self.assertEqual(keystore.key.curve.name, "secp256k1")
+        self.assertEqual(keystore.cert.friendly_name, b"node")
+        self.assertEqual(keystore.cert.certificate.public_key(), keystore.key.public_key())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from key_interaction.KeyInteraction import KeyInteraction
+from key_interaction.KeystoreBatch import KeystoreBatch
+from key_interaction.KeystoreGenerator import KeystoreGenerator
+
+
+class KeystoreBatchUnitTests(unittest.TestCase):
+
+    def test_batch_info_with_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(f"{tmpdir}/backups/2023")
+            for name in ["backups/node-keystore.ks", "backups/2023/node-keystore.ks", "backups/other.ks"]:
+                KeystoreGenerator.write_keystore(f"{tmpdir}/{name}", "password" if "other" not in name else "other")
+            with open(f"{tmpdir}/manifest.txt", "w") as f:
+                f.write("# keystores to audit\nbackups/node-keystore.ks\nbackups/other.ks\nbackups/missing.ks\n")
+
+            batch = KeystoreBatch(b"password", jobs=2, cache_file=f"{tmpdir}/cache/keystores.json")
+            files = KeystoreBatch.keystore_files(f"{tmpdir}/backups")
+            self.assertEqual(len(files), 3)
+            results = list(batch.inspect(files))
+            expected = KeyInteraction(b"password", f"{tmpdir}/backups/node-keystore.ks")
+            self.assertEqual(results[1]["file"], f"{tmpdir}/backups/node-keystore.ks")
+            self.assertEqual(results[1]["validator_address"], expected.get_validator_address())
+            self.assertEqual(results[1]["validator_wallet_address"], expected.get_validator_wallet_address())
+            self.assertEqual(results[1]["validator_hex_public_key"], expected.get_validator_hex_public_key())
+            self.assertFalse(results[1]["cached"])
+            self.assertIn("error", results[2])
+
+            results = list(batch.inspect(KeystoreBatch.keystore_files(f"{tmpdir}/manifest.txt")))
+            self.assertEqual([result["file"] for result in results],
+                             [f"{tmpdir}/backups/{name}" for name in ["node-keystore.ks", "other.ks", "missing.ks"]])
+            self.assertTrue(results[0]["cached"])
+            self.assertFalse(results[1]["cached"])
+            self.assertIn("FileNotFoundError", results[2]["error"])
+
+            wrong_password = KeystoreBatch(b"wrong", jobs=2, cache_file=f"{tmpdir}/cache/keystores.json")
+            results = list(wrong_password.inspect([f"{tmpdir}/backups/node-keystore.ks"]))
+            self.assertFalse(results[0]["cached"])
+            self.assertIn("error", results[0])
+            with open(f"{tmpdir}/cache/keystores.json") as f:
+                self.assertNotIn("password", f.read())
+            self.assertEqual(os.stat(f"{tmpdir}/cache/keystores.json").st_mode & 0o777, 0o600)
+
+
+if __name__ == '__main__':
+    unittest.main()
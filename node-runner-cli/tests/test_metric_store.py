@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+import requests
+
+from monitoring.MetricStore import MetricStore
+from monitoring.PrometheusText import PrometheusText
+from radixnode import main
+
+METRICS = """# HELP rn_misc_peer_count Number of peers
+# TYPE rn_misc_peer_count gauge
+rn_misc_peer_count 12.0
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total {cpu} 1700000000000
+jvm_memory_bytes_used{{area="heap",}} 1.5E8
+jvm_memory_bytes_used{{area="nonheap",}} 9.0E7
+nodeinfo{{branch="release\\\\\\"x\\"",version="v1.0.0"}} 1.0
+"""
+
+
+class MetricStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_dir = f"{self.tmpdir.name}/scrape"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_exposition_format(self):
+        samples = list(PrometheusText.parse(METRICS.format(cpu=3.5)))
+        self.assertEqual(samples[0], ("rn_misc_peer_count", {}, 12.0))
+        self.assertEqual(samples[1], ("process_cpu_seconds_total", {}, 3.5))
+        self.assertEqual(samples[2], ("jvm_memory_bytes_used", {"area": "heap"}, 1.5e8))
+        self.assertEqual(samples[4][1], {"branch": 'release\\"x"', "version": "v1.0.0"})
+        self.assertEqual(PrometheusText.series_key(*samples[2][:2]), 'jvm_memory_bytes_used{area="heap"}')
+
+    def test_ring_buffer_keeps_the_latest_rows(self):
+        series = MetricStore.select_series(METRICS.format(cpu=0), ["rn_misc_peer_count", "process_*",
+                                                                   'jvm_memory_bytes_used{area="heap"}'])
+        self.assertEqual(series, ["rn_misc_peer_count", "process_cpu_seconds_total",
+                                  'jvm_memory_bytes_used{area="heap"}'])
+        store = MetricStore.create(self.store_dir, series, capacity=4)
+        self.assertEqual(os.path.getsize(f"{self.store_dir}/samples.ring"), 8 + 4 * 4 * 8)
+        cpu = [10, 20, 30, 5, 15, 25]
+        for second, value in enumerate(cpu):
+            self.assertEqual(store.record(METRICS.format(cpu=value), 1000 + second), 3)
+        store.close()
+
+        store = MetricStore(self.store_dir)
+        timestamps, values = store.window("process_cpu_seconds_total")
+        self.assertEqual(list(timestamps), [1002, 1003, 1004, 1005])
+        self.assertEqual(list(values), [30, 5, 15, 25])
+        self.assertEqual(list(store.window("process_cpu_seconds_total", since=1004)[1]), [15, 25])
+
+        summary = MetricStore.summarize(timestamps, values, quantiles=[0.5])
+        self.assertEqual((summary["samples"], summary["min"], summary["max"], summary["avg"]), (4, 5, 30, 18.75))
+        self.assertEqual(summary["p50"], 20)
+        # 30 -> 5 is a counter reset, so the increase is 5 + 10 + 10 over 3 seconds
+        self.assertAlmostEqual(summary["rate"], 25 / 3)
+        store.close()
+
+    def test_missing_series_is_not_in_the_window(self):
+        store = MetricStore.create(self.store_dir, ["rn_misc_peer_count"], capacity=3)
+        store.record("rn_misc_peer_count 3", 1)
+        store.record("", 2)
+        self.assertEqual(list(store.window("rn_misc_peer_count")[1]), [3])
+        self.assertEqual(MetricStore.summarize(*store.window("rn_misc_peer_count", since=2)), {"samples": 0})
+        store.close()
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_scrape_and_query_commands(self, mock_stdout):
+        responses = [mock.Mock(ok=True, content=METRICS.format(cpu=value).encode()) for value in (100, 130)]
+        with mock.patch.dict(os.environ, {"NGINX": "false"}), \
+                mock.patch("api.SystemApiHelper.SystemApiHelper.prometheus_metrics",
+                           side_effect=responses) as prometheus_metrics, \
+                mock.patch("sys.argv", ["main", "monitoring", "scrape", "-d", self.store_dir, "-n", "2", "-i", "0",
+                                        "-s", "rn_misc_peer_count", "process_cpu_seconds_total"]):
+            main()
+        store = MetricStore(self.store_dir)
+        self.assertEqual(store.series, ["rn_misc_peer_count", "process_cpu_seconds_total"])
+        store.close()
+
+        with mock.patch("sys.argv", ["main", "monitoring", "query", "-d", self.store_dir, "-s", "rn_*",
+                                     "-q", "0.5"]):
+            main()
+        output = mock_stdout.getvalue()
+        self.assertIn("recorded 2 series", output)
+        self.assertEqual(prometheus_metrics.call_args.kwargs["timeout"], 1.0)
+        self.assertRegex(output, r"rn_misc_peer_count\s+2\s+12\s+12\s+12\s+0\s+12")
+        self.assertNotIn("process_cpu_seconds_total  ", output)
+
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_scrape_continues_after_a_timeout(self, mock_stdout):
+        responses = [requests.exceptions.ReadTimeout("read timed out"),
+                     mock.Mock(ok=True, content=METRICS.format(cpu=100).encode())]
+        with mock.patch.dict(os.environ, {"NGINX": "false"}), \
+                mock.patch("api.SystemApiHelper.SystemApiHelper.prometheus_metrics",
+                           side_effect=responses) as prometheus_metrics, \
+                mock.patch("sys.argv", ["main", "monitoring", "scrape", "-d", self.store_dir, "-n", "2", "-i", "0",
+                                        "-s", "rn_misc_peer_count"]):
+            main()
+        self.assertEqual(prometheus_metrics.call_count, 2)
+        self.assertIn("Scrape failed: read timed out", mock_stdout.getvalue())
+        self.assertIn("recorded 1 series", mock_stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
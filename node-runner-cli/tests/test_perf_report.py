@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+from config.JavaOpts import JavaOpts
+from monitoring.PerfReport import PerfReport
+from monitoring.PrometheusText import PrometheusText
+
+JAVA_OPTS = "--enable-preview -server -Xms8g -Xmx8g  -XX:MaxDirectMemorySize=2048m -XX:+HeapDumpOnOutOfMemoryError"
+
+METRICS = """# TYPE jvm_gc_collection_seconds summary
+jvm_gc_collection_seconds_count{{gc="G1 Young Generation",}} {gc_count}
+jvm_gc_collection_seconds_sum{{gc="G1 Young Generation",}} {gc_sum}
+jvm_memory_bytes_used{{area="heap",}} {heap}
+jvm_memory_bytes_max{{area="heap",}} 8.589934592E9
+jvm_buffer_pool_used_bytes{{pool="direct",}} {direct}
+jvm_buffer_pool_used_bytes{{pool="mapped",}} 1.0E9
+rn_sync_current_state_version {current}
+rn_sync_target_state_version {target}
+rn_bft_round_duration_seconds_bucket{{le="0.5",}} {fast}
+rn_bft_round_duration_seconds_bucket{{le="1.0",}} {slow}
+rn_bft_round_duration_seconds_bucket{{le="+Inf",}} {slow}
+rn_bft_timeouts_total {timeouts}
+"""
+
+
+def snapshot(timestamp, **values):
+    return timestamp, list(PrometheusText.parse(METRICS.format(**values)))
+
+
+class PerfReportTests(unittest.TestCase):
+
+    def test_java_opts_memory_limits(self):
+        self.assertEqual(JavaOpts.max_heap_bytes(JAVA_OPTS), 8 * 1024 ** 3)
+        self.assertEqual(JavaOpts.max_direct_memory_bytes(JAVA_OPTS), 2048 * 1024 ** 2)
+        self.assertEqual(JavaOpts.max_heap_bytes("-Xmx4g -Xmx12G"), 12 * 1024 ** 3)
+        self.assertIsNone(JavaOpts.max_direct_memory_bytes("-Xmx4g"))
+        self.assertIsNone(JavaOpts.parse_size("lots"))
+
+    def test_healthy_node_has_no_anomalies(self):
+        snapshots = [snapshot(0, gc_count=10, gc_sum=0.1, heap=4e9, direct=5e8, current=1000, target=1000, fast=10,
+                              slow=10, timeouts=3),
+                     snapshot(60, gc_count=20, gc_sum=0.2, heap=5368709120, direct=536870912, current=1600,
+                              target=1610, fast=70, slow=80, timeouts=3)]
+        lines, anomalies = PerfReport(snapshots, JAVA_OPTS).report()
+        report = "\n".join(lines)
+        self.assertEqual(anomalies, [])
+        self.assertIn("G1 Young Generation: 10 collections, 0.17% of the time, pause p50 10.0 ms", report)
+        self.assertIn("heap: peak 5.00 GB of 8.00 GB (62%), headroom 3.00 GB", report)
+        self.assertIn("direct memory: peak 0.50 GB of 2.00 GB (25%)", report)
+        self.assertIn("state version 1600, 10.00 state versions/s", report)
+        self.assertIn("sync lag at the end 10", report)
+        self.assertIn("rn_bft_round_duration_seconds: p50 0.292, p90 0.65", report)
+        self.assertIn("rn_bft_timeouts_total: 0 in the window", report)
+
+    def test_anomalies_over_thresholds(self):
+        snapshots = [snapshot(0, gc_count=10, gc_sum=1, heap=4e9, direct=5e8, current=1000, target=9000, fast=10,
+                              slow=10, timeouts=3),
+                     snapshot(10, gc_count=11, gc_sum=1.5, heap=8e9, direct=2e9, current=1000, target=9500, fast=10,
+                              slow=20, timeouts=5)]
+        _, anomalies = PerfReport(snapshots, JAVA_OPTS).report()
+        self.assertEqual(len(anomalies), 6)
+        self.assertIn("G1 Young Generation p99 pause is 500.0 ms (threshold 200)", anomalies)
+        self.assertIn("the node is behind and its state version did not move", anomalies)
+        self.assertIn("rn_bft_timeouts_total increased by 2", anomalies)
+
+        _, anomalies = PerfReport(snapshots, JAVA_OPTS, {"gc_time_percent": 10, "gc_pause_p99_ms": 1000,
+                                                         "heap_used_percent": 100, "direct_used_percent": 100,
+                                                         "sync_lag": 10000}).report()
+        self.assertEqual(anomalies, ["the node is behind and its state version did not move",
+                                     "rn_bft_timeouts_total increased by 2"])
+
+    def test_limits_default_to_the_jvm_max_heap(self):
+        snapshots = [snapshot(0, gc_count=0, gc_sum=0, heap=1e9, direct=1e9, current=1, target=1, fast=0, slow=0,
+                              timeouts=0),
+                     snapshot(5, gc_count=0, gc_sum=0, heap=1e9, direct=1e9, current=2, target=2, fast=0, slow=0,
+                              timeouts=0)]
+        report = "\n".join(PerfReport(snapshots).report()[0])
+        self.assertIn("G1 Young Generation: no collections", report)
+        self.assertIn("direct memory: peak 0.93 GB of 8.00 GB", report)
+
+    @mock.patch("time.sleep")
+    def test_sample_node_takes_at_least_two_snapshots(self, mock_sleep):
+        fetch = mock.Mock(return_value="rn_sync_current_state_version 5\n")
+        self.assertEqual(len(PerfReport.sample_node(fetch, window=10, interval=30)), 2)
+        self.assertEqual(len(PerfReport.sample_node(fetch, window=60, interval=15)), 5)
+
+    def test_query_prometheus_groups_series_by_timestamp(self):
+        resp = mock.Mock(ok=True)
+        resp.json.return_value = {"data": {"result": [
+            {"metric": {"__name__": "rn_sync_current_state_version", "job": "mynode"},
+             "values": [[100, "1"], [115, "16"]]},
+            {"metric": {"__name__": "rn_sync_target_state_version", "job": "mynode"},
+             "values": [[100, "20"], [115, "20"]]}]}}
+        with mock.patch("utils.utils.Helpers.send_request", return_value=resp) as send_request:
+            snapshots = PerfReport.query_prometheus("http://localhost:9090/prometheus", 300, 15)
+        self.assertIn("query_range", send_request.call_args[0][0].url)
+        self.assertEqual(send_request.call_args.kwargs["timeout"], 60)
+        self.assertEqual(snapshots[1], (115.0, [("rn_sync_current_state_version", {"job": "mynode"}, 16.0),
+                                                ("rn_sync_target_state_version", {"job": "mynode"}, 20.0)]))
+        self.assertIn("state version 16, 1.00 state versions/s", "\n".join(PerfReport(snapshots).report()[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from config.ArtifactManifest import ArtifactManifest
+from monitoring import Monitoring
+from monitoring.RecordingRules import RecordingRules
+from utils.YamlIO import YamlIO
+
+P95 = 'histogram_quantile(0.95, sum(rate(http_request_duration_seconds_bucket{code=~"[23]..",  container="gateway-api"}[5m])) by (le))'
+P99 = 'histogram_quantile(0.99, sum by(le) (rate(http_request_duration_seconds_bucket{container="gateway-api", code=~"[23].."} [5m])))'
+
+
+class RecordingRulesTests(unittest.TestCase):
+
+    def test_same_aggregation_is_recorded_once(self):
+        normalized = {candidate[2] for expression in (P95, P99) for candidate in RecordingRules.candidates(expression)}
+        self.assertEqual(normalized, {'sum by (le) (rate(http_request_duration_seconds_bucket'
+                                      '{code=~"[23]..",container="gateway-api"}[5m]))'})
+        rules = {normalized.pop(): "le:http_request_duration_seconds_bucket:rate5m"}
+        self.assertEqual(RecordingRules.rewrite(P95, rules),
+                         "histogram_quantile(0.95, le:http_request_duration_seconds_bucket:rate5m)")
+        self.assertEqual(RecordingRules.rewrite(P99, rules),
+                         "histogram_quantile(0.99, le:http_request_duration_seconds_bucket:rate5m)")
+
+    def test_variable_and_long_ranges_are_not_recorded(self):
+        self.assertEqual(RecordingRules.candidates('sum(rate(x_total{job="$job"}[5m]))'), [])
+        self.assertEqual(RecordingRules.candidates("sum(rate(x_total[$__rate_interval]))"), [])
+        self.assertEqual(RecordingRules.candidates("sum(increase(x_total[24h])) or vector(0)"), [])
+        self.assertEqual([candidate[2:] for candidate in RecordingRules.candidates("rate(x_total[1m]) * 2")],
+                         [("rate(x_total[1m])", "x_total:rate1m")])
+        # The rate is not the only argument of the aggregation, so only the rate is recorded
+        self.assertEqual([candidate[2] for candidate in RecordingRules.candidates("sum(rate(x_total[1m]) * 2)")],
+                         ["rate(x_total[1m])"])
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_dashboards_query_the_recorded_series(self, mock_stdout):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = ArtifactManifest.in_directory(tmpdir)
+            self.assertTrue(Monitoring.template_recording_rules(Monitoring.dashboard_files, tmpdir, manifest))
+            self.assertTrue(Monitoring.template_dashboards(Monitoring.dashboard_files, tmpdir, manifest))
+            self.assertFalse(Monitoring.template_recording_rules(Monitoring.dashboard_files, tmpdir, manifest))
+
+            rules = YamlIO.load_file(f"{tmpdir}/prometheus/recording_rules.yml")["groups"][0]["rules"]
+            recorded = {rule["record"] for rule in rules}
+            self.assertIn("le:http_request_duration_seconds_bucket:rate5m", recorded)
+            self.assertEqual(len(recorded), len(rules))
+
+            with open(f"{tmpdir}/grafana/provisioning/dashboards/network-gateway-dashboard.json") as f:
+                expressions = RecordingRules.expressions(json.load(f))
+            self.assertIn("histogram_quantile(0.95, le:http_request_duration_seconds_bucket:rate5m)", expressions)
+            self.assertFalse(any("rate(http_request_duration_seconds_bucket" in expression
+                                 for expression in expressions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from config.Renderer import Renderer
+
+
+class RendererUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        Renderer.environments = {}
+
+    def tearDown(self):
+        Renderer.environments = {}
+
+    def test_environment_is_shared_between_renders(self):
+        with mock.patch.dict(os.environ, {"RADIXNODE_CACHE_DIR": self.cache_dir}):
+            first = Renderer().load_file_based_template("datasource.yml.j2")
+            second = Renderer().load_file_based_template("dashboard.yml.j2")
+        self.assertIs(first.env, second.env)
+
+    def test_compiled_templates_are_cached_on_disk(self):
+        with mock.patch.dict(os.environ, {"RADIXNODE_CACHE_DIR": self.cache_dir}):
+            rendered = Renderer().load_file_based_template("dashboard.yml.j2").render({}).rendered
+            self.assertTrue(os.listdir(f"{self.cache_dir}/templates"))
+
+            # A fresh environment, like a new run of the binary, loads the template from the bytecode cache
+            Renderer.environments = {}
+            self.assertEqual(Renderer().load_file_based_template("dashboard.yml.j2").render({}).rendered, rendered)
+
+    def test_json_template_is_written_without_yaml_round_trip(self):
+        file_location = f"{self.cache_dir}/babylon-node-dashboard.json"
+        with mock.patch.dict(os.environ, {"RADIXNODE_CACHE_DIR": self.cache_dir}):
+            renderer = Renderer().load_file_based_template("babylon-node-dashboard.json.j2").render({})
+            self.assertTrue(renderer.to_json_file(file_location, validate=True))
+            self.assertFalse(renderer.to_json_file(file_location, validate=True))
+        with open(file_location) as f:
+            self.assertEqual(json.load(f), json.loads(renderer.rendered))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from io import StringIO
+from unittest import mock
+
+from config.BaseConfig import SetupMode
+from config.MonitoringConfig import PrometheusSettings
+from config.Renderer import Renderer
+from monitoring.ScrapeTuning import ScrapeTuning
+
+
+class ScrapeTuningTests(unittest.TestCase):
+
+    def setUp(self):
+        SetupMode.instance().mode = ["MONITOR_CORE"]
+
+    def test_durations(self):
+        self.assertEqual(ScrapeTuning.duration_seconds("500ms"), 0.5)
+        self.assertEqual(ScrapeTuning.duration_seconds("2m"), 120)
+        with self.assertRaises(ValueError):
+            ScrapeTuning.duration_seconds("fast")
+        self.assertEqual(ScrapeTuning.default_timeout("5s"), "5s")
+        self.assertEqual(ScrapeTuning.default_timeout("1m"), "10s")
+
+    def test_suggestions_grow_with_scrape_duration_and_payload(self):
+        self.assertEqual(ScrapeTuning.suggest(0.05, 200_000, 1500, base_interval=5),
+                         {"scrape_interval": "5s", "scrape_timeout": "1s", "sample_limit": 3000})
+        self.assertEqual(ScrapeTuning.suggest(2.5, 200_000, 1500, base_interval=5)["scrape_interval"], "30s")
+        self.assertEqual(ScrapeTuning.suggest(0.05, 2_500_000, 1500, base_interval=15)["scrape_interval"], "30s")
+        self.assertEqual(ScrapeTuning.suggest(60, 0, 0, base_interval=15),
+                         {"scrape_interval": "60s", "scrape_timeout": "30s", "sample_limit": None})
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_defaults_and_auto_suggestion(self, mock_stdout):
+        settings = PrometheusSettings({"metrics_target": "10.0.0.1", "metrics_path": "/gateway/metrics"})
+        settings.configure_scrape("GATEWAY_API", default_interval=15)
+        self.assertEqual((settings.scrape_interval, settings.scrape_timeout, settings.sample_limit),
+                         ("15s", "10s", None))
+
+        with mock.patch("monitoring.ScrapeTuning.ScrapeTuning.measure", return_value=(0.4, 3_000_000, 2100)):
+            settings.configure_scrape("GATEWAY_API", default_interval=15, auto=True)
+        self.assertEqual((settings.scrape_interval, settings.scrape_timeout, settings.sample_limit),
+                         ("30s", "2s", 5000))
+
+    @mock.patch('sys.stdout', new_callable=StringIO)
+    def test_detailed_mode_asks_for_the_settings(self, mock_stdout):
+        SetupMode.instance().mode = ["DETAILED"]
+        settings = PrometheusSettings({})
+        with mock.patch("builtins.input", side_effect=["10s", "20s", "5000"]):
+            settings.configure_scrape("CORE_NODE", default_interval=5)
+        self.assertEqual((settings.scrape_interval, settings.scrape_timeout, settings.sample_limit),
+                         ("10s", "10s", 5000))
+        with mock.patch("builtins.input", side_effect=["", "", "many"]):
+            settings.configure_scrape("CORE_NODE", default_interval=5)
+        self.assertEqual((settings.scrape_interval, settings.scrape_timeout, settings.sample_limit),
+                         ("5s", "5s", None))
+
+    def test_settings_are_rendered_per_job(self):
+        core = {"metrics_path": "/prometheus/metrics", "metrics_target": "10.0.0.1", "scheme": "http",
+                "scrape_interval": "5s", "scrape_timeout": "4s", "sample_limit": 20000}
+        gateway = {"metrics_path": "/gateway/metrics", "metrics_target": "10.0.0.2", "scheme": "http"}
+        rendered = Renderer().load_file_based_template("prometheus.yml.j2").render(
+            {"monitor_core": core, "monitor_gateway_api": gateway}).to_yaml()
+        core_job, gateway_job = rendered["scrape_configs"]
+        self.assertEqual((core_job["scrape_interval"], core_job["scrape_timeout"], core_job["sample_limit"]),
+                         ("5s", "4s", 20000))
+        self.assertNotIn("scrape_interval", gateway_job)
+
+
+if __name__ == '__main__':
+    unittest.main()
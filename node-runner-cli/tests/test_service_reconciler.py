@@ -0,0 +1,52 @@
+import unittest
+
+from setup.ServiceReconciler import ServiceReconciler
+from tests.fake_host import FakeHost
+from utils.Host import Host
+from utils.SudoPlan import SudoPlan
+
+RUNNING = {"ActiveState": "active", "UnitFileState": "enabled", "NeedDaemonReload": "no"}
+NOT_INSTALLED = {"ActiveState": "inactive", "UnitFileState": "", "NeedDaemonReload": "no"}
+
+
+class ServiceReconcilerUnitTests(unittest.TestCase):
+
+    def tearDown(self):
+        Host.use(None)
+
+    def reconcile(self, units, **changes):
+        Host.use(FakeHost(units=units))
+        services = ServiceReconciler()
+        services.want_running("radixdlt-node.service", **changes)
+        services.want_running("nginx", config_changed=True)
+        plan = SudoPlan("test")
+        services.apply(plan)
+        return plan.steps
+
+    def test_fresh_install_restarts_the_changed_services(self):
+        # nginx is started by apt install with the stock config after the states were read
+        self.assertEqual(self.reconcile({"radixdlt-node.service": NOT_INSTALLED}, config_changed=True,
+                                        unit_file_changed=True),
+                         ["systemctl daemon-reload", "systemctl enable radixdlt-node.service nginx",
+                          "systemctl restart radixdlt-node.service nginx"])
+
+    def test_unchanged_stopped_service_is_started_once(self):
+        self.assertEqual(self.reconcile({"radixdlt-node.service": NOT_INSTALLED, "nginx": RUNNING}),
+                         ["systemctl enable --now radixdlt-node.service", "systemctl restart nginx"])
+
+    def test_update_restarts_once(self):
+        units = {"radixdlt-node.service": RUNNING, "nginx": RUNNING}
+        self.assertEqual(self.reconcile(units, config_changed=True),
+                         ["systemctl restart radixdlt-node.service nginx"])
+        self.assertEqual(self.reconcile(units), ["systemctl restart nginx"])
+
+    def test_stopped_or_disabled_units(self):
+        units = {"radixdlt-node.service": dict(RUNNING, ActiveState="failed", NeedDaemonReload="yes"),
+                 "nginx": dict(RUNNING, UnitFileState="disabled")}
+        self.assertEqual(self.reconcile(units),
+                         ["systemctl daemon-reload", "systemctl enable nginx", "systemctl start radixdlt-node.service",
+                          "systemctl restart nginx"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import hashlib
+import unittest
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from ecdsa.util import sigdecode_der
+
+from key_interaction.KeyInteraction import KeyInteraction
+from key_interaction.KeystoreGenerator import KeystoreGenerator
+
+
+class SigningBackendUnitTests(unittest.TestCase):
+    keystore = KeystoreGenerator.create_keystore("nodepassword")
+    digests = [hashlib.sha256(f"payload {i}".encode()).hexdigest() for i in range(20)]
+
+    def key(self, signing_backend):
+        return KeyInteraction(b"nodepassword", keystore_bytes=self.keystore, signing_backend=signing_backend)
+
+    def verify_with_ecdsa(self, key, digest, signature):
+        return key.get_verifying_key().verify_digest(bytes.fromhex(signature), bytes.fromhex(digest),
+                                                     sigdecode=sigdecode_der)
+
+    def verify_with_cryptography(self, key, digest, signature):
+        key.private_key.public_key().verify(bytes.fromhex(signature), bytes.fromhex(digest),
+                                            ec.ECDSA(Prehashed(hashes.SHA256())))
+        return True
+
+    def test_signatures_verify_across_backends(self):
+        for backend in ["cryptography", "ecdsa"]:
+            key = self.key(backend)
+            for digest in self.digests[:5]:
+                signature = key.sign_payload(digest)
+                self.assertTrue(self.verify_with_ecdsa(key, digest, signature), backend)
+                self.assertTrue(self.verify_with_cryptography(key, digest, signature), backend)
+
+    def test_public_key_helpers_match_openssl(self):
+        key = self.key("cryptography")
+        compressed = key.private_key.public_key().public_bytes(Encoding.X962, PublicFormat.CompressedPoint)
+        self.assertEqual(key.get_validator_hex_public_key(), compressed.hex())
+        self.assertEqual(key.get_validator_address(), self.key("ecdsa").get_validator_address())
+
+    def test_sign_many_keeps_the_order_of_the_stream(self):
+        key = self.key("cryptography")
+        signatures = list(key.sign_many(iter(self.digests)))
+        self.assertEqual(len(signatures), len(self.digests))
+        for digest, signature in zip(self.digests, signatures):
+            self.assertTrue(self.verify_with_ecdsa(key, digest, signature))
+
+    def test_digest_that_is_not_sha256_sized_is_signed_by_ecdsa(self):
+        key = self.key("cryptography")
+        digest = hashlib.sha1(b"payload").hexdigest()
+        self.assertTrue(self.verify_with_ecdsa(key, digest, key.sign_payload(digest)))
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.key("openssl")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from setup.SystemD import SystemD
+from utils.SudoPlan import SudoPlan
+from utils.utils import run_shell_command
+
+
+class SudoPlanUnitTests(unittest.TestCase):
+
+    def test_steps_run_in_one_invocation_with_status(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plan = SudoPlan("test", sudo_command=[])
+            plan.add(f"mkdir -p {tmpdir}/etc/nginx/secrets")
+            plan.add(f"touch {tmpdir}/etc/nginx/secrets/htpasswd.admin")
+            with redirect_stdout(io.StringIO()), \
+                    mock.patch("utils.SudoPlan.run_shell_command", wraps=run_shell_command) as run_shell:
+                self.assertTrue(plan.run())
+            self.assertEqual(run_shell.call_count, 1)
+            self.assertTrue(os.path.isfile(f"{tmpdir}/etc/nginx/secrets/htpasswd.admin"))
+            self.assertEqual(plan.statuses, ["ok", "ok"])
+
+    def test_failed_step_stops_the_plan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plan = SudoPlan("test", sudo_command=[])
+            plan.add("true")
+            plan.add("exit 3")
+            plan.add(f"touch {tmpdir}/not-created")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertFalse(plan.run(fail_on_error=False))
+                with self.assertRaises(SystemExit):
+                    plan.run()
+            self.assertEqual(plan.statuses, ["ok", "failed (3)", "not run"])
+            self.assertFalse(os.path.exists(f"{tmpdir}/not-created"))
+            self.assertIn("failed (3)   exit 3", output.getvalue())
+
+    @mock.patch("utils.SudoPlan.run_shell_command")
+    def test_service_steps_are_collected(self, run_shell_command):
+        plan = SudoPlan("systemd install")
+        SystemD.set_etc_directory_owner(plan)
+        SystemD.restart_node_service(plan)
+        run_shell_command.assert_not_called()
+        self.assertEqual(len(plan), 3)
+        self.assertEqual(plan.steps[0], "chown radixdlt:radixdlt -R /etc/radixdlt")
+
+        SystemD.make_nginx_secrets_directory()
+        self.assertEqual(run_shell_command.call_args.args[0], "sudo mkdir -p /etc/nginx/secrets")
+
+    @mock.patch("utils.SudoPlan.run_shell_command")
+    def test_multi_line_command_runs_in_one_root_shell(self, run_shell_command):
+        SudoPlan.sudo("""
+            openssl req -nodes -new -x509 -subj '/CN=localhost'
+              -keyout server.key
+            """)
+        self.assertEqual(run_shell_command.call_args.args[0],
+                         "sudo sh -c 'openssl req -nodes -new -x509 -subj '\"'\"'/CN=localhost'\"'\"'\n"
+                         "              -keyout server.key'")
+
+    def test_every_line_of_a_multi_line_command_runs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            command = SudoPlan.sudo_command_line(f"""
+                echo 'first' > {tmpdir}/lines
+                echo second >> {tmpdir}/lines
+                """)
+            run_shell_command(command[len("sudo "):], shell=True)
+            with open(f"{tmpdir}/lines") as f:
+                self.assertEqual(f.read(), "first\nsecond\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
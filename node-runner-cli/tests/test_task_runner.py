@@ -0,0 +1,62 @@
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from utils.TaskRunner import Task, TaskRunner
+from utils.utils import run_shell_command
+
+
+class TaskRunnerUnitTests(unittest.TestCase):
+
+    def run_tasks(self, tasks, max_workers=4):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = TaskRunner(tasks, max_workers=max_workers).run()
+        return result, output.getvalue()
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+        tasks = [
+            Task("packages", lambda: order.append("packages")),
+            Task("java", lambda: barrier.wait(), depends_on=["packages"]),
+            Task("user", lambda: barrier.wait(), depends_on=["packages"]),
+            Task("password", lambda: order.append("password"), depends_on=["user"], interactive=True),
+        ]
+        result, output = self.run_tasks(tasks)
+        self.assertTrue(result)
+        self.assertEqual(order, ["packages", "password"])
+        self.assertIn("Finished in", output)
+
+    def test_failed_task_skips_dependents(self):
+        def fail():
+            run_shell_command("exit 3", shell=True, quite=True)
+
+        tasks = [
+            Task("packages", fail),
+            Task("user", lambda: None, depends_on=["packages"]),
+            Task("etc-directory", lambda: None, depends_on=["user"]),
+            Task("other", lambda: None),
+        ]
+        result, output = self.run_tasks(tasks, max_workers=1)
+        self.assertFalse(result)
+        self.assertEqual({task.name: task.status for task in tasks},
+                         {"packages": "failed", "user": "skipped", "etc-directory": "skipped", "other": "done"})
+
+    def test_output_is_prefixed_with_task_name(self):
+        tasks = [Task("echo", lambda: run_shell_command(["echo", "hello"], quite=True)),
+                 Task("packages", lambda: print("apt"))]
+        result, output = self.run_tasks(tasks)
+        self.assertIn("[echo    ] hello\n", output)
+        self.assertIn("[packages] apt\n", output)
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            TaskRunner([Task("a", None, depends_on=["b"]), Task("b", None, depends_on=["a"])])
+        with self.assertRaises(ValueError):
+            TaskRunner([Task("a", None, depends_on=["missing"])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from config.Renderer import Renderer
+from utils.Tracer import Tracer
+from utils.utils import run_shell_command, shell_span_name
+
+
+class TracerUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        Tracer._instance = Tracer()
+        Tracer.instance().enabled = True
+
+    def tearDown(self):
+        Tracer._instance = None
+
+    def test_spans_are_recorded_and_exported(self):
+        with redirect_stdout(io.StringIO()):
+            run_shell_command(["sleep", "0.05"])
+        Renderer().load_file_based_template("systemd-environment.j2").render(
+            {"keystore_password": "password", "keyfile_path": "/etc", "keyfile_name": "node-keystore.ks"})
+
+        tracer = Tracer.instance()
+        self.assertEqual([(span["cat"], span["name"]) for span in tracer.spans],
+                         [("shell", "sleep"), ("render", "systemd-environment.j2")])
+        self.assertGreaterEqual(tracer.spans[0]["dur"], 50000)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tracer.write_chrome_trace(f"{tmpdir}/out.json")
+            with open(f"{tmpdir}/out.json") as f:
+                trace = json.load(f)
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+        self.assertEqual(trace["traceEvents"][0]["pid"], os.getpid())
+
+        summary = tracer.summary()
+        self.assertIn("shell", summary)
+        self.assertIn("sleep", summary)
+
+    def test_shell_spans_do_not_record_arguments(self):
+        with redirect_stdout(io.StringIO()):
+            run_shell_command("true htpasswd -b -c /etc/nginx/secrets/htpasswd.admin admin s3cret", shell=True)
+        self.assertEqual(shell_span_name("sudo htpasswd -b -c htpasswd.admin admin s3cret"), "sudo htpasswd")
+        self.assertEqual(shell_span_name(["/usr/bin/docker", "compose", "up"]), "docker")
+        self.assertEqual(Tracer.instance().spans[0]["name"], "true")
+        self.assertNotIn("s3cret", Tracer.instance().summary())
+
+    def test_disabled_tracer_records_nothing(self):
+        Tracer.instance().enabled = False
+        with Tracer.instance().span("apt update", "shell"):
+            pass
+        self.assertEqual(Tracer.instance().spans, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
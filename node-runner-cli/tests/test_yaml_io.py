@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+from utils.YamlIO import YamlIO
+
+
+class YamlIOUnitTests(unittest.TestCase):
+
+    def test_none_is_dumped_as_empty_value(self):
+        self.assertEqual(YamlIO.dump({"volumes": {"nginx_secrets": None}}, default_flow_style=False),
+                         "volumes:\n  nginx_secrets:\n")
+
+    def test_config_file_round_trip(self):
+        config = {"core_node": {"nodetype": "fullnode", "memory_limit": "14000m"}, "migration": None}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "config.yaml")
+            YamlIO.dump_config_file(config, config_file)
+            with open(config_file) as f:
+                self.assertTrue(f.read().startswith("---\n"))
+            self.assertEqual(YamlIO.load_file(config_file), config)
+
+    def test_load_does_not_construct_python_objects(self):
+        with self.assertRaises(Exception):
+            YamlIO.load("!!python/object/apply:os.system ['true']")
+
+    def test_load_all_documents(self):
+        self.assertEqual(YamlIO.load_all("---\na: 1\n---\nb: 2\n"), [{"a": 1}, {"b": 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
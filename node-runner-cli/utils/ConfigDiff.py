@@ -0,0 +1,102 @@
+import json
+from collections import namedtuple
+
+Change = namedtuple("Change", ["path", "kind", "old", "new"])
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+class ConfigDiff:
+    """
+    Structural diff of the dicts and lists loaded from the config and compose files.
+    Every subtree is fingerprinted once, a different fingerprint is a change without comparing the values. Equal
+    fingerprints can still be a hash collision, so the values are compared before a subtree is skipped.
+    """
+
+    @staticmethod
+    def diff(old, new) -> list:
+        fingerprints = {}
+        changes = []
+        ConfigDiff._diff((), old, new, fingerprints, changes)
+        return changes
+
+    @staticmethod
+    def _diff(path, old, new, fingerprints, changes):
+        if ConfigDiff.fingerprint(old, fingerprints) == ConfigDiff.fingerprint(new, fingerprints) and old == new:
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key, old_value in old.items():
+                if key not in new:
+                    changes.append(Change(path + (key,), REMOVED, old_value, None))
+            for key, new_value in new.items():
+                if key not in old:
+                    changes.append(Change(path + (key,), ADDED, None, new_value))
+                else:
+                    ConfigDiff._diff(path + (key,), old[key], new_value, fingerprints, changes)
+        elif isinstance(old, list) and isinstance(new, list):
+            for index in range(min(len(old), len(new))):
+                ConfigDiff._diff(path + (index,), old[index], new[index], fingerprints, changes)
+            for index in range(len(new), len(old)):
+                changes.append(Change(path + (index,), REMOVED, old[index], None))
+            for index in range(len(old), len(new)):
+                changes.append(Change(path + (index,), ADDED, None, new[index]))
+        else:
+            changes.append(Change(path, CHANGED, old, new))
+
+    @staticmethod
+    def fingerprint(value, fingerprints: dict):
+        """
+        Hash of a value and all its children, memoised by object id for dicts and lists.
+        The type is part of the hash so that e.g. 1, 1.0, True and "1" are not equal.
+        """
+        if isinstance(value, dict):
+            key = id(value)
+            if key not in fingerprints:
+                fingerprints[key] = (hash(("dict", frozenset(
+                    (item_key, ConfigDiff.fingerprint(item, fingerprints)) for item_key, item in value.items()))),
+                                     value)
+            return fingerprints[key][0]
+        if isinstance(value, list):
+            key = id(value)
+            if key not in fingerprints:
+                fingerprints[key] = (hash(("list", tuple(ConfigDiff.fingerprint(item, fingerprints)
+                                                         for item in value))), value)
+            return fingerprints[key][0]
+        try:
+            return hash((type(value).__name__, value))
+        except TypeError:
+            return hash((type(value).__name__, repr(value)))
+
+    @staticmethod
+    def format_path(path) -> str:
+        formatted = ""
+        for part in path:
+            if isinstance(part, int):
+                formatted += f"[{part}]"
+            else:
+                formatted += f".{part}" if formatted else str(part)
+        return formatted or "<root>"
+
+    @staticmethod
+    def format_value(value) -> str:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        if value is None:
+            return "null"
+        return str(value)
+
+    @staticmethod
+    def format(changes: list, old_name="existing", new_name="new") -> str:
+        """Unified diff style listing of the changes, one path per line"""
+        if not changes:
+            return "No differences"
+        lines = [f"--- {old_name}", f"+++ {new_name}"]
+        for change in changes:
+            path = ConfigDiff.format_path(change.path)
+            if change.kind != ADDED:
+                lines.append(f"- {path}: {ConfigDiff.format_value(change.old)}")
+            if change.kind != REMOVED:
+                lines.append(f"+ {path}: {ConfigDiff.format_value(change.new)}")
+        return "\n".join(lines)
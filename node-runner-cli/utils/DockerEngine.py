@@ -0,0 +1,195 @@
+import http.client
+import json
+import os
+import socket
+import struct
+import sys
+from urllib.parse import quote, urlencode
+
+from env_vars import DOCKER_HOST
+from utils.Tracer import Tracer
+
+
+class DockerEngineError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"Docker engine returned {status}: {message}")
+        self.status = status
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DockerEngine:
+    """
+    Minimal Docker Engine API client over the unix socket, for the volume, image and one-off container
+    operations that used to spawn the docker CLI. One connection is kept open and reused for all requests.
+    Bringing the compose services up and down is still done with docker-compose.
+    """
+    _instance = None
+
+    def __init__(self, socket_path="/var/run/docker.sock"):
+        self.socket_path = socket_path
+        self.connection = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            docker_host = os.getenv(DOCKER_HOST, "unix:///var/run/docker.sock")
+            if not docker_host.startswith("unix://"):
+                print(f"DOCKER_HOST {docker_host} is not supported. Only unix sockets are supported")
+                sys.exit(1)
+            cls._instance = DockerEngine(docker_host[len("unix://"):])
+        return cls._instance
+
+    @classmethod
+    def use(cls, engine):
+        cls._instance = engine
+
+    def request(self, method, path, body=None, query=None):
+        """Returns the status and the response, which must be read before the next request"""
+        if query:
+            path = f"{path}?{urlencode(query)}"
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            reused = self.connection is not None
+            if not reused:
+                self.connection = UnixHTTPConnection(self.socket_path)
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+            except OSError as e:
+                self.close()
+                if reused and attempt == 0:
+                    # The daemon closed the kept alive connection before the request was sent, reconnect once
+                    continue
+                self.exit_unreachable(e)
+            try:
+                response = self.connection.getresponse()
+                return response.status, response
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                self.exit_unreachable(e)
+
+    def exit_unreachable(self, error):
+        print(f"Cannot connect to the Docker daemon at unix://{self.socket_path}: {error}. "
+              f"Is the docker daemon running and is the user in the docker group?")
+        sys.exit(1)
+
+    @staticmethod
+    def exit_on_error(error: DockerEngineError):
+        """Same as a failed run_shell_command of the docker CLI, the error is printed and the CLI exits"""
+        print(error)
+        print("""
+            Command failed. Exiting...
+        """)
+        sys.exit(1)
+
+    def call(self, method, path, body=None, query=None, expected=(200, 201, 204)):
+        with Tracer.instance().span(f"{method} {path}", "docker"):
+            status, response = self.request(method, path, body, query)
+            content = response.read()
+        if status not in expected:
+            try:
+                message = json.loads(content).get("message", content)
+            except ValueError:
+                message = content.decode("utf-8", errors="replace")
+            raise DockerEngineError(status, message)
+        return status, json.loads(content) if content and response.getheader("Content-Type", "").startswith(
+            "application/json") else content
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def create_volume(self, name: str):
+        """Same as `docker volume create`, an existing volume is left as it is"""
+        return self.call("POST", "/volumes/create", {"Name": name})[1]
+
+    def image_exists(self, image: str) -> bool:
+        status, _ = self.call("GET", f"/images/{quote(image, safe='/:')}/json", expected=(200, 404))
+        return status == 200
+
+    def pull_image(self, image: str):
+        repository, tag = split_image(image)
+        print(f"Pulling image {image}")
+        with Tracer.instance().span(f"pull {image}", "docker"):
+            status, response = self.request("POST", "/images/create", query={"fromImage": repository, "tag": tag})
+            if status != 200:
+                raise DockerEngineError(status, response.read().decode("utf-8", errors="replace"))
+            error = None
+            # The progress is streamed as one JSON object per line, errors are reported in the stream
+            for line in response.read().splitlines():
+                if line.strip():
+                    progress = json.loads(line)
+                    error = progress.get("error", error)
+        if error:
+            raise DockerEngineError(status, error)
+
+    def ensure_images(self, images):
+        for image in dict.fromkeys(images):
+            if not self.image_exists(image):
+                self.pull_image(image)
+
+    def run_container(self, image: str, command: list, binds=None, fail_on_error=True) -> tuple:
+        """
+        Same as `docker run --rm`, returns the exit code and the output of the container. An error of the engine,
+        e.g. an image that cannot be pulled, is exit code 125 like with docker run.
+        """
+        config = {"Image": image, "Cmd": command, "HostConfig": {"Binds": binds or []}}
+        try:
+            try:
+                container_id = self.call("POST", "/containers/create", config)[1]["Id"]
+            except DockerEngineError as e:
+                if e.status != 404:
+                    raise
+                self.pull_image(image)
+                container_id = self.call("POST", "/containers/create", config)[1]["Id"]
+            try:
+                self.call("POST", f"/containers/{container_id}/start")
+                exit_code = self.call("POST", f"/containers/{container_id}/wait")[1]["StatusCode"]
+                logs = self.call("GET", f"/containers/{container_id}/logs", query={"stdout": 1, "stderr": 1})[1]
+                output = demultiplex(logs)
+            finally:
+                self.call("DELETE", f"/containers/{container_id}", query={"force": 1}, expected=(204, 404))
+        except DockerEngineError as e:
+            if fail_on_error:
+                DockerEngine.exit_on_error(e)
+            return 125, str(e)
+        if fail_on_error and exit_code != 0:
+            print(output)
+            print(f"""
+            Container {image} exited with {exit_code}. Exiting...
+        """)
+            sys.exit(1)
+        return exit_code, output
+
+
+def split_image(image: str) -> tuple:
+    name, _, digest = image.partition("@")
+    if digest:
+        return name, digest
+    if ":" in name.rsplit("/", 1)[-1]:
+        repository, tag = name.rsplit(":", 1)
+        return repository, tag
+    return name, "latest"
+
+
+def demultiplex(logs: bytes) -> str:
+    """Containers without a TTY send their output in frames of an 8 byte header followed by the payload"""
+    output = []
+    offset = 0
+    while offset + 8 <= len(logs):
+        _, size = struct.unpack(">BxxxL", logs[offset:offset + 8])
+        output.append(logs[offset + 8:offset + 8 + size])
+        offset += 8 + size
+    return b"".join(output).decode("utf-8", errors="replace")
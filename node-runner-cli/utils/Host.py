@@ -0,0 +1,124 @@
+import getpass
+import grp
+import os
+import pwd
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+
+class Host:
+    """
+    Filesystem and user lookups that used to be shelled out (`cat /etc/passwd | grep`, `whoami`, `groups`,
+    `mkdir -p`, `cat`, `cp`, ...). Commands that need root still go through run_shell_command with sudo.
+    Tests swap the instance with Host.use().
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = Host()
+        return cls._instance
+
+    @classmethod
+    def use(cls, host):
+        cls._instance = host
+
+    def current_user(self) -> str:
+        try:
+            return pwd.getpwuid(os.geteuid()).pw_name
+        except KeyError:
+            return getpass.getuser()
+
+    def user_exists(self, username: str) -> bool:
+        try:
+            pwd.getpwnam(username)
+            return True
+        except KeyError:
+            return False
+
+    def user_in_group(self, group: str) -> bool:
+        """Same as `groups`, i.e. the groups of the current process, not the ones added since the login"""
+        try:
+            gid = grp.getgrnam(group).gr_gid
+        except KeyError:
+            return False
+        return gid in os.getgroups() or gid == os.getegid()
+
+    def command_exists(self, command: str) -> bool:
+        return shutil.which(command) is not None
+
+    def path_exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def unit_states(self, units: list) -> dict:
+        """ActiveState, UnitFileState and NeedDaemonReload of systemd units, read without sudo"""
+        properties = ["ActiveState", "UnitFileState", "NeedDaemonReload"]
+        if not units or not self.command_exists("systemctl"):
+            return {}
+        result = subprocess.run(["systemctl", "show", f"--property={','.join(properties)}"] + list(units),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return {}
+        states = {}
+        # systemctl prints one block per unit, in the order they were passed, separated by an empty line
+        for unit, block in zip(units, result.stdout.strip().split("\n\n")):
+            states[unit] = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        return states
+
+    def make_dirs(self, path: str):
+        try:
+            Path(path).mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Could not create directory {path}: {e}")
+            sys.exit(1)
+
+    def read_text(self, path: str) -> str:
+        with open(path, 'r') as f:
+            return f.read()
+
+    def print_file(self, path: str):
+        try:
+            print(self.read_text(path))
+        except OSError as e:
+            print(f"Could not read {path}: {e}")
+
+    def append_lines(self, path: str, lines: list):
+        with open(path, 'a') as f:
+            for line in lines:
+                f.write(f"{line}\n")
+
+    def copy_file(self, source: str, destination: str):
+        try:
+            shutil.copy2(source, destination)
+        except OSError as e:
+            print(f"Could not copy {source} to {destination}: {e}")
+            sys.exit(1)
+
+    def remove_dir_contents(self, path: str):
+        try:
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+        except OSError as e:
+            print(f"Could not empty directory {path}: {e}")
+            sys.exit(1)
+
+    def move_dir_contents(self, source: str, destination: str):
+        """Like mv source/* destination, an entry that already exists in destination stops it before anything moved"""
+        try:
+            entries = os.listdir(source)
+            existing = [entry for entry in entries if os.path.lexists(os.path.join(destination, entry))]
+            if existing:
+                print(f"Could not move {source} to {destination}: {', '.join(sorted(existing))} already exists. "
+                      f"Remove the contents of {destination} and run the command again")
+                sys.exit(1)
+            for entry in entries:
+                shutil.move(os.path.join(source, entry), os.path.join(destination, entry))
+        except OSError as e:
+            print(f"Could not move {source} to {destination}: {e}")
+            sys.exit(1)
@@ -1,8 +1,7 @@
 import os
 
-import yaml
-
 from env_vars import PROMPT_FEEDS
+from utils.YamlIO import YamlIO
 
 
 class QuestionKeys:
@@ -37,6 +36,9 @@ class QuestionKeys:
     genesis_location = "genesis_location"
     have_validator_address = "have_validator_address"
     validator_address = "validator_address"
+    scrape_interval = "scrape_interval"
+    scrape_timeout = "scrape_timeout"
+    sample_limit = "sample_limit"
 
 
 class PromptFeeder:
@@ -52,7 +54,7 @@ class PromptFeeder:
         feed_prompts_file = os.getenv(PROMPT_FEEDS, "")
         if feed_prompts_file and os.path.exists(feed_prompts_file):
             with open(feed_prompts_file, "r") as file:
-                prompt_feeds = yaml.safe_load(file)
+                prompt_feeds = YamlIO.load(file)
                 return prompt_feeds
         return []
 
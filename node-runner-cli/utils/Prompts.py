@@ -3,8 +3,10 @@ import os
 import sys
 
 from env_vars import SUPPRESS_API_COMMAND_WARN
+from monitoring.ScrapeTuning import ScrapeTuning
+from utils.Host import Host
 from utils.PromptFeeder import QuestionKeys
-from utils.utils import Helpers, run_shell_command, bcolors
+from utils.utils import Helpers, bcolors
 
 
 class Prompts:
@@ -182,7 +184,7 @@ class Prompts:
                 'Press ENTER to accept default. otherwise enter the absolute path of the new folder:',
                 QuestionKeys.input_path_keystore)
             # TODO this needs to moved out of init
-            run_shell_command(f'mkdir -p {radixnode_dir}', shell=True, quite=True)
+            Host.instance().make_dirs(radixnode_dir)
             return Prompts.check_default(answer, radixnode_dir)
 
     @staticmethod
@@ -264,6 +266,45 @@ class Prompts:
             f"Press Enter to accept default or type the value in format of url like {bcolors.FAIL}'http(s)://host:port'{bcolors.ENDC}:")
         return Prompts.check_default(answer, default)
 
+    @staticmethod
+    def ask_scrape_interval(target_name, default) -> str:
+        answer = Helpers.input_guestion(
+            f"\nSCRAPE INTERVAL for {target_name}: How often prometheus scrapes the target, like 5s, 30s or 1m. "
+            f"Press Enter to accept default {bcolors.OKBLUE}{default}{bcolors.ENDC}:", QuestionKeys.scrape_interval)
+        return Prompts.ask_duration(Prompts.check_default(answer, default), default)
+
+    @staticmethod
+    def ask_scrape_timeout(target_name, default, scrape_interval) -> str:
+        answer = Helpers.input_guestion(
+            f"\nSCRAPE TIMEOUT for {target_name}: It cannot be longer than the scrape interval {scrape_interval}. "
+            f"Press Enter to accept default {bcolors.OKBLUE}{default}{bcolors.ENDC}:", QuestionKeys.scrape_timeout)
+        timeout = Prompts.ask_duration(Prompts.check_default(answer, default), default)
+        if ScrapeTuning.duration_seconds(timeout) > ScrapeTuning.duration_seconds(scrape_interval):
+            print(f"Scrape timeout {timeout} is longer than the scrape interval. Using {scrape_interval}")
+            return scrape_interval
+        return timeout
+
+    @staticmethod
+    def ask_duration(answer, default) -> str:
+        try:
+            ScrapeTuning.duration_seconds(answer)
+            return answer
+        except ValueError as e:
+            print(f"{e}. Using {default}")
+            return default
+
+    @staticmethod
+    def ask_sample_limit(target_name, default):
+        answer = Helpers.input_guestion(
+            f"\nSAMPLE LIMIT for {target_name}: A scrape exposing more samples than this fails. "
+            f"Press Enter to accept default {bcolors.OKBLUE}{default or 'no limit'}{bcolors.ENDC} "
+            f"or type in a number:", QuestionKeys.sample_limit)
+        answer = Prompts.check_default(answer, default)
+        if answer is None or str(answer).isdigit():
+            return int(answer) if answer else None
+        print(f"{answer} is not a number. Using {default or 'no limit'}")
+        return default
+
     @staticmethod
     def ask_basic_auth_password(basic_auth_user, target_name) -> str:
         answer = Helpers.input_guestion(
@@ -289,19 +330,19 @@ class Prompts:
         return Helpers.check_Yes(Prompts.check_default(answer, "Y"))
 
     @staticmethod
-    def ask_ansible_setup_limits():
+    def ask_setup_limits():
         ask_setup_limits = input \
             ("Do you want to setup ulimits. Default is Y , Press ENTER to accept default or type in [Y/N]?:")
-        return "true" if Helpers.check_Yes(Prompts.check_default(ask_setup_limits, "Y")) else "false"
+        return Helpers.check_Yes(Prompts.check_default(ask_setup_limits, "Y"))
 
     @staticmethod
-    def ask_ansible_swap_setup():
+    def ask_swap_setup():
         ask_setup_swap = input \
             ("Do you want to setup swap space [Y/n]?:")
-        setup_swap = "false"
+        setup_swap = False
         ask_swap_size = None
         if Helpers.check_Yes(ask_setup_swap):
-            setup_swap = "true"
+            setup_swap = True
             ask_swap_size = input \
                 ("Enter swap size in GB. Example - 1G or 3G or 8G ?:")
             return setup_swap, ask_swap_size
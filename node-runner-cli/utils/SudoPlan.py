@@ -0,0 +1,96 @@
+import os
+import shlex
+import sys
+import tempfile
+import time
+
+from utils.utils import run_shell_command
+
+
+class SudoPlan:
+    """
+    Privileged commands collected while a command runs, executed at the end as one generated bash script with a
+    single sudo invocation. The plan is printed before it runs and every step reports its own exit code.
+    A failing step stops the script, the steps after it are reported as not run.
+    """
+
+    def __init__(self, name: str, sudo_command=("sudo",)):
+        self.name = name
+        self.sudo_command = list(sudo_command)
+        self.steps = []
+        self.statuses = []
+
+    def add(self, command: str):
+        self.steps.append(command.strip())
+
+    def __len__(self):
+        return len(self.steps)
+
+    def script(self, status_file: str) -> str:
+        lines = ["#!/bin/bash", f"# radixnode {self.name}"]
+        for index, command in enumerate(self.steps):
+            # Each step runs in a subshell, so an `exit` in a step still reports its status
+            lines.append(f"(\n{command}\n)")
+            lines.append(f'rc=$?; echo "{index} $rc" >> "{status_file}"; [ $rc -eq 0 ] || exit $rc')
+        return "\n".join(lines) + "\n"
+
+    def print_plan(self):
+        print('-----------------------------')
+        print(f"Privileged steps of {self.name}, run with a single {' '.join(self.sudo_command) or 'shell'}:")
+        for index, command in enumerate(self.steps):
+            print(f"  {index + 1:2}. {' '.join(command.split())}")
+        print('-----------------------------')
+
+    def run(self, fail_on_error=True) -> bool:
+        if not self.steps:
+            return True
+        self.print_plan()
+        with tempfile.TemporaryDirectory(prefix="radixnode-sudo-") as tmpdir:
+            status_file = os.path.join(tmpdir, "status")
+            script_file = os.path.join(tmpdir, "plan.sh")
+            with open(script_file, "w") as f:
+                f.write(self.script(status_file))
+            start = time.monotonic()
+            run_shell_command(self.sudo_command + ["bash", script_file], fail_on_error=False, quite=True)
+            elapsed = time.monotonic() - start
+            exit_codes = {}
+            if os.path.isfile(status_file):
+                with open(status_file) as f:
+                    for line in f:
+                        index, exit_code = line.split()
+                        exit_codes[int(index)] = int(exit_code)
+
+        self.statuses = []
+        for index, command in enumerate(self.steps):
+            if index not in exit_codes:
+                status = "not run"
+            elif exit_codes[index] == 0:
+                status = "ok"
+            else:
+                status = f"failed ({exit_codes[index]})"
+            self.statuses.append(status)
+            print(f"  {index + 1:2}. {status:12} {' '.join(command.split())}")
+        print(f"Privileged steps finished in {elapsed:.1f}s")
+
+        succeeded = all(status == "ok" for status in self.statuses)
+        if fail_on_error and not succeeded:
+            print("""
+            Command failed. Exiting...
+        """)
+            sys.exit(1)
+        return succeeded
+
+    @staticmethod
+    def sudo(command: str, plan=None):
+        """Adds the command to the plan, or runs it straight away with sudo when there is no plan"""
+        if plan is None:
+            return run_shell_command(SudoPlan.sudo_command_line(command), shell=True)
+        plan.add(command)
+
+    @staticmethod
+    def sudo_command_line(command: str) -> str:
+        """A multi-line command runs in a root shell, a sudo prefix would only apply to its first line"""
+        command = command.strip()
+        if "\n" in command:
+            return f"sudo sh -c {shlex.quote(command)}"
+        return f"sudo {command}"
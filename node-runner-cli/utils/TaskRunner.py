@@ -0,0 +1,148 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+_task_output = threading.local()
+
+
+def output_prefix():
+    """Prefix of the task running on the current thread, None outside of a TaskRunner worker"""
+    return getattr(_task_output, "prefix", None)
+
+
+class PrefixedOutput:
+    """Stand in for sys.stdout that prefixes every line printed from a task thread with the task name"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        prefix = output_prefix()
+        if prefix is None:
+            return self.stream.write(text)
+        pending = getattr(_task_output, "pending", "") + text
+        *lines, _task_output.pending = pending.split("\n")
+        with self.lock:
+            for line in lines:
+                self.stream.write(f"{prefix}{line}\n")
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class Task:
+    def __init__(self, name: str, function, depends_on=None, interactive=False):
+        """
+        Interactive tasks read from the terminal, so they run on the main thread once no other task is running
+        """
+        self.name = name
+        self.function = function
+        self.depends_on = depends_on or []
+        self.interactive = interactive
+        self.status = "pending"
+        self.duration = 0.0
+
+
+class TaskRunner:
+    """
+    Runs setup steps in the order of their dependencies, with at most max_workers steps at a time.
+    A failed step (including a failed run_shell_command, which exits) skips all steps that depend on it.
+    """
+
+    def __init__(self, tasks: list, max_workers=4):
+        self.tasks = {task.name: task for task in tasks}
+        self.max_workers = max(1, max_workers)
+        for task in tasks:
+            for dependency in task.depends_on:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Task {task.name} depends on unknown task {dependency}")
+        self.check_acyclic()
+
+    def check_acyclic(self):
+        visited, in_progress = set(), set()
+
+        def visit(name):
+            if name in in_progress:
+                raise ValueError(f"Dependency cycle at task {name}")
+            if name not in visited:
+                in_progress.add(name)
+                for dependency in self.tasks[name].depends_on:
+                    visit(dependency)
+                in_progress.remove(name)
+                visited.add(name)
+
+        for task_name in self.tasks:
+            visit(task_name)
+
+    def ready_tasks(self):
+        ready = []
+        for task in self.tasks.values():
+            if task.status != "pending":
+                continue
+            dependency_status = {self.tasks[name].status for name in task.depends_on}
+            if dependency_status & {"failed", "skipped"}:
+                task.status = "skipped"
+                return self.ready_tasks()
+            if dependency_status <= {"done"}:
+                ready.append(task)
+        return ready
+
+    def execute(self, task: Task, prefix=None):
+        _task_output.prefix = prefix
+        _task_output.pending = ""
+        start = time.monotonic()
+        try:
+            task.function()
+            task.status = "done"
+        except BaseException as e:
+            task.status = "failed"
+            print(f"Step {task.name} failed: {e!r}")
+        finally:
+            if _task_output.pending:
+                print("")
+            task.duration = time.monotonic() - start
+            _task_output.prefix = None
+
+    def run(self) -> bool:
+        width = max(len(name) for name in self.tasks) if self.tasks else 0
+        start = time.monotonic()
+        stdout = sys.stdout
+        sys.stdout = PrefixedOutput(stdout)
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while True:
+                    ready = self.ready_tasks()
+                    background = [task for task in ready if not task.interactive]
+                    for task in background[:self.max_workers - len(running)]:
+                        task.status = "running"
+                        running[executor.submit(self.execute, task, f"[{task.name:{width}}] ")] = task
+                    if not running:
+                        if not ready:
+                            break
+                        task = ready[0]
+                        task.status = "running"
+                        self.execute(task)
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+        finally:
+            sys.stdout = stdout
+        self.print_summary(time.monotonic() - start)
+        return all(task.status == "done" for task in self.tasks.values())
+
+    def print_summary(self, elapsed):
+        width = max([len(name) for name in self.tasks] + [4])
+        print(f"\n{'Step':{width}}  {'Status':8}  {'Seconds':>8}")
+        for task in self.tasks.values():
+            print(f"{task.name:{width}}  {task.status:8}  {task.duration:8.1f}")
+        total = sum(task.duration for task in self.tasks.values())
+        print(f"Finished in {elapsed:.1f}s, the steps took {total:.1f}s in total")
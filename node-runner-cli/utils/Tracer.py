@@ -0,0 +1,84 @@
+import builtins
+import getpass
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Records spans for shell commands, HTTP requests, template renders and prompt waits when a command is run with
+    --profile. Spans are written in the Chrome trace event format, which chrome://tracing and Perfetto can open.
+    When the tracer is not enabled, span() does nothing.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.lock = threading.Lock()
+        self.thread_ids = {}
+        self.origin = time.perf_counter()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = Tracer()
+        return cls._instance
+
+    def enable(self):
+        """Starts recording. Prompts are recorded by wrapping input() and getpass.getpass()"""
+        self.enabled = True
+        self.origin = time.perf_counter()
+        builtins.input = self.traced(builtins.input, "prompt", "input")
+        getpass.getpass = self.traced(getpass.getpass, "prompt", "getpass")
+
+    def traced(self, function, category, name):
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                thread_id = self.thread_ids.setdefault(threading.get_ident(), len(self.thread_ids) + 1)
+                self.spans.append({
+                    "name": name if len(name) <= 120 else f"{name[:117]}...",
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self.origin) * 1e6),
+                    "dur": round((end - start) * 1e6),
+                    "pid": os.getpid(),
+                    "tid": thread_id,
+                    "args": args
+                })
+
+    def write_chrome_trace(self, file_location: str):
+        with open(file_location, "w") as f:
+            json.dump({"traceEvents": self.spans, "displayTimeUnit": "ms"}, f)
+
+    def summary(self, top=10) -> str:
+        elapsed = time.perf_counter() - self.origin
+        categories = {}
+        for span in self.spans:
+            count, total = categories.get(span["cat"], (0, 0))
+            categories[span["cat"]] = (count + 1, total + span["dur"] / 1e6)
+        lines = [f"{'Category':10} {'Count':>6} {'Seconds':>9} {'% of run':>9}"]
+        for category, (count, total) in sorted(categories.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{category:10} {count:6} {total:9.2f} {total / elapsed * 100 if elapsed else 0:8.1f}%")
+        lines.append(f"\nSlowest steps of the {elapsed:.2f}s run:")
+        for span in sorted(self.spans, key=lambda item: -item["dur"])[:top]:
+            lines.append(f"{span['dur'] / 1e6:9.2f}s  {span['cat']:8} {' '.join(span['name'].split())}")
+        return "\n".join(lines)
@@ -0,0 +1,44 @@
+import yaml
+
+# libyaml based loader and dumper are several times faster than the pure Python ones. PyYAML may be built without
+# libyaml, in which case the pure Python classes are used.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+def represent_none(dumper, _):
+    return dumper.represent_scalar('tag:yaml.org,2002:null', '')
+
+
+yaml.add_representer(type(None), represent_none, Dumper=YamlDumper)
+
+
+class YamlIO:
+    """All the YAML config files, compose files and rendered templates are read and written through this class"""
+
+    @staticmethod
+    def load(stream):
+        return yaml.load(stream, Loader=YamlLoader)
+
+    @staticmethod
+    def load_all(stream) -> list:
+        return list(yaml.load_all(stream, Loader=YamlLoader))
+
+    @staticmethod
+    def load_file(file_location):
+        with open(file_location, 'r') as f:
+            return YamlIO.load(f)
+
+    @staticmethod
+    def dump(data, stream=None, **kwargs):
+        return yaml.dump(data, stream, Dumper=YamlDumper, **kwargs)
+
+    @staticmethod
+    def dump_config(data, stream=None, sort_keys=True):
+        return YamlIO.dump(data, stream, sort_keys=sort_keys, default_flow_style=False, explicit_start=True,
+                           allow_unicode=True)
+
+    @staticmethod
+    def dump_config_file(data, file_location, sort_keys=True):
+        with open(file_location, 'w') as f:
+            YamlIO.dump_config(data, f, sort_keys=sort_keys)
@@ -1,16 +1,21 @@
 import json
 import os
+import shlex
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
 import requests
-import yaml
 from system_client import ApiException
 
-from env_vars import PRINT_REQUEST, NODE_HOST_IP_OR_NAME, COMPOSE_HTTP_TIMEOUT
+from env_vars import PRINT_REQUEST, NODE_HOST_IP_OR_NAME, COMPOSE_HTTP_TIMEOUT, RADIXNODE_CACHE_DIR
+from utils.ConfigDiff import ConfigDiff, REMOVED
+from utils.DockerEngine import DockerEngine, DockerEngineError
 from utils.PromptFeeder import PromptFeeder
+from utils.TaskRunner import output_prefix
+from utils.Tracer import Tracer
+from utils.YamlIO import YamlIO
 from version import __version__
 
 
@@ -24,13 +29,31 @@ def printCommand(cmd):
         print('-----------------------------')
 
 
+def shell_span_name(cmd) -> str:
+    """Only the executable, the arguments can hold passwords, e.g. htpasswd -b"""
+    if type(cmd) is not list:
+        try:
+            cmd = shlex.split(cmd)
+        except ValueError:
+            cmd = cmd.split()
+    executables = []
+    for part in cmd:
+        executables.append(os.path.basename(part))
+        if part != "sudo":
+            break
+    return " ".join(executables)
+
+
 def run_shell_command(cmd, env=None, shell=False, fail_on_error=True, quite=False):
     if not quite:
         printCommand(cmd)
-    if env:
-        result = subprocess.run(cmd, env=env, shell=shell)
-    else:
-        result = subprocess.run(cmd, shell=shell)
+    with Tracer.instance().span(shell_span_name(cmd), "shell"):
+        if output_prefix() is not None:
+            result = run_prefixed_shell_command(cmd, env, shell)
+        elif env:
+            result = subprocess.run(cmd, env=env, shell=shell)
+        else:
+            result = subprocess.run(cmd, shell=shell)
     if result.returncode != 0:
         print(result)
     if fail_on_error and result.returncode != 0:
@@ -41,6 +64,16 @@ def run_shell_command(cmd, env=None, shell=False, fail_on_error=True, quite=Fals
     return result
 
 
+def run_prefixed_shell_command(cmd, env=None, shell=False):
+    """Runs a command from a TaskRunner step, printing its output line by line so it gets the step prefix"""
+    process = subprocess.Popen(cmd, env=env, shell=shell, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, errors="replace")
+    for line in process.stdout:
+        print(line, end="")
+    process.wait()
+    return subprocess.CompletedProcess(cmd, process.returncode)
+
+
 def print_vote_and_fork_info(health, engine_configuration):
     newest_fork = engine_configuration['forks'][-1]
     newest_fork_name = newest_fork['name']
@@ -91,11 +124,12 @@ class Helpers:
         ))
 
     @staticmethod
-    def send_request(prepared, print_request=False, print_response=True):
+    def send_request(prepared, print_request=False, print_response=True, timeout=None):
         if print_request or os.getenv(PRINT_REQUEST) is not None:
             Helpers.pretty_print_request(prepared)
         s = requests.Session()
-        resp = s.send(prepared, verify=False)
+        with Tracer.instance().span(f"{prepared.method} {prepared.url}", "http"):
+            resp = s.send(prepared, verify=False, timeout=timeout)
         if Helpers.is_json(resp.content):
             response_content = json.dumps(resp.json(), indent=2)
         else:
@@ -129,6 +163,61 @@ class Helpers:
                 "password": os.environ.get("%s" % nginx_password)
             })
 
+    @staticmethod
+    def docker_compose_up(composefile, services=None, force_recreate=False):
+        """
+        services=None brings up the whole compose file. An empty list only starts missing containers, while a list of
+        names recreates just those services and leaves their dependencies alone.
+        """
+        docker_compose_binary = os.getenv("DOCKER_COMPOSE_LOCATION", 'docker-compose')
+        command = [docker_compose_binary, '-f', composefile, 'up', '-d']
+        if services is not None:
+            if len(services) == 0:
+                command.append('--no-recreate')
+            else:
+                command.append('--no-deps')
+                if force_recreate:
+                    command.append('--force-recreate')
+                command.extend(services)
+        if services != [] and os.path.isfile(composefile):
+            # Pulling through the engine API first leaves only container creation to the compose HTTP timeout
+            try:
+                DockerEngine.instance().ensure_images(Helpers.compose_images(composefile, services))
+            except DockerEngineError as e:
+                DockerEngine.exit_on_error(e)
+        result = run_shell_command(command, env={
+            COMPOSE_HTTP_TIMEOUT: os.getenv(COMPOSE_HTTP_TIMEOUT, "200")
+        }, fail_on_error=False)
+        if result.returncode != 0:
+            run_shell_command(command, env={
+                COMPOSE_HTTP_TIMEOUT: os.getenv(COMPOSE_HTTP_TIMEOUT, "200")
+            }, fail_on_error=True)
+
+    @staticmethod
+    def compose_images(composefile, services=None) -> list:
+        compose_services = (YamlIO.load_file(composefile) or {}).get("services") or {}
+        return [definition["image"] for name, definition in compose_services.items()
+                if (services is None or name in services) and "$" not in definition.get("image", "$")]
+
+    @staticmethod
+    def compose_services_to_recreate(existing_compose: dict, new_compose: dict):
+        """
+        Returns the names of the services whose definition differs between two compose files.
+        Returns None when the whole stack has to be brought up, i.e. there is no existing compose file,
+        a service was removed or anything outside of `services` (volumes, version) changed.
+        """
+        if not existing_compose:
+            return None
+        services = []
+        for change in ConfigDiff.diff(existing_compose, new_compose):
+            if change.path[0] != "services" or len(change.path) < 2:
+                return None
+            if len(change.path) == 2 and change.kind == REMOVED:
+                return None
+            if change.path[1] not in services:
+                services.append(change.path[1])
+        return services
+
     @staticmethod
     def docker_compose_down(composefile, remove_volumes):
 
@@ -261,7 +350,7 @@ class Helpers:
     def yaml_as_dict(my_file):
         my_dict = {}
         with open(my_file, 'r') as fp:
-            docs = yaml.safe_load_all(fp)
+            docs = YamlIO.load_all(fp)
             for doc in docs:
                 for key, value in doc.items():
                     my_dict[key] = value
@@ -279,6 +368,11 @@ class Helpers:
     def get_default_monitoring_config_dir():
         return f"{Path.home()}/monitoring"
 
+    @staticmethod
+    def get_cache_dir():
+        default_cache_dir = os.path.join(os.getenv("XDG_CACHE_HOME", f"{Path.home()}/.cache"), "radixnode")
+        return os.getenv(RADIXNODE_CACHE_DIR, default_cache_dir)
+
     @staticmethod
     def section_headline(title):
         print(f"{bcolors.BOLD}--------------{title}----------------------{bcolors.ENDC}")
@@ -301,10 +395,6 @@ class Helpers:
     def print_info(info):
         print(f"{bcolors.OKBLUE}{info}{bcolors.ENDC}")
 
-    @staticmethod
-    def represent_none(self, _):
-        return self.represent_scalar('tag:yaml.org,2002:null', '')
-
     @staticmethod
     def get_node_host_ip():
         if os.environ.get('%s' % NODE_HOST_IP_OR_NAME) is None:
@@ -319,12 +409,22 @@ class Helpers:
 
     @staticmethod
     def dump_rendered_template(render_template, file_location, quiet=False):
-        yaml.add_representer(type(None), Helpers.represent_none)
         if not quiet:
-            print(f"\n{yaml.dump(render_template)}")
+            print(f"\n{YamlIO.dump(render_template)}")
         print(f"\n\n Saving to file {file_location} ")
+        content = YamlIO.dump_config(render_template)
+        return Helpers.write_file_if_changed(file_location, content)
+
+    @staticmethod
+    def write_file_if_changed(file_location, content: str):
+        """Writes the content to the file and returns True if it differs from what was on disk before."""
+        if os.path.isfile(file_location):
+            with open(file_location, 'r') as f:
+                if f.read() == content:
+                    return False
         with open(file_location, 'w') as f:
-            yaml.dump(render_template, f, default_flow_style=False, explicit_start=True, allow_unicode=True)
+            f.write(content)
+        return True
 
     @staticmethod
     def backup_file(source: str, dest: str):